@@ -1,50 +1,310 @@
 # -*- coding: utf-8 -*-
-import timeit
-
-# set up code is not included in the benchmark
-# this includes loading the SHACL file into a rdflib graph
-# this is a benchmark of the validator, not of rdflib ttl parsing.
-set_up_script = '''
-import rdflib
-from pyshacl import monkey
-import pyshacl
-from os import path
-monkey.apply_patches()
-target_ttl_file = \
-    '../test/resources/dash_tests/core/complex/personexample.test.ttl'
-target_ttl_file = path.abspath(target_ttl_file)
-target_graph = rdflib.Graph("Memory")
-with open(target_ttl_file, 'rb') as file:
-    target_graph.parse(file=file, format='turtle')
-'''
-
-run_script_pre_none = '''
-r = pyshacl.validate(target_graph, inference='none')
-'''
-
-run_script_pre_rdfs = '''
-r = pyshacl.validate(target_graph, inference='rdfs')
-'''
-
-run_script_pre_owlrl = '''
-r = pyshacl.validate(target_graph, inference='owlrl')
-'''
-
-run_script_pre_both = '''
-r = pyshacl.validate(target_graph, inference='both')
-'''
-
-t1 = timeit.timeit(run_script_pre_none, set_up_script, number=200) / 200.0
-
-t2 = timeit.timeit(run_script_pre_rdfs, set_up_script, number=200) / 200.0
-
-t3 = timeit.timeit(run_script_pre_owlrl, set_up_script, number=200) / 200.0
-
-t4 = timeit.timeit(run_script_pre_both, set_up_script, number=200) / 200.0
-
-
-print("Benchmark completed. Validation took:\n"
-      "With no inferencing: {} seconds\n"
-      "With rdfs inferencing: {} seconds\n"
-      "With owl-rl inferencing: {} seconds\n"
-      "With both inferencing: {} seconds\n".format(t1, t2, t3, t4))
+"""
+Benchmark harness for PySHACL.
+
+Validates synthetic data graphs of 10k, 100k or 1M people (see synthetic.py) against a shapes graph for each
+benchmark scenario, on each backend:
+- rdflib: the data graph is an in-memory rdflib Graph
+- oxigraph: the data graph is an Oxigraph Store (needs pyoxigraph)
+- remote: SPARQL Remote Graph Mode, against a stand-in SPARQL endpoint served from a local rdflib Graph
+
+The "inference" scenario is the original benchmark: the DASH personexample test, with each inference mode.
+
+Loading the data graph is timed separately, and is not part of the validation time. Each validation is timed
+--repeat times, then run once more under tracemalloc to find its peak Python memory use. (tracemalloc cannot see
+memory allocated inside Oxigraph itself.) The results are written as JSON, along with the versions and git commit
+they were measured on, so that runs on different commits can be compared with --compare.
+
+Run from the root of a source checkout, eg:
+    python3 benchmarks/benchmark.py --sizes 10k 100k --json bench.json
+    python3 benchmarks/benchmark.py --sizes 10k --scenarios string paths --compare bench.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+here = os.path.dirname(os.path.abspath(__file__))
+# Benchmark the pyshacl in this source checkout, not an installed one
+sys.path.insert(0, os.path.dirname(here))
+sys.path.insert(0, here)
+
+import rdflib  # noqa: E402
+from synthetic import DEFAULT_DEPTH, parse_size, scenarios, write_people  # noqa: E402
+
+import pyshacl  # noqa: E402
+from pyshacl.graph_abstraction import has_oxigraph  # noqa: E402
+
+BACKENDS = ("rdflib", "oxigraph", "remote")
+INFERENCE_MODES = ("none", "rdfs", "owlrl", "both")
+PERSON_EXAMPLE = os.path.join(
+    here, "..", "test", "resources", "dash_tests", "core", "complex", "personexample.test.ttl"
+)
+
+
+class StandInEndpoint(BaseHTTPRequestHandler):
+    """A SPARQL endpoint that answers queries from a local rdflib Graph."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    graph: rdflib.Graph = rdflib.Graph()
+    lock = threading.Lock()
+
+    def answer(self, query: str) -> None:
+        with self.lock:
+            body = self.graph.query(query).serialize(format="xml")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/sparql-results+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.answer(parse_qs(urlsplit(self.path).query)["query"][0])
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8")
+        self.answer(parse_qs(body)["query"][0])
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def stand_in_endpoint(graph: rdflib.Graph) -> Iterator[str]:
+    StandInEndpoint.graph = graph
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInEndpoint)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield "http://127.0.0.1:{}/sparql".format(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def load_data(backend: str, path: str, rdf_format: str) -> Any:
+    if backend == "oxigraph":
+        from pyoxigraph import RdfFormat, Store
+
+        store = Store()
+        store.bulk_load(path=path, format=RdfFormat.N_TRIPLES if rdf_format == "nt" else RdfFormat.TURTLE)
+        return store
+    g = rdflib.Graph()
+    g.parse(path, format=rdf_format)
+    return g
+
+
+def measure(fn: Callable[[], Any], repeat: int, memory: bool) -> Dict[str, Any]:
+    """Time fn repeat times, then run it once more under tracemalloc. Returns the timings and the last result."""
+    times: List[float] = []
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        t1 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t1)
+    peak: Optional[int] = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "times": times,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "peak_memory": peak,
+        "result": result,
+    }
+
+
+def run_case(
+    scenario: str, backend: str, size: Optional[int], data: Any, shapes: str, options: Dict, args: argparse.Namespace
+) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"scenario": scenario, "backend": backend, "size": size}
+
+    def validate() -> Any:
+        return pyshacl.validate(data, shacl_graph=shapes, shacl_graph_format="turtle", **options)
+
+    try:
+        m = measure(validate, args.repeat, not args.no_memory)
+    except Exception as e:
+        record["error"] = f"{e.__class__.__name__}: {e}"
+        return record
+    report = m.pop("result")
+    record.update(m)
+    record["conforms"] = bool(report[0])
+    record["results"] = len(report.rows)
+    return record
+
+
+def run_synthetic(args: argparse.Namespace, emit: Callable[[Dict[str, Any]], None]) -> None:
+    all_scenarios = scenarios(args.depth)
+    names = [s for s in args.scenarios if s in all_scenarios]
+    if not names:
+        return
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"people-{size}.nt")
+            with open(path, "w", encoding="utf-8") as f:
+                triples = write_people(f, size, args.depth)
+            for backend in args.backends:
+                if backend == "oxigraph" and not has_oxigraph:
+                    print("Skipping the oxigraph backend, pyoxigraph is not installed.", file=sys.stderr)
+                    continue
+                t1 = time.perf_counter()
+                data = load_data("rdflib" if backend == "remote" else backend, path, "nt")
+                load_time = time.perf_counter() - t1
+                with stand_in_endpoint(data) if backend == "remote" else nullcontext() as url:
+                    for name in names:
+                        scenario = all_scenarios[name]
+                        options = dict(scenario.options)
+                        if backend == "remote":
+                            if not scenario.remote:
+                                continue
+                            options["sparql_mode"] = True
+                        record = run_case(name, backend, size, url or data, scenario.shapes, options, args)
+                        record["triples"] = triples
+                        record["load_time"] = load_time
+                        emit(record)
+                del data
+                gc.collect()
+
+
+def run_inference(args: argparse.Namespace, emit: Callable[[Dict[str, Any]], None]) -> None:
+    for backend in args.backends:
+        if backend == "remote" or (backend == "oxigraph" and not has_oxigraph):
+            continue
+        data = load_data(backend, PERSON_EXAMPLE, "turtle")
+        for mode in INFERENCE_MODES:
+            # The shapes are in the data graph itself
+            record: Dict[str, Any] = {"scenario": f"inference-{mode}", "backend": backend, "size": None}
+            try:
+                m = measure(lambda: pyshacl.validate(data, inference=mode), args.repeat, not args.no_memory)
+            except Exception as e:
+                record["error"] = f"{e.__class__.__name__}: {e}"
+            else:
+                report = m.pop("result")
+                record.update(m)
+                record["conforms"] = bool(report[0])
+                record["results"] = len(report.rows)
+            emit(record)
+
+
+def environment() -> Dict[str, Any]:
+    env: Dict[str, Any] = {
+        "pyshacl": pyshacl.__version__,
+        "rdflib": rdflib.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    if has_oxigraph:
+        import pyoxigraph
+
+        env["pyoxigraph"] = getattr(pyoxigraph, "__version__", None)
+    try:
+        env["commit"] = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=here, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        env["commit"] = None
+    return env
+
+
+def case_key(record: Dict[str, Any]) -> str:
+    return "{}/{}/{}".format(record["scenario"], record["backend"], record["size"])
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any]) -> str:
+    """A text table of the median time and peak memory of each case, relative to the same case in a baseline."""
+    before = {case_key(r): r for r in baseline.get("results", []) if "median" in r}
+    lines = [
+        "Compared to {} (commit {}):".format(
+            baseline.get("environment", {}).get("timestamp"), baseline.get("environment", {}).get("commit")
+        ),
+        f"{'case':<40} {'median (s)':>12} {'was (s)':>12} {'ratio':>7} {'memory ratio':>13}",
+    ]
+    for r in results:
+        old = before.get(case_key(r))
+        if old is None or "median" not in r:
+            continue
+        ratio = r["median"] / old["median"] if old["median"] else float("nan")
+        mem_ratio = "-"
+        if r.get("peak_memory") and old.get("peak_memory"):
+            mem_ratio = "{:.2f}".format(r["peak_memory"] / old["peak_memory"])
+        lines.append(f"{case_key(r):<40} {r['median']:>12.4f} {old['median']:>12.4f} {ratio:>7.2f} {mem_ratio:>13}")
+    return "\n".join(lines)
+
+
+def print_record(record: Dict[str, Any]) -> None:
+    if "error" in record:
+        print(f"{case_key(record):<40} ERROR {record['error']}", flush=True)
+        return
+    memory = "-" if record["peak_memory"] is None else "{:.1f}MiB".format(record["peak_memory"] / 1048576.0)
+    print(
+        f"{case_key(record):<40} median {record['median']:>9.4f}s  min {record['min']:>9.4f}s  "
+        f"peak {memory:>10}  results {record['results']:>8}",
+        flush=True,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    all_scenarios = list(scenarios()) + ["inference"]
+    parser = argparse.ArgumentParser(description="Benchmark PySHACL validation on synthetic data graphs.")
+    parser.add_argument(
+        "--sizes", nargs="+", default=["10k"], help="Numbers of people in the data graph, eg: 10k 100k 1M."
+    )
+    parser.add_argument("--scenarios", nargs="+", default=all_scenarios, choices=all_scenarios, metavar="SCENARIO")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs of each case.")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH, help="Depth of the deep_node nesting.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run of each case.")
+    parser.add_argument("--json", dest="json_file", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Compare the results to those in this JSON file.")
+    args = parser.parse_args(argv)
+    args.sizes = [parse_size(s) for s in args.sizes]
+    args.repeat = max(1, args.repeat)
+
+    results: List[Dict[str, Any]] = []
+
+    def emit(record: Dict[str, Any]) -> None:
+        results.append(record)
+        print_record(record)
+
+    run_synthetic(args, emit)
+    if "inference" in args.scenarios:
+        run_inference(args, emit)
+    output = {"environment": environment(), "results": results}
+    if args.json_file:
+        with open(args.json_file, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print(compare(results, json.load(f)))
+    return 1 if any("error" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic data graphs and shapes graphs for the benchmark harness.
+
+The data graph is a population of ex:Person entities, written as N-Triples so that every backend can load it
+quickly. Each person has literals, links to other people, an address that links to a city and a country, a
+management tree (person i is managed by person i // 2) and a chain of nested blank nodes. A small, fixed fraction
+of the people are broken in one way or another, at different rates for each property, so that every scenario
+produces some validation results, and the number of results grows linearly with the number of people.
+
+Each scenario is a shapes graph aimed at one part of the validator: each family of SHACL Core constraint
+components, deep sh:node nesting, complex property paths, SPARQL-based constraints, and SHACL rules.
+"""
+
+from typing import Dict, NamedTuple, Optional, TextIO, Tuple
+
+EX = "http://example.org/ns#"
+PERSON = "http://example.org/person/"
+CITY = "http://example.org/city/"
+COUNTRY = "http://example.org/country/"
+THING = "http://example.org/thing/"
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+# The default number of nested blank nodes under each person, for the deep_node scenario
+DEFAULT_DEPTH = 8
+CITIES = 100
+COUNTRIES = 10
+
+
+def _iri(iri: str) -> str:
+    return f"<{iri}>"
+
+
+def _lit(value: str, datatype: Optional[str] = None, lang: Optional[str] = None) -> str:
+    if lang is not None:
+        return f'"{value}"@{lang}'
+    if datatype is not None:
+        return f'"{value}"^^<{XSD}{datatype}>'
+    return f'"{value}"'
+
+
+def _date(day: int) -> str:
+    # A day of the year 2000 (a leap year) or 2001
+    year, day = (2000, day) if day < 366 else (2001, day - 366)
+    month_days = (31, 29 if year == 2000 else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+    month = 0
+    while day >= month_days[month]:
+        day -= month_days[month]
+        month += 1
+    return f"{year}-{month + 1:02d}-{day + 1:02d}"
+
+
+def write_people(out: TextIO, n: int, depth: int = DEFAULT_DEPTH) -> int:
+    """
+    Write a data graph of n people to out, as N-Triples.
+
+    :param out: A text file to write to
+    :param n: The number of people
+    :param depth: The number of nested blank nodes under each person
+    :return: The number of triples written
+    """
+    count = 0
+    for k in range(COUNTRIES):
+        country = _iri(f"{COUNTRY}{k}")
+        out.write(f"{country} <{RDF_TYPE}> <{EX}Country> .\n")
+        out.write(f"{country} <{EX}code> {_lit('C' + str(k))} .\n")
+        count += 2
+    for c in range(CITIES):
+        city = _iri(f"{CITY}{c}")
+        out.write(f"{city} <{RDF_TYPE}> <{EX}City> .\n")
+        # Every 7th city is in a country that does not exist
+        country = _iri(f"{COUNTRY}{c % COUNTRIES if c % 7 else COUNTRIES}")
+        out.write(f"{city} <{EX}country> {country} .\n")
+        count += 2
+    for i in range(n):
+        lines = []
+        me = _iri(f"{PERSON}{i}")
+
+        def add(p: str, o: str) -> None:
+            lines.append(f"{me} <{EX}{p}> {o} .\n")
+
+        lines.append(f"{me} <{RDF_TYPE}> <{EX}Person> .\n")
+        add("name", _lit("P" if i % 23 == 0 else f"Person {i}"))
+        add("label", _lit(f"Person {i}", lang="en"))
+        if i % 53 == 0:
+            add("label", _lit(f"Individual {i}", lang="en"))
+        if i % 29 == 0:
+            add("age", _lit("old"))
+        else:
+            add("age", _lit(str(-1 if i % 17 == 0 else i % 90), datatype="integer"))
+        if i % 19 != 0:
+            email = _lit(f"person{i}@example.org")
+            add("email", email)
+            add("contactEmail", email)
+        if i % 31 == 0:
+            add("email", _lit(f"other{i}@example.org"))
+        add("gender", _lit("q" if i % 37 == 0 else "fmx"[i % 3]))
+        if i % 41 == 0:
+            add("knows", _iri(f"{THING}{i}"))
+        else:
+            add("knows", _iri(f"{PERSON}{(i + 1) % n}"))
+        if i > 0:
+            add("manager", _iri(f"{PERSON}{i // 2}"))
+        start = i % 365
+        add("startDate", _lit(_date(start), datatype="date"))
+        add("endDate", _lit(_date(start if i % 43 == 0 else start + 30), datatype="date"))
+        add("givenName", _lit(f"Given{i}"))
+        add("familyName", _lit(f"Given{i}" if i % 47 == 0 else f"Family{i}"))
+        address = f"_:a{i}"
+        add("address", address)
+        lines.append(f"{address} <{EX}street> {_lit(str(i) + ' Main Street')} .\n")
+        lines.append(f"{address} <{EX}city> {_iri(CITY + str(i % CITIES))} .\n")
+        add("nested", f"_:d{i}x0")
+        for d in range(1, depth):
+            lines.append(f"_:d{i}x{d - 1} <{EX}child> _:d{i}x{d} .\n")
+        leaf = _lit("none") if i % 59 == 0 else _lit(str(i), datatype="integer")
+        lines.append(f"_:d{i}x{depth - 1} <{EX}value> {leaf} .\n")
+        out.write("".join(lines))
+        count += len(lines)
+    return count
+
+
+PREFIXES = f"""\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix xsd: <{XSD}> .
+@prefix ex: <{EX}> .
+"""
+
+
+def _person_shape(body: str) -> str:
+    return PREFIXES + f"\nex:PersonShape\n  a sh:NodeShape ;\n  sh:targetClass ex:Person ;\n{body}\n.\n"
+
+
+value_type_shapes = _person_shape("""\
+  sh:property [ sh:path ex:name ; sh:datatype xsd:string ] ;
+  sh:property [ sh:path ex:age ; sh:datatype xsd:integer ] ;
+  sh:property [ sh:path ex:knows ; sh:class ex:Person ; sh:nodeKind sh:IRI ] ;
+  sh:property [ sh:path ex:address ; sh:nodeKind sh:BlankNode ] ;""")
+
+cardinality_shapes = _person_shape("""\
+  sh:property [ sh:path ex:name ; sh:minCount 1 ; sh:maxCount 1 ] ;
+  sh:property [ sh:path ex:email ; sh:minCount 1 ; sh:maxCount 1 ] ;
+  sh:property [ sh:path ex:age ; sh:maxCount 1 ] ;
+  sh:property [ sh:path ex:knows ; sh:minCount 1 ] ;""")
+
+value_range_shapes = _person_shape("""\
+  sh:property [ sh:path ex:age ; sh:minInclusive 0 ; sh:maxInclusive 150 ] ;
+  sh:property [ sh:path ex:startDate ; sh:minExclusive "1999-12-31"^^xsd:date ; sh:maxExclusive "2002-01-01"^^xsd:date ] ;""")
+
+string_shapes = _person_shape("""\
+  sh:property [ sh:path ex:name ; sh:minLength 3 ; sh:maxLength 40 ; sh:pattern "^Person [0-9]+$" ] ;
+  sh:property [ sh:path ex:email ; sh:pattern "^[a-z0-9]+@example[.]org$" ] ;
+  sh:property [ sh:path ex:label ; sh:languageIn ( "en" "de" ) ; sh:uniqueLang true ] ;""")
+
+property_pair_shapes = _person_shape("""\
+  sh:property [ sh:path ex:startDate ; sh:lessThan ex:endDate ; sh:lessThanOrEquals ex:endDate ] ;
+  sh:property [ sh:path ex:givenName ; sh:disjoint ex:familyName ] ;
+  sh:property [ sh:path ex:email ; sh:equals ex:contactEmail ] ;""")
+
+logical_shapes = _person_shape("""\
+  sh:property [ sh:path ex:age ; sh:or ( [ sh:datatype xsd:integer ] [ sh:datatype xsd:decimal ] ) ] ;
+  sh:property [ sh:path ex:gender ; sh:not [ sh:hasValue "q" ] ] ;
+  sh:property [ sh:path ex:name ; sh:and ( [ sh:minLength 3 ] [ sh:maxLength 40 ] ) ] ;
+  sh:xone (
+    [ sh:path ex:email ; sh:minCount 1 ]
+    [ sh:path ex:phone ; sh:minCount 1 ]
+  ) ;""")
+
+shape_based_shapes = (
+    _person_shape("""\
+  sh:property [ sh:path ex:address ; sh:node ex:AddressShape ] ;
+  sh:property [
+    sh:path ex:knows ;
+    sh:qualifiedValueShape [ sh:class ex:Person ] ;
+    sh:qualifiedMinCount 1 ;
+  ] ;""")
+    + """
+ex:AddressShape
+  a sh:NodeShape ;
+  sh:property [ sh:path ex:street ; sh:minCount 1 ] ;
+  sh:property [ sh:path ex:city ; sh:minCount 1 ; sh:node ex:CityShape ] ;
+.
+
+ex:CityShape
+  a sh:NodeShape ;
+  sh:class ex:City ;
+  sh:property [ sh:path ex:country ; sh:node ex:CountryShape ] ;
+.
+
+ex:CountryShape
+  a sh:NodeShape ;
+  sh:class ex:Country ;
+  sh:property [ sh:path ex:code ; sh:minCount 1 ; sh:pattern "^C[0-9]+$" ] ;
+.
+"""
+)
+
+other_shapes = _person_shape("""\
+  sh:closed true ;
+  sh:ignoredProperties ( rdf:type ) ;
+  sh:property [ sh:path ex:name ] ;
+  sh:property [ sh:path ex:label ] ;
+  sh:property [ sh:path ex:age ] ;
+  sh:property [ sh:path ex:email ] ;
+  sh:property [ sh:path ex:contactEmail ] ;
+  sh:property [ sh:path ex:gender ; sh:in ( "f" "m" "x" ) ] ;
+  sh:property [ sh:path ex:knows ] ;
+  sh:property [ sh:path ex:manager ] ;
+  sh:property [ sh:path ex:startDate ] ;
+  sh:property [ sh:path ex:endDate ] ;
+  sh:property [ sh:path ex:givenName ] ;
+  sh:property [ sh:path ex:familyName ] ;
+  sh:property [ sh:path ex:address ] ;
+  sh:property [ sh:path ex:nested ] ;
+  sh:property [ sh:path rdf:type ; sh:hasValue ex:Person ] ;""")
+
+
+def deep_node_shapes(depth: int = DEFAULT_DEPTH) -> str:
+    """Shapes that follow the chain of nested blank nodes with one sh:node per level."""
+    levels = []
+    for d in range(depth - 1):
+        levels.append(
+            f"ex:Level{d}\n  a sh:NodeShape ;\n"
+            f"  sh:property [ sh:path ex:child ; sh:minCount 1 ; sh:node ex:Level{d + 1} ] ;\n.\n"
+        )
+    levels.append(
+        f"ex:Level{depth - 1}\n  a sh:NodeShape ;\n"
+        "  sh:property [ sh:path ex:value ; sh:minCount 1 ; sh:datatype xsd:integer ] ;\n.\n"
+    )
+    return _person_shape("  sh:property [ sh:path ex:nested ; sh:node ex:Level0 ] ;") + "\n" + "\n".join(levels)
+
+
+paths_shapes = _person_shape("""\
+  sh:property [ sh:path ( ex:knows ex:name ) ; sh:minCount 1 ] ;
+  sh:property [ sh:path [ sh:alternativePath ( ex:email ex:contactEmail ) ] ; sh:minCount 1 ] ;
+  sh:property [ sh:path [ sh:inversePath ex:knows ] ; sh:minCount 1 ] ;
+  sh:property [ sh:path [ sh:zeroOrMorePath ex:manager ] ; sh:class ex:Person ] ;
+  sh:property [ sh:path ( [ sh:oneOrMorePath ex:manager ] ex:name ) ; sh:minCount 1 ] ;
+  sh:property [ sh:path ( ex:address ex:city [ sh:zeroOrOnePath ex:country ] ) ; sh:minCount 2 ] ;""")
+
+sparql_shapes = (
+    PREFIXES
+    + """
+ex:
+  sh:declare [ sh:prefix "ex" ; sh:namespace "http://example.org/ns#"^^xsd:anyURI ] ;
+  sh:declare [ sh:prefix "xsd" ; sh:namespace "http://www.w3.org/2001/XMLSchema#"^^xsd:anyURI ] ;
+.
+
+ex:PersonShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Person ;
+  sh:sparql [
+    sh:prefixes ex: ;
+    sh:select \"\"\"
+      SELECT $this ?value WHERE {
+        $this ex:age ?value .
+        FILTER (datatype(?value) = xsd:integer && ?value < 0)
+      }\"\"\" ;
+  ] ;
+  sh:property [
+    sh:path ex:knows ;
+    sh:sparql [
+      sh:prefixes ex: ;
+      sh:select \"\"\"
+        SELECT $this ?value WHERE {
+          $this $PATH ?value .
+          FILTER NOT EXISTS { ?value a ex:Person }
+        }\"\"\" ;
+    ] ;
+  ] ;
+.
+"""
+)
+
+rules_shapes = (
+    PREFIXES
+    + """
+ex:
+  sh:declare [ sh:prefix "ex" ; sh:namespace "http://example.org/ns#"^^xsd:anyURI ] ;
+.
+
+ex:PersonRules
+  a sh:NodeShape ;
+  sh:targetClass ex:Person ;
+  sh:rule [
+    a sh:TripleRule ;
+    sh:subject sh:this ;
+    sh:predicate rdf:type ;
+    sh:object ex:Agent ;
+  ] ;
+  sh:rule [
+    a sh:SPARQLRule ;
+    sh:prefixes ex: ;
+    sh:construct \"\"\"
+      CONSTRUCT { $this ex:colleague ?other . }
+      WHERE { $this ex:manager ?m . ?other ex:manager ?m . FILTER ($this != ?other) }\"\"\" ;
+  ] ;
+.
+
+ex:AgentShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Agent ;
+  sh:property [ sh:path ex:name ; sh:minLength 3 ] ;
+  sh:property [ sh:path ex:colleague ; sh:class ex:Person ; sh:maxCount 1 ] ;
+.
+"""
+)
+
+
+class Scenario(NamedTuple):
+    shapes: str
+    # Extra options for validate()
+    options: Dict
+    # Can the scenario run in SPARQL Remote Graph Mode?
+    remote: bool = True
+
+
+def scenarios(depth: int = DEFAULT_DEPTH) -> Dict[str, Scenario]:
+    """The benchmark scenarios, by name."""
+    return {
+        "value_type": Scenario(value_type_shapes, {}),
+        "cardinality": Scenario(cardinality_shapes, {}),
+        "value_range": Scenario(value_range_shapes, {}),
+        "string": Scenario(string_shapes, {}),
+        "property_pair": Scenario(property_pair_shapes, {}),
+        "logical": Scenario(logical_shapes, {}),
+        # A remote graph cannot be asked about the blank nodes of the addresses or of the nested chain
+        "shape_based": Scenario(shape_based_shapes, {}, remote=False),
+        "other": Scenario(other_shapes, {}),
+        # Each level of nesting is a node shape and a property shape deep
+        "deep_node": Scenario(deep_node_shapes(depth), {"max_validation_depth": 2 * depth + 8}, remote=False),
+        "paths": Scenario(paths_shapes, {}),
+        "sparql": Scenario(sparql_shapes, {"advanced": True}),
+        # Rules write to the data graph, which a remote graph does not allow
+        "rules": Scenario(rules_shapes, {"advanced": True}, remote=False),
+    }
+
+
+def parse_size(size: str) -> int:
+    """Read a size like "10k" or "1M" as a number of people."""
+    multipliers: Tuple[Tuple[str, int], ...] = (("k", 1000), ("m", 1000000))
+    s = size.strip().lower()
+    for suffix, m in multipliers:
+        if s.endswith(suffix):
+            return int(float(s[: -len(suffix)]) * m)
+    return int(s)
@@ -0,0 +1,2 @@
+# Fixtures for the test suite, shipped as a plugin so that users can enable them in their own test suites too
+pytest_plugins = ["pyshacl.testing"]
@@ -21,6 +21,11 @@ first_arg = None if len(sys.argv) < 2 else sys.argv[1]
 
 if first_arg is not None and str(first_arg).lower() in ('rules', '--rules'):
     rules_main(prog="python3 -m pyshacl")
+elif first_arg is not None and str(first_arg).lower() in ('snapshot', '--snapshot'):
+    from pyshacl.snapshot import main as snapshot_main
+
+    del sys.argv[1]
+    snapshot_main(prog="python3 -m pyshacl snapshot")
 elif (first_arg is not None and str(first_arg).lower() in ('serve', 'server', '--server')) or (
     do_server and str_is_true(do_server)
 ):
@@ -17,6 +17,8 @@ from pyshacl.errors import (
     ShapeLoadError,
     ValidationFailure,
 )
+from pyshacl.profiling import ValidationProfile
+from pyshacl.rdfutil import get_web_cache, set_web_cache
 
 
 class ShowVersion(argparse.Action):
@@ -88,6 +90,41 @@ parser.add_argument(
     default=False,
     help='Treat the DataGraph as a SPARQL endpoint, validate the graph at the SPARQL endpoint.',
 )
+parser.add_argument(
+    '--sparql-batch-size',
+    dest='sparql_batch_size',
+    action='store',
+    type=int,
+    help="In SPARQL mode, the number of focus nodes in each value node query. Default: 100.",
+)
+parser.add_argument(
+    '--sparql-page-size',
+    dest='sparql_page_size',
+    action='store',
+    type=int,
+    help="In SPARQL mode, the number of solutions to read from the endpoint with each request. Default: 10000.",
+)
+parser.add_argument(
+    '--sparql-concurrency',
+    dest='sparql_concurrency',
+    action='store',
+    type=int,
+    help="In SPARQL mode, the number of queries to send to the endpoint at once. Default: 4.",
+)
+parser.add_argument(
+    '--sparql-timeout',
+    dest='sparql_timeout',
+    action='store',
+    type=float,
+    help="In SPARQL mode, the number of seconds to wait for each request to the endpoint. Default: 60.",
+)
+parser.add_argument(
+    '--sparql-retries',
+    dest='sparql_retries',
+    action='store',
+    type=int,
+    help="In SPARQL mode, the number of times to retry a failed request to the endpoint. Default: 3.",
+)
 parser.add_argument(
     '-im',
     '--imports',
@@ -96,6 +133,19 @@ parser.add_argument(
     default=False,
     help='Allow import of sub-graphs defined in statements with owl:imports.',
 )
+parser.add_argument(
+    '--web-cache-dir',
+    dest='web_cache_dir',
+    action='store',
+    help='A directory to keep snapshots of owl:imports and other RDF fetched from the web, across runs.',
+)
+parser.add_argument(
+    '--offline',
+    dest='offline',
+    action='store_true',
+    default=False,
+    help='Never fetch RDF from the web, only use the web cache.',
+)
 parser.add_argument(
     '-a',
     '--advanced',
@@ -146,6 +196,41 @@ parser.add_argument(
     type=int,
     help="The maximum number of SHACL shapes \"deep\" that the validator can go before reaching an \"endpoint\" constraint.",
 )
+parser.add_argument(
+    '--max-results-per-shape',
+    dest='max_results_per_shape',
+    action='store',
+    type=int,
+    help="Put at most this many results from each shape into the Validation Report.",
+)
+parser.add_argument(
+    '--max-results-total',
+    dest='max_results_total',
+    action='store',
+    type=int,
+    help="Put at most this many results into the Validation Report.",
+)
+parser.add_argument(
+    '--sample-rate',
+    dest='sample_rate',
+    action='store',
+    type=float,
+    help="Put only this fraction (0.0 < rate <= 1.0) of the results from each shape into the Validation Report.",
+)
+parser.add_argument(
+    '--profile',
+    dest='profile',
+    action='store_true',
+    default=False,
+    help="Time and count the work done by each shape and constraint, and write a summary of the slowest to stderr.",
+)
+parser.add_argument(
+    '--profile-json',
+    dest='profile_json',
+    action='store',
+    type=argparse.FileType('w'),
+    help="Write the full validation profile to this file, as JSON.",
+)
 parser.add_argument(
     '-d',
     '--debug',
@@ -161,6 +246,20 @@ parser.add_argument(
     default=False,
     help='Validate each data graph independently when multiple inputs are provided.',
 )
+parser.add_argument(
+    '--oxigraph',
+    dest='oxigraph',
+    action='store_true',
+    default=False,
+    help='Parse the DataGraph with Oxigraph, and validate it in an Oxigraph Store. Needs pyshacl[oxigraph].',
+)
+parser.add_argument(
+    '--load-workers',
+    dest='load_workers',
+    action='store',
+    type=int,
+    help='Number of worker processes used to parse multiple DataGraph files. Default: one per CPU. 0 disables.',
+)
 parser.add_argument(
     '--focus',
     dest='focus',
@@ -264,6 +363,9 @@ def main(prog: Union[str, None] = None) -> None:
         sys.stderr.write('Input Error. No DataGraph file or endpoint supplied.\n')
         parser.print_usage(sys.stderr)
         sys.exit(1)
+    if args.web_cache_dir or args.offline:
+        cache = get_web_cache()
+        set_web_cache(args.web_cache_dir or cache.cache_dir, offline=args.offline or cache.offline)
     validator_kwargs = {'debug': args.debug}
     data_files: List[BufferedReader] = []
     data_graphs: List[Union[BufferedReader, str]] = []
@@ -277,6 +379,15 @@ def main(prog: Union[str, None] = None) -> None:
             sys.exit(1)
         data_graphs = [endpoint]
         validator_kwargs['sparql_mode'] = True
+        for sparql_option in (
+            'sparql_batch_size',
+            'sparql_page_size',
+            'sparql_concurrency',
+            'sparql_timeout',
+            'sparql_retries',
+        ):
+            if getattr(args, sparql_option) is not None:
+                validator_kwargs[sparql_option] = getattr(args, sparql_option)
     else:
         for data_path in args.data:
             try:
@@ -324,6 +435,17 @@ def main(prog: Union[str, None] = None) -> None:
         validator_kwargs['allow_warnings'] = True
     if args.max_depth is not None:
         validator_kwargs['max_validation_depth'] = args.max_depth
+    if args.oxigraph:
+        validator_kwargs['use_oxigraph'] = True
+    if args.max_results_per_shape is not None:
+        validator_kwargs['max_results_per_shape'] = args.max_results_per_shape
+    if args.max_results_total is not None:
+        validator_kwargs['max_results_total'] = args.max_results_total
+    if args.sample_rate is not None:
+        validator_kwargs['sample_rate'] = args.sample_rate
+    profile: Union[ValidationProfile, None] = None
+    if args.profile or args.profile_json:
+        profile = validator_kwargs['profile'] = ValidationProfile()
     if args.shacl_file_format:
         _f: str = args.shacl_file_format
         if _f != "auto":
@@ -345,6 +467,8 @@ def main(prog: Union[str, None] = None) -> None:
             data_graph = data_graphs[0] if len(data_graphs) == 1 else data_graphs
             if len(data_graphs) > 1:
                 validator_kwargs['multi_data_graphs_mode'] = "combine"
+                if args.load_workers is not None:
+                    validator_kwargs['load_workers'] = args.load_workers
             is_conform, v_graph, v_text = validate(data_graph, **validator_kwargs)
             if isinstance(v_graph, BaseException):
                 raise v_graph
@@ -395,6 +519,8 @@ def main(prog: Union[str, None] = None) -> None:
                 sys.stderr.write(str(e))
         if exit_code is not None:
             sys.exit(exit_code)
+    if profile is not None:
+        write_profile_output(args, profile)
     if args.validate_each:
         all_conform = True
         for source_key, (is_conform, v_graph, v_text) in results.items():
@@ -428,6 +554,14 @@ def _col_widther(s, w):
     return '\n'.join(s2)
 
 
+def write_profile_output(args, profile: ValidationProfile) -> None:
+    if args.profile:
+        sys.stderr.write(profile.summary())
+    if args.profile_json:
+        args.profile_json.write(profile.to_json(indent=2))
+        args.profile_json.close()
+
+
 def write_validation_output(args, is_conform: bool, v_graph, v_text: str) -> None:
     if args.format == 'human':
         args.output.write(v_text)
@@ -7,35 +7,29 @@ https://www.w3.org/TR/shacl/#core-components-value-type
 import abc
 import re
 import typing
-from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
 
-from rdflib import BNode, Literal, URIRef
+from rdflib import Literal, URIRef
 
 from pyshacl.consts import (
     SH,
     RDF_type,
     SH_ask,
-    SH_focusNode,
     SH_jsFunctionName,
     SH_NodeConstraintComponent,
     SH_parameter,
     SH_path,
     SH_PropertyConstraintComponent,
-    SH_resultMessage,
-    SH_resultPath,
-    SH_resultSeverity,
     SH_select,
-    SH_sourceConstraint,
-    SH_sourceConstraintComponent,
-    SH_sourceShape,
-    SH_ValidationResult,
-    SH_value,
     SH_Violation,
 )
 from pyshacl.errors import ConstraintLoadError
+from pyshacl.helper import vectorized
+from pyshacl.helper.vectorized import BatchCheck
 from pyshacl.parameter import SHACLParameter
 from pyshacl.pytypes import GraphLike, SHACLExecutor
 from pyshacl.rdfutil import stringify_node
+from pyshacl.report import StopAtFirstResult
 
 if TYPE_CHECKING:
     from pyshacl.pytypes import RDFNode
@@ -43,6 +37,102 @@ if TYPE_CHECKING:
     from pyshacl.shapes_graph import ShapesGraph
 
 
+class ValueCheck(NamedTuple):
+    """
+    One check of a simple value-local constraint component, for the fused evaluator.
+    If per_focus is False, test(value_node) is True when the value node conforms, and each failing
+    value node is a result with that sh:value.
+    If per_focus is True, test(value_nodes) is the number of results (without a sh:value) for the
+    value nodes of one focus node.
+    A value check can also have a vectorized batch version of its test, see pyshacl.helper.vectorized.
+    """
+
+    per_focus: bool
+    test: Callable[[Any], Any]
+    batch: Optional[BatchCheck] = None
+
+
+class FusedValueChecks(object):
+    """
+    The value checks of several constraint components, compiled into one list,
+    to run them all in a single pass over the value nodes.
+    """
+
+    __slots__ = ("value_tests", "unbatched_tests", "batch_tests", "focus_tests", "check_count", "ranges")
+
+    def __init__(self, check_lists: Sequence[Sequence[ValueCheck]]) -> None:
+        self.value_tests: List[Tuple[int, Callable]] = []
+        # The value tests to run one value node at a time, when the batch tests are used
+        self.unbatched_tests: List[Tuple[int, Callable]] = []
+        self.batch_tests: List[Tuple[int, BatchCheck]] = []
+        self.focus_tests: List[Tuple[int, Callable]] = []
+        # The range of check indexes of each list of checks
+        self.ranges: List[Tuple[int, int]] = []
+        i = 0
+        for checks in check_lists:
+            start = i
+            for per_focus, test, batch in checks:
+                if per_focus:
+                    self.focus_tests.append((i, test))
+                else:
+                    self.value_tests.append((i, test))
+                    if batch is None:
+                        self.unbatched_tests.append((i, test))
+                    else:
+                        self.batch_tests.append((i, batch))
+                i += 1
+            self.ranges.append((start, i))
+        self.check_count = i
+
+    def __call__(self, focus_value_nodes: Dict) -> List[List[Tuple['RDFNode', Optional['RDFNode']]]]:
+        """
+        Returns, for each list of checks, the (focus node, value node) pairs of its failures, in the order the
+        constraint component would have found them when evaluated on its own: check by check, then focus node by
+        focus node.
+        """
+        failed: List[List[Tuple]] = [[] for _ in range(self.check_count)]
+        focus_tests = self.focus_tests
+        value_tests = self.value_tests
+        if self.batch_tests and sum(map(len, focus_value_nodes.values())) >= vectorized.MIN_VECTORIZED_VALUES:
+            pairs = [(f, v) for f, value_nodes in focus_value_nodes.items() for v in value_nodes]
+            values = [v for _, v in pairs]
+            memo: Dict = {}
+            for i, batch in self.batch_tests:
+                failed[i] = [pairs[k] for k in vectorized.failing_positions(batch(values, memo))]
+            value_tests = self.unbatched_tests
+        for f, value_nodes in focus_value_nodes.items():
+            for i, test in focus_tests:
+                for _ in range(test(value_nodes)):
+                    failed[i].append((f, None))
+            if value_tests:
+                for v in value_nodes:
+                    for i, test in value_tests:
+                        if not test(v):
+                            failed[i].append((f, v))
+        return [
+            failed[start] if end - start == 1 else [pair for fails in failed[start:end] for pair in fails]
+            for start, end in self.ranges
+        ]
+
+    def first_failure(self, focus_value_nodes: Dict) -> Optional[Tuple['RDFNode', Optional['RDFNode']]]:
+        """
+        Returns the first (focus node, value node) pair the checks would fail on, in the same order as __call__,
+        or None if they all pass. The checks stop there, so this is used in conforms_only mode.
+        """
+        tests = sorted(self.focus_tests + self.value_tests, key=lambda t: t[0])
+        focus_test_indexes = {i for i, _ in self.focus_tests}
+        for i, test in tests:
+            for f, value_nodes in focus_value_nodes.items():
+                if i in focus_test_indexes:
+                    if test(value_nodes) > 0:
+                        return f, None
+                    continue
+                for v in value_nodes:
+                    if not test(v):
+                        return f, v
+        return None
+
+
 class ConstraintComponent(object, metaclass=abc.ABCMeta):
     __slots__ = ('shape',)
 
@@ -86,11 +176,70 @@ class ConstraintComponent(object, metaclass=abc.ABCMeta):
     def make_generic_messages(self, datagraph: GraphLike, focus_node, value_node) -> List[Literal]:
         return []
 
+    def compile(self) -> Any:
+        """
+        Work out anything this constraint component needs from the shapes graph that stays the same from one
+        validation run to the next. Get the result with self.shape.compiled_of(self), which calls this only once.
+        Returns None by default.
+        """
+        return None
+
+    def value_checks(self) -> Optional[List[ValueCheck]]:
+        """
+        The checks of a simple value-local constraint component, which only looks at each value node
+        (or at the number of value nodes) and never at the data graph.
+        Shape validation runs the checks of all such components on a shape in a single pass over the value nodes.
+        Returns None for every other kind of constraint component.
+        """
+        return None
+
+    @classmethod
+    def has_value_checks(cls) -> bool:
+        """True if this class of constraint component implements value_checks()."""
+        return cls.value_checks is not ConstraintComponent.value_checks
+
+    def value_checks_key(self) -> Any:
+        """
+        Anything outside of the shapes graph that the value checks depend on. The shape keeps the value checks
+        of this component for the later validation runs only while this stays the same.
+        Returns None by default.
+        """
+        return None
+
+    def evaluate_value_checks(self, target_graph: GraphLike, focus_value_nodes: Dict):
+        _, fused = self.shape.fused_value_checks((self,))
+        if self.shape.sg.results.conforms_only:
+            failure = fused.first_failure(focus_value_nodes)
+            return self.make_check_results(target_graph, [] if failure is None else [failure])
+        return self.make_check_results(target_graph, fused(focus_value_nodes)[0])
+
+    def make_check_results(self, target_graph: GraphLike, failures: List[Tuple['RDFNode', Optional['RDFNode']]]):
+        """
+        Record a validation result for each failure of the value checks of this component.
+        :raises StopAtFirstResult: In conforms_only mode, at the first result.
+        """
+        if not failures:
+            return True, []
+        return False, [self.make_v_result(target_graph, f, value_node=v) for f, v in failures]
+
     def __str__(self) -> str:
         c_name = str(self.__class__.__name__)
         shape_id = str(self.shape)
         return "<{} on {}>".format(c_name, shape_id)
 
+    @staticmethod
+    def result_key(
+        focus_node: Optional['RDFNode'] = None,
+        value_node: Optional['RDFNode'] = None,
+        result_path: Optional['RDFNode'] = None,
+        bound_vars: Optional[Dict] = None,
+    ) -> Tuple:
+        """
+        A hashable key that identifies one validation result, for de-duplicating results with a set.
+        The other variables bound by a SPARQL-based constraint are part of the key, as a frozenset of their items.
+        """
+        return focus_node, value_node, result_path, frozenset(bound_vars.items()) if bound_vars else None
+
     def recursion_triggers(self, _evaluation_path, trigger_depth=3) -> Optional[List['RDFNode']]:
         shape = self.shape
         eval_length = len(_evaluation_path)
@@ -218,17 +367,14 @@ class ConstraintComponent(object, metaclass=abc.ABCMeta):
                 desc += "\tMessage: {}\n".format(str(m))
         return desc
 
-    def make_v_result(
+    def make_v_result_messages(
         self,
         datagraph: GraphLike,
         focus_node: 'RDFNode',
-        value_node: Optional['RDFNode'] = None,
-        result_path: Optional['RDFNode'] = None,
-        constraint_component: Optional['RDFNode'] = None,
-        source_constraint: Optional['RDFNode'] = None,
+        value_node: Optional['RDFNode'],
         extra_messages: Optional[Iterable] = None,
         bound_vars=None,
-    ):
+    ) -> Tuple[List, List]:
         """
         :param datagraph:
         :type datagraph: rdflib.Graph | rdflib.Dataset
@@ -236,34 +382,14 @@ class ConstraintComponent(object, metaclass=abc.ABCMeta):
         :type focus_node: RDFNode
         :param value_node:
         :type value_node: RDFNode | None
-        :param result_path:
-        :type result_path: RDFNode | None
-        :param constraint_component:
-        :param source_constraint:
         :param extra_messages:
         :type extra_messages: collections.abc.Iterable | None
         :param bound_vars:
-        :return:
+        :return: The messages for the result description, and the sh:resultMessage terms for the report graph
+        :rtype: (list, list)
         """
-        constraint_component = constraint_component or self.shacl_constraint_component
-        severity = self.shape.severity
-        sg = self.shape.sg.graph
-        r_triples: List[Tuple[RDFNode, RDFNode, Any]] = list()
-        r_node = BNode()
-        r_triples.append((r_node, RDF_type, SH_ValidationResult))
-        r_triples.append((r_node, SH_sourceConstraintComponent, (sg, constraint_component)))
-        r_triples.append((r_node, SH_sourceShape, (sg, self.shape.node)))
-        r_triples.append((r_node, SH_resultSeverity, severity))
-        r_triples.append((r_node, SH_focusNode, (datagraph or sg, focus_node)))
-        if value_node is not None:
-            r_triples.append((r_node, SH_value, (datagraph, value_node)))
-        if result_path is None and self.shape.is_property_shape:
-            result_path = self.shape.path()
-        if result_path is not None:
-            r_triples.append((r_node, SH_resultPath, (sg, result_path)))
-        if source_constraint is not None:
-            r_triples.append((r_node, SH_sourceConstraint, (sg, source_constraint)))
         messages = list(self.shape.message)
+        message_terms = []
         if extra_messages:
             for m in iter(extra_messages):
                 if m in messages:
@@ -273,7 +399,7 @@ class ConstraintComponent(object, metaclass=abc.ABCMeta):
                     if bound_vars is not None:
                         msg = self._format_sparql_based_result_message(msg, bound_vars)
                         m = Literal(msg)
-                r_triples.append((r_node, SH_resultMessage, m))
+                message_terms.append(m)
         elif not messages:
             messages = self.make_generic_messages(datagraph, focus_node, value_node) or messages
         for m in messages:
@@ -282,20 +408,59 @@ class ConstraintComponent(object, metaclass=abc.ABCMeta):
                 if bound_vars is not None:
                     msg = self._format_sparql_based_result_message(msg, bound_vars)
                     m = Literal(msg)
-            r_triples.append((r_node, SH_resultMessage, m))
-        desc = self.make_v_result_description(
+            message_terms.append(m)
+        return messages, message_terms
+
+    def make_v_result(
+        self,
+        datagraph: GraphLike,
+        focus_node: 'RDFNode',
+        value_node: Optional['RDFNode'] = None,
+        result_path: Optional['RDFNode'] = None,
+        constraint_component: Optional['RDFNode'] = None,
+        source_constraint: Optional['RDFNode'] = None,
+        extra_messages: Optional[Iterable] = None,
+        bound_vars=None,
+    ) -> int:
+        """
+        Record a validation result in the results table of the current validation run.
+        The description text and the report graph triples are not built here,
+        they are rendered from the results table when the report is requested.
+
+        :param datagraph:
+        :type datagraph: rdflib.Graph | rdflib.Dataset
+        :param focus_node:
+        :type focus_node: RDFNode
+        :param value_node:
+        :type value_node: RDFNode | None
+        :param result_path:
+        :type result_path: RDFNode | None
+        :param constraint_component:
+        :param source_constraint:
+        :param extra_messages:
+        :type extra_messages: collections.abc.Iterable | None
+        :param bound_vars:
+        :return: The row index of the result in the results table, or NO_TERM if it was over the report limits
+        :rtype: int
+        :raises StopAtFirstResult: In conforms_only mode, to end the evaluation of this constraint.
+        """
+        if result_path is None and self.shape.is_property_shape:
+            result_path = self.shape.path()
+        results = self.shape.sg.results
+        row = results.add(
+            self,
             datagraph,
             focus_node,
-            severity,
             value_node,
-            messages,
-            result_path=result_path,
-            constraint_component=constraint_component,
-            source_constraint=source_constraint,
+            result_path,
+            constraint_component or self.shacl_constraint_component,
+            source_constraint,
             extra_messages=extra_messages,
             bound_vars=bound_vars,
         )
-        return desc, r_node, r_triples
+        if results.conforms_only:
+            raise StopAtFirstResult(row)
+        return row
 
     def _format_sparql_based_result_message(self, msg, bound_vars):
         if bound_vars is None:
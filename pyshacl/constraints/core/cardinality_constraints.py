@@ -8,7 +8,7 @@ from typing import Dict, List, Optional
 from rdflib.namespace import XSD
 from rdflib.term import Literal, URIRef
 
-from pyshacl.constraints.constraint_component import ConstraintComponent
+from pyshacl.constraints.constraint_component import ConstraintComponent, ValueCheck
 from pyshacl.consts import SH
 from pyshacl.errors import ConstraintLoadError
 from pyshacl.pytypes import GraphLike, RDFNode, SHACLExecutor
@@ -98,19 +98,18 @@ class MinCountConstraintComponent(ConstraintComponent):
         :type focus_value_nodes: dict
         :type _evaluation_path: list
         """
+        return self.evaluate_value_checks(target_graph, focus_value_nodes)
+
+    def value_checks(self) -> List[ValueCheck]:
         min_count = int(self.min_count.value)
         if min_count == 0:
             # MinCount of zero always passes
-            return True, []
-        reports = []
-        non_conformant = False
+            return []
+
+        def check(value_nodes) -> int:
+            return 0 if len(value_nodes) >= min_count else 1
 
-        for f, value_nodes in focus_value_nodes.items():
-            if not len(value_nodes) >= min_count:
-                non_conformant = True
-                rept = self.make_v_result(target_graph, f)
-                reports.append(rept)
-        return (not non_conformant), reports
+        return [ValueCheck(True, check)]
 
 
 class MaxCountConstraintComponent(ConstraintComponent):
@@ -185,13 +184,12 @@ class MaxCountConstraintComponent(ConstraintComponent):
         :type focus_value_nodes: dict
         :type _evaluation_path: list
         """
+        return self.evaluate_value_checks(target_graph, focus_value_nodes)
+
+    def value_checks(self) -> List[ValueCheck]:
         max_count = int(self.max_count.value)
-        reports = []
-        non_conformant = False
-
-        for f, value_nodes in focus_value_nodes.items():
-            if not len(value_nodes) <= max_count:
-                non_conformant = True
-                rept = self.make_v_result(target_graph, f)
-                reports.append(rept)
-        return (not non_conformant), reports
+
+        def check(value_nodes) -> int:
+            return 0 if len(value_nodes) <= max_count else 1
+
+        return [ValueCheck(True, check)]
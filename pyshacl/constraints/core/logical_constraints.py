@@ -116,9 +116,10 @@ class NotConstraintComponent(ConstraintComponent):
         for f, value_nodes in focus_value_nodes.items():
             for v in value_nodes:
                 try:
-                    _is_conform, _r = found_not_shape.validate(
-                        executor, datagraph, focus=v, _evaluation_path=_evaluation_path[:]
-                    )
+                    with self.shape.sg.results.nested():
+                        _is_conform, _r = found_not_shape.validate(
+                            executor, datagraph, focus=v, _evaluation_path=_evaluation_path[:]
+                        )
                 except ValidationFailure as e:
                     raise e
                 if len(_r):
@@ -132,8 +133,8 @@ class NotConstraintComponent(ConstraintComponent):
             self.shape.logger.debug(
                 "sh:not constraint reports ignored, conformance inverted and passed to the parent Node:"
             )
-            for v_str, v_node, v_parts in upstream_reports:
-                self.shape.logger.debug(v_str)
+            for rept in upstream_reports:
+                self.shape.logger.debug(self.shape.sg.results.text_of(rept))
         return _non_conformant, _reports
 
 
@@ -233,9 +234,10 @@ class AndConstraintComponent(ConstraintComponent):
                 passed_all = True
                 for and_shape in and_shapes:
                     try:
-                        _is_conform, _r = and_shape.validate(
-                            executor, target_graph, focus=v, _evaluation_path=_evaluation_path[:]
-                        )
+                        with self.shape.sg.results.nested():
+                            _is_conform, _r = and_shape.validate(
+                                executor, target_graph, focus=v, _evaluation_path=_evaluation_path[:]
+                            )
                     except ValidationFailure as e:
                         raise e
                     if len(_r):
@@ -247,8 +249,8 @@ class AndConstraintComponent(ConstraintComponent):
                     _reports.append(rept)
         if len(upstream_reports) and self.shape.sg.debug:
             self.shape.logger.debug("sh:and constraint reports will be inspected and not passed to the parent Node:")
-            for v_str, v_node, v_parts in upstream_reports:
-                self.shape.logger.debug(v_str)
+            for rept in upstream_reports:
+                self.shape.logger.debug(self.shape.sg.results.text_of(rept))
         return _non_conformant, _reports
 
 
@@ -347,9 +349,10 @@ class OrConstraintComponent(ConstraintComponent):
                 passed_any = False
                 for or_shape in or_shapes:
                     try:
-                        _is_conform, _r = or_shape.validate(
-                            executor, target_graph, focus=v, _evaluation_path=_evaluation_path[:]
-                        )
+                        with self.shape.sg.results.nested():
+                            _is_conform, _r = or_shape.validate(
+                                executor, target_graph, focus=v, _evaluation_path=_evaluation_path[:]
+                            )
                     except ValidationFailure as e:
                         raise e
                     if len(_r):
@@ -361,8 +364,8 @@ class OrConstraintComponent(ConstraintComponent):
                     _reports.append(rept)
         if len(upstream_reports) and self.shape.sg.debug:
             self.shape.logger.debug("sh:or constraint reports will be inspected and not passed to the parent Node:")
-            for v_str, v_node, v_parts in upstream_reports:
-                self.shape.logger.debug(v_str)
+            for rept in upstream_reports:
+                self.shape.logger.debug(self.shape.sg.results.text_of(rept))
         return _non_conformant, _reports
 
 
@@ -463,9 +466,10 @@ class XoneConstraintComponent(ConstraintComponent):
                 passed_count = 0
                 for xone_shape in xone_shapes:
                     try:
-                        _is_conform, _r = xone_shape.validate(
-                            executor, target_graph, focus=v, _evaluation_path=_evaluation_path[:]
-                        )
+                        with self.shape.sg.results.nested():
+                            _is_conform, _r = xone_shape.validate(
+                                executor, target_graph, focus=v, _evaluation_path=_evaluation_path[:]
+                            )
                     except ValidationFailure as e:
                         raise e
                     if len(_r):
@@ -480,6 +484,6 @@ class XoneConstraintComponent(ConstraintComponent):
             self.shape.logger.debug(
                 "sh:xone constraint reports ignored, conformance noted and passed to the parent Node:"
             )
-            for v_str, v_node, v_parts in upstream_reports:
-                self.shape.logger.debug(v_str)
+            for rept in upstream_reports:
+                self.shape.logger.debug(self.shape.sg.results.text_of(rept))
         return _non_conformant, _reports
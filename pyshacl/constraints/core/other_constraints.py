@@ -4,14 +4,15 @@ https://www.w3.org/TR/shacl/#core-components-others
 """
 
 import logging
-from typing import Dict, List, Set, Union, cast
+from typing import Dict, FrozenSet, List, Set, Union, cast
 
 import rdflib
 from rdflib.term import IdentifiedNode
 
-from pyshacl.constraints.constraint_component import ConstraintComponent
+from pyshacl.constraints.constraint_component import ConstraintComponent, ValueCheck
 from pyshacl.consts import RDFS, SH, RDF_type, SH_property
 from pyshacl.errors import ConstraintLoadError, ReportableRuntimeError
+from pyshacl.helper.sparql_remote_helper import batched_select, remote_query_options
 from pyshacl.pytypes import GraphLike, RDFNode, SHACLExecutor
 from pyshacl.rdfutil import stringify_node
 from pyshacl.shape import Shape
@@ -84,16 +85,20 @@ class InConstraintComponent(ConstraintComponent):
         :type focus_value_nodes: dict
         :type _evaluation_path: list
         """
-        reports = []
-        non_conformant = False
-        in_vals = self.in_vals
-        for f, value_nodes in focus_value_nodes.items():
-            for v in value_nodes:
-                if v not in in_vals:
-                    non_conformant = True
-                    rept = self.make_v_result(target_graph, f, value_node=v)
-                    reports.append(rept)
-        return (not non_conformant), reports
+        return self.evaluate_value_checks(target_graph, focus_value_nodes)
+
+    def value_checks(self) -> List[ValueCheck]:
+        return [ValueCheck(False, self.in_vals.__contains__)]
+
+
+def _disallowed_pred_obs(target_graph: GraphLike, v, allowed: FrozenSet) -> List:
+    """
+    The (predicate, object) pairs of the triples of v that have a predicate not in allowed.
+    Only the distinct predicates of v are compared to the allowed ones, and the objects are only looked up
+    for the predicates that are not allowed.
+    """
+    disallowed = [p for p in target_graph.predicates(v, unique=True) if p not in allowed]
+    return [(p, o) for p in disallowed for o in target_graph.objects(v, p)]
 
 
 class ClosedConstraintComponent(ConstraintComponent):
@@ -174,8 +179,46 @@ class ClosedConstraintComponent(ConstraintComponent):
         non_conformant = False
         if not self.is_closed:
             return True, []
+        allowed: FrozenSet = self.shape.compiled_of(self)
 
-        working_shapes = set()
+        if executor.sparql_mode:
+            # Find the triples of all the value nodes that have a predicate not allowed by this closed shape,
+            # in one set-oriented query. The triples are checked again below, to skip ALWAYS_IGNORE.
+            allowed_uris = sorted(p for p in allowed if isinstance(p, rdflib.URIRef))
+            filter_string = (
+                "FILTER (?p NOT IN ({}))".format(", ".join(p.n3() for p in allowed_uris)) if allowed_uris else ""
+            )
+            rows = batched_select(
+                target_graph,
+                (v for value_nodes in focus_value_nodes.values() for v in value_nodes),
+                "v",
+                f"?v ?p ?o . {filter_string}",
+                "?v ?p ?o",
+                **remote_query_options(executor),
+            )
+            v_pred_obs: Dict[RDFNode, List] = {}
+            for v, p, o in rows:
+                v_pred_obs.setdefault(v, []).append((p, o))
+
+        for f, value_nodes in focus_value_nodes.items():
+            for v in value_nodes:
+                if executor.sparql_mode:
+                    pred_obs = v_pred_obs.get(v, ())
+                else:
+                    pred_obs = _disallowed_pred_obs(target_graph, v, allowed)
+                for _p, _o in pred_obs:
+                    if _p in allowed or (_p, _o) in self.ALWAYS_IGNORE:
+                        continue
+                    non_conformant = True
+                    o_node = cast(RDFNode, _o)
+                    p_node = cast(RDFNode, _p)
+                    rept = self.make_v_result(target_graph, f, value_node=o_node, result_path=p_node)
+                    reports.append(rept)
+        return (not non_conformant), reports
+
+    def compile(self) -> FrozenSet:
+        """The predicates allowed by this closed shape: the paths of its property shapes, and the ignored properties."""
+        allowed = set(self.ignored_props)
         for p_shape in self.property_shapes:
             if self.shape.sg.is_filtered_out_shape(p_shape):
                 continue
@@ -184,95 +227,10 @@ class ClosedConstraintComponent(ConstraintComponent):
                 raise ReportableRuntimeError(
                     "The shape pointed to by sh:property does not exist, or is not a well defined SHACL PropertyShape."
                 )
-            working_shapes.add(property_shape)
-        working_paths = set()
-        for w in working_shapes:
-            p = w.path()
+            p = property_shape.path()
             if p:
-                working_paths.add(p)
-
-        if executor.sparql_mode:
-            select_vars_string = ""
-            filter_props_list = []
-            bgp_list = []
-            init_bindings = {}
-            if len(self.ignored_props) > 0:
-                filter_template = "("
-                if len(self.ignored_props) == 1:
-                    filter_template += f"{{P}} != {next(iter(self.ignored_props)).n3()}"
-                else:
-                    this_filter_parts = []
-                    for ig in self.ignored_props:
-                        this_filter_parts.append(f"({{P}} != {ig.n3()})")
-                    filter_template += " && ".join(this_filter_parts)
-                filter_template += ")"
-            else:
-                filter_template = ""
-            for i, f in enumerate(focus_value_nodes.keys()):
-                for j, v in enumerate(focus_value_nodes[f]):
-                    select_vars_string += f"?p{i}_{j} ?o{i}_{j} "
-                    bgp_line = f"OPTIONAL {{ $v{i}_{j} ?p{i}_{j} ?o{i}_{j} . }}"
-                    bgp_list.append(bgp_line)
-                    if filter_template:
-                        filter_props_line = filter_template.replace("{P}", f"?p{i}_{j}")
-                        filter_props_list.append(filter_props_line)
-                    init_bindings[f"v{i}_{j}"] = v
-            bgp_string = "\n".join(bgp_list)
-            if len(filter_props_list) > 1:
-                filter_props_string = "FILTER (" + " && ".join(filter_props_list) + ")"
-            elif len(filter_props_list) == 1:
-                filter_props_string = "FILTER " + filter_props_list[0]
-            else:
-                filter_props_string = ""
-            closed_query = f"SELECT DISTINCT {select_vars_string} {{\n\t{bgp_string}\n\t{filter_props_string}\n}}"
-            try:
-                results = target_graph.query(closed_query, initBindings=init_bindings)
-            except Exception as e:
-                print(e)
-                raise
-            found_fvpo = []
-            if len(results) > 0:
-                for r in results:
-                    assert isinstance(r, rdflib.query.ResultRow)
-                    for i, f in enumerate(focus_value_nodes.keys()):
-                        for j, v in enumerate(focus_value_nodes[f]):
-                            p = r[f"p{i}_{j}"]
-                            o = r[f"o{i}_{j}"]
-                            if p is None or o is None or p == "UNDEF" or o == "UNDEF":
-                                continue
-                            fvpo = (f, v, p, o)
-                            if fvpo in found_fvpo:
-                                continue
-                            found_fvpo.append(fvpo)
-                            # TODO: remove code duplication
-                            if (p, o) in self.ALWAYS_IGNORE:
-                                continue
-                            elif p in self.ignored_props:
-                                continue
-                            elif p in working_paths:
-                                continue
-                            non_conformant = True
-                            o_node = cast(RDFNode, o)
-                            p_node = cast(RDFNode, p)
-                            rept = self.make_v_result(target_graph, f, value_node=o_node, result_path=p_node)
-                            reports.append(rept)
-        else:
-            for f, value_nodes in focus_value_nodes.items():
-                for v in value_nodes:
-                    pred_obs = target_graph.predicate_objects(v)
-                    for _p, _o in pred_obs:
-                        if (_p, _o) in self.ALWAYS_IGNORE:
-                            continue
-                        elif _p in self.ignored_props:
-                            continue
-                        elif _p in working_paths:
-                            continue
-                        non_conformant = True
-                        o_node = cast(RDFNode, _o)
-                        p_node = cast(RDFNode, _p)
-                        rept = self.make_v_result(target_graph, f, value_node=o_node, result_path=p_node)
-                        reports.append(rept)
-        return (not non_conformant), reports
+                allowed.add(p)
+        return frozenset(allowed)
 
 
 class HasValueConstraintComponent(ConstraintComponent):
@@ -327,32 +285,19 @@ class HasValueConstraintComponent(ConstraintComponent):
         :type focus_value_nodes: dict
         :type _evaluation_path: list
         """
-        reports = []
-        non_conformant = False
+        return self.evaluate_value_checks(target_graph, focus_value_nodes)
 
-        for hv in iter(self.has_value_set):
-            _nc, _r = self._evaluate_has_value(target_graph, hv, focus_value_nodes)
-            non_conformant = non_conformant or _nc
-            reports.extend(_r)
-        return (not non_conformant), reports
+    def value_checks(self) -> List[ValueCheck]:
+        return [self._has_value_check(hv) for hv in iter(self.has_value_set)]
 
-    def _evaluate_has_value(self, target_graph, hv, f_v_dict):
-        reports = []
-        non_conformant = False
-        for f, value_nodes in f_v_dict.items():
-            conformant = False
+    @staticmethod
+    def _has_value_check(hv) -> ValueCheck:
+        def check(value_nodes) -> int:
+            # Note, including the value in the report generation here causes this constraint to not pass
+            # SHT validation, though IMHO the value _should_ be included
             for v_node in value_nodes:
                 if v_node == hv:
-                    conformant = True
-                    break
-            if not conformant:
-                non_conformant = True
-                # Note, including the value in the report generation here causes this constraint to not pass
-                # SHT validation, though IMHO the value _should_ be included
-                # if len(value_nodes) == 1:
-                #     a_value_node = next(iter(value_nodes))
-                #     rept = self.make_v_result(f, value_node=a_value_node)
-                # else:
-                rept = self.make_v_result(target_graph, f, value_node=None)
-                reports.append(rept)
-        return non_conformant, reports
+                    return 0
+            return 1
+
+        return ValueCheck(True, check)
@@ -3,14 +3,18 @@
 https://www.w3.org/TR/shacl/#core-components-property-pairs
 """
 
-from typing import Dict, List
+from datetime import datetime, time
+from typing import Any, Dict, List, Optional, Tuple
 
 import rdflib
+from rdflib.namespace import XSD
+from rdflib.term import _NUMERIC_LITERAL_TYPES
 
 from pyshacl.constraints.constraint_component import ConstraintComponent
 from pyshacl.consts import SH
 from pyshacl.errors import ConstraintLoadError, ReportableRuntimeError
-from pyshacl.helper.path_helper import shacl_path_to_sparql_path
+from pyshacl.helper.path_helper import objects_of_each, shacl_path_to_sparql_path
+from pyshacl.helper.sparql_remote_helper import batched_value_nodes, remote_query_options
 from pyshacl.pytypes import GraphLike, SHACLExecutor
 from pyshacl.rdfutil import stringify_node
 from pyshacl.shape import Shape
@@ -25,6 +29,63 @@ SH_DisjointConstraintComponent = SH.DisjointConstraintComponent
 SH_LessThanConstraintComponent = SH.LessThanConstraintComponent
 SH_LessThanOrEqualsConstraintComponent = SH.LessThanOrEqualsConstraintComponent
 
+_ORDERED_DATATYPES = (XSD.date, XSD.dateTime, XSD.time)
+
+
+def _order_key(node) -> Optional[Tuple[Any, Any]]:
+    """
+    The kind and sort key of a node for sh:lessThan and sh:lessThanOrEquals, or None if it has none.
+    Two nodes of the same kind compare by their sort keys exactly as _compare_lt and _compare_ltoe compare them:
+    IRIs and string literals as strings, numeric literals by value (like RDFLib does), and
+    xsd:date, xsd:dateTime and xsd:time literals by value within their datatype.
+    """
+    if isinstance(node, rdflib.URIRef):
+        return str, str(node)
+    elif not isinstance(node, rdflib.Literal):
+        return None
+    value = node.value
+    if isinstance(value, str):
+        return str, value
+    elif value is None or node.ill_typed:
+        return None
+    datatype = node.datatype
+    if datatype in _NUMERIC_LITERAL_TYPES:
+        if value != value:
+            # NaN has no place in the order
+            return None
+        return _NUMERIC_LITERAL_TYPES, value
+    elif datatype in _ORDERED_DATATYPES:
+        if isinstance(value, (datetime, time)):
+            # RDFLib orders naive values before aware ones
+            return datatype, (value.tzinfo is not None and value.utcoffset() is not None, value)
+        return datatype, value
+    return None
+
+
+def _bounds_hold(value_nodes, compare_values, or_equal: bool) -> bool:
+    """
+    True if the greatest value node is less than (or equal to) the least compare value, so every pair conforms.
+    False if that is not known, because some pair does not conform, or the nodes are not all of one kind.
+    """
+    if len(value_nodes) < 1 or len(compare_values) < 1:
+        return not any(isinstance(v, rdflib.BNode) for v in value_nodes)
+    kind = None
+    value_keys: List[Any] = []
+    compare_keys: List[Any] = []
+    for nodes, keys in ((value_nodes, value_keys), (compare_values, compare_keys)):
+        for node in nodes:
+            found = _order_key(node)
+            if found is None:
+                return False
+            if kind is None:
+                kind = found[0]
+            elif found[0] != kind:
+                return False
+            keys.append(found[1])
+    if or_equal:
+        return max(value_keys) <= min(compare_keys)
+    return max(value_keys) < min(compare_keys)
+
 
 class EqualsConstraintComponent(ConstraintComponent):
     """
@@ -83,38 +144,22 @@ class EqualsConstraintComponent(ConstraintComponent):
 
         for eq in iter(self.property_compare_set):
             if executor.sparql_mode:
-                _nc, _r = self._evaluate_property_equals_sparql(eq, target_graph, focus_value_nodes)
+                _nc, _r = self._evaluate_property_equals_sparql(executor, eq, target_graph, focus_value_nodes)
             else:
                 _nc, _r = self._evaluate_property_equals_rdflib(eq, target_graph, focus_value_nodes)
             non_conformant = non_conformant or _nc
             reports.extend(_r)
         return (not non_conformant), reports
 
-    def _evaluate_property_equals_sparql(self, eq, target_graph, f_v_dict):
+    def _evaluate_property_equals_sparql(self, executor, eq, target_graph, f_v_dict):
         reports = []
         non_conformant = False
         prefixes = dict(target_graph.namespaces())
         eq_path = shacl_path_to_sparql_path(self.shape.sg, eq, prefixes=prefixes)
-        eq_lookup_query = f"SELECT DISTINCT {' '.join(f'?v{i}' for i, _ in enumerate(f_v_dict))} WHERE {{\n"
-        init_bindings = {}
-        f_eq_results = {}
-        for i, f in enumerate(f_v_dict.keys()):
-            eq_lookup_query += f"OPTIONAL {{ $f{i} {eq_path} ?v{i} . }}\n"
-            init_bindings[f"f{i}"] = f
-            f_eq_results[f] = set()
-        eq_lookup_query += "}"
-        try:
-            results = target_graph.query(eq_lookup_query, initBindings=init_bindings)
-        except Exception as e:
-            print(e)
-            raise
-        if len(results) > 0:
-            for r in results:
-                for i, f in enumerate(f_v_dict.keys()):
-                    val_i = r[i]
-                    if val_i is None or val_i == "UNDEF":
-                        continue
-                    f_eq_results[f].add(val_i)
+        # Look up the sh:equals values for the whole focus set at once, in batched queries
+        f_eq_results = batched_value_nodes(
+            target_graph, list(f_v_dict.keys()), eq_path, **remote_query_options(executor)
+        )
         for i, f in enumerate(f_v_dict.keys()):
             value_node_set = set(f_v_dict[f])
             compare_values = f_eq_results[f]
@@ -135,9 +180,11 @@ class EqualsConstraintComponent(ConstraintComponent):
     def _evaluate_property_equals_rdflib(self, eq, target_graph, f_v_dict):
         reports = []
         non_conformant = False
+        # Look up the values of eq for all of the focus nodes together
+        f_compare_values = objects_of_each(target_graph, f_v_dict.keys(), eq)
         for f, value_nodes in f_v_dict.items():
             value_node_set = set(value_nodes)
-            compare_values = set(target_graph.objects(f, eq))
+            compare_values = f_compare_values[f]
             value_nodes_missing = value_node_set.difference(compare_values)
             compare_values_missing = compare_values.difference(value_node_set)
             if len(value_nodes_missing) > 0 or len(compare_values_missing) > 0:
@@ -210,38 +257,22 @@ class DisjointConstraintComponent(ConstraintComponent):
 
         for dj in iter(self.property_compare_set):
             if executor.sparql_mode:
-                _nc, _r = self._evaluate_property_disjoint_sparql(dj, target_graph, focus_value_nodes)
+                _nc, _r = self._evaluate_property_disjoint_sparql(executor, dj, target_graph, focus_value_nodes)
             else:
                 _nc, _r = self._evaluate_property_disjoint_rdflib(dj, target_graph, focus_value_nodes)
             non_conformant = non_conformant or _nc
             reports.extend(_r)
         return (not non_conformant), reports
 
-    def _evaluate_property_disjoint_sparql(self, dj, target_graph, f_v_dict):
+    def _evaluate_property_disjoint_sparql(self, executor, dj, target_graph, f_v_dict):
         reports = []
         non_conformant = False
         prefixes = dict(target_graph.namespaces())
         dj_path = shacl_path_to_sparql_path(self.shape.sg, dj, prefixes=prefixes)
-        dj_lookup_query = f"SELECT DISTINCT {' '.join(f'?v{i}' for i, _ in enumerate(f_v_dict))} WHERE {{\n"
-        init_bindings = {}
-        f_dj_results = {}
-        for i, f in enumerate(f_v_dict.keys()):
-            dj_lookup_query += f"OPTIONAL {{ $f{i} {dj_path} ?v{i} . }}\n"
-            init_bindings[f"f{i}"] = f
-            f_dj_results[f] = set()
-        dj_lookup_query += "}"
-        try:
-            results = target_graph.query(dj_lookup_query, initBindings=init_bindings)
-        except Exception as e:
-            print(e)
-            raise
-        if len(results) > 0:
-            for r in results:
-                for i, f in enumerate(f_v_dict.keys()):
-                    val_i = r[i]
-                    if val_i is None or val_i == "UNDEF":
-                        continue
-                    f_dj_results[f].add(val_i)
+        # Look up the sh:disjoint values for the whole focus set at once, in batched queries
+        f_dj_results = batched_value_nodes(
+            target_graph, list(f_v_dict.keys()), dj_path, **remote_query_options(executor)
+        )
         for i, f in enumerate(f_v_dict.keys()):
             value_node_set = set(f_v_dict[f])
             compare_values = f_dj_results[f]
@@ -258,9 +289,11 @@ class DisjointConstraintComponent(ConstraintComponent):
     def _evaluate_property_disjoint_rdflib(self, dj, target_graph, f_v_dict):
         reports = []
         non_conformant = False
+        # Look up the values of dj for all of the focus nodes together
+        f_compare_values = objects_of_each(target_graph, f_v_dict.keys(), dj)
         for f, value_nodes in f_v_dict.items():
             value_node_set = set(value_nodes)
-            compare_values = set(target_graph.objects(f, dj))
+            compare_values = f_compare_values[f]
             common_nodes = value_node_set.intersection(compare_values)
             if len(common_nodes) > 0:
                 non_conformant = True
@@ -337,7 +370,7 @@ class LessThanConstraintComponent(ConstraintComponent):
             if isinstance(lt, rdflib.Literal) or isinstance(lt, rdflib.BNode):
                 raise ReportableRuntimeError("Value of sh:lessThan MUST be a URI Identifier.")
             if executor.sparql_mode:
-                _nc, _r = self._evaluate_less_than_sparql(lt, target_graph, focus_value_nodes)
+                _nc, _r = self._evaluate_less_than_sparql(executor, lt, target_graph, focus_value_nodes)
             else:
                 _nc, _r = self._evaluate_less_than_rdflib(lt, target_graph, focus_value_nodes)
             non_conformant = non_conformant or _nc
@@ -347,6 +380,9 @@ class LessThanConstraintComponent(ConstraintComponent):
     def _compare_lt(self, value_node_set, compare_values, datagraph, f):
         non_conformant = False
         reports = []
+        if _bounds_hold(value_node_set, compare_values, or_equal=False):
+            # Checking the greatest value node against the least compare value is enough
+            return non_conformant, reports
         for value_node in iter(value_node_set):
             if isinstance(value_node, rdflib.BNode):
                 raise ReportableRuntimeError("Cannot use sh:lessThan to compare a BlankNode.")
@@ -379,31 +415,15 @@ class LessThanConstraintComponent(ConstraintComponent):
                 reports.append(rept)
         return non_conformant, reports
 
-    def _evaluate_less_than_sparql(self, lt, target_graph, f_v_dict):
+    def _evaluate_less_than_sparql(self, executor, lt, target_graph, f_v_dict):
         reports = []
         non_conformant = False
         prefixes = dict(target_graph.namespaces())
         lt_path = shacl_path_to_sparql_path(self.shape.sg, lt, prefixes=prefixes)
-        lt_lookup_query = f"SELECT DISTINCT {' '.join(f'?v{i}' for i, _ in enumerate(f_v_dict))} WHERE {{\n"
-        init_bindings = {}
-        f_lt_results = {}
-        for i, f in enumerate(f_v_dict.keys()):
-            lt_lookup_query += f"OPTIONAL {{ $f{i} {lt_path} ?v{i} . }}\n"
-            init_bindings[f"f{i}"] = f
-            f_lt_results[f] = set()
-        lt_lookup_query += "}"
-        try:
-            results = target_graph.query(lt_lookup_query, initBindings=init_bindings)
-        except Exception as e:
-            print(e)
-            raise
-        if len(results) > 0:
-            for r in results:
-                for i, f in enumerate(f_v_dict.keys()):
-                    val_i = r[i]
-                    if val_i is None or val_i == "UNDEF":
-                        continue
-                    f_lt_results[f].add(val_i)
+        # Look up the sh:lessThan values for the whole focus set at once, in batched queries
+        f_lt_results = batched_value_nodes(
+            target_graph, list(f_v_dict.keys()), lt_path, **remote_query_options(executor)
+        )
         for i, f in enumerate(f_v_dict.keys()):
             value_node_set = set(f_v_dict[f])
             compare_values = f_lt_results[f]
@@ -415,9 +435,11 @@ class LessThanConstraintComponent(ConstraintComponent):
     def _evaluate_less_than_rdflib(self, lt, target_graph, f_v_dict):
         reports = []
         non_conformant = False
+        # Look up the values of lt for all of the focus nodes together
+        f_compare_values = objects_of_each(target_graph, f_v_dict.keys(), lt)
         for f, value_nodes in f_v_dict.items():
             value_node_set = set(value_nodes)
-            compare_values = set(target_graph.objects(f, lt))
+            compare_values = f_compare_values[f]
             _nc, _r = self._compare_lt(value_node_set, compare_values, target_graph, f)
             non_conformant = non_conformant or _nc
             reports.extend(_r)
@@ -488,7 +510,7 @@ class LessThanOrEqualsConstraintComponent(ConstraintComponent):
             if isinstance(lt, rdflib.Literal) or isinstance(lt, rdflib.BNode):
                 raise ReportableRuntimeError("Value of sh:lessThanOrEquals MUST be a URI Identifier.")
             if executor.sparql_mode:
-                _nc, _r = self._evaluate_ltoe_sparql(lt, target_graph, focus_value_nodes)
+                _nc, _r = self._evaluate_ltoe_sparql(executor, lt, target_graph, focus_value_nodes)
             else:
                 _nc, _r = self._evaluate_ltoe_rdflib(lt, target_graph, focus_value_nodes)
             non_conformant = non_conformant or _nc
@@ -498,6 +520,9 @@ class LessThanOrEqualsConstraintComponent(ConstraintComponent):
     def _compare_ltoe(self, value_node_set, compare_values, datagraph, f):
         non_conformant = False
         reports = []
+        if _bounds_hold(value_node_set, compare_values, or_equal=True):
+            # Checking the greatest value node against the least compare value is enough
+            return non_conformant, reports
         for value_node in iter(value_node_set):
             if isinstance(value_node, rdflib.BNode):
                 raise ReportableRuntimeError("Cannot use sh:lessThanOrEquals to compare a BlankNode.")
@@ -530,31 +555,15 @@ class LessThanOrEqualsConstraintComponent(ConstraintComponent):
                 reports.append(rept)
         return non_conformant, reports
 
-    def _evaluate_ltoe_sparql(self, ltoe, target_graph, f_v_dict):
+    def _evaluate_ltoe_sparql(self, executor, ltoe, target_graph, f_v_dict):
         reports = []
         non_conformant = False
         prefixes = dict(target_graph.namespaces())
         ltoe_path = shacl_path_to_sparql_path(self.shape.sg, ltoe, prefixes=prefixes)
-        ltoe_lookup_query = f"SELECT DISTINCT {' '.join(f'?v{i}' for i, _ in enumerate(f_v_dict))} WHERE {{\n"
-        init_bindings = {}
-        f_ltoe_results = {}
-        for i, f in enumerate(f_v_dict.keys()):
-            ltoe_lookup_query += f"OPTIONAL {{ $f{i} {ltoe_path} ?v{i} . }}\n"
-            init_bindings[f"f{i}"] = f
-            f_ltoe_results[f] = set()
-        ltoe_lookup_query += "}"
-        try:
-            results = target_graph.query(ltoe_lookup_query, initBindings=init_bindings)
-        except Exception as e:
-            print(e)
-            raise
-        if len(results) > 0:
-            for r in results:
-                for i, f in enumerate(f_v_dict.keys()):
-                    val_i = r[i]
-                    if val_i is None or val_i == "UNDEF":
-                        continue
-                    f_ltoe_results[f].add(val_i)
+        # Look up the sh:lessThanOrEquals values for the whole focus set at once, in batched queries
+        f_ltoe_results = batched_value_nodes(
+            target_graph, list(f_v_dict.keys()), ltoe_path, **remote_query_options(executor)
+        )
         for i, f in enumerate(f_v_dict.keys()):
             value_node_set = set(f_v_dict[f])
             compare_values = f_ltoe_results[f]
@@ -566,9 +575,11 @@ class LessThanOrEqualsConstraintComponent(ConstraintComponent):
     def _evaluate_ltoe_rdflib(self, ltoe, target_graph, f_v_dict):
         reports = []
         non_conformant = False
+        # Look up the values of ltoe for all of the focus nodes together
+        f_compare_values = objects_of_each(target_graph, f_v_dict.keys(), ltoe)
         for f, value_nodes in f_v_dict.items():
             value_node_set = set(value_nodes)
-            compare_values = set(target_graph.objects(f, ltoe))
+            compare_values = f_compare_values[f]
             _nc, _r = self._compare_ltoe(value_node_set, compare_values, target_graph, f)
             non_conformant = non_conformant or _nc
             reports.extend(_r)
@@ -3,7 +3,7 @@
 https://www.w3.org/TR/shacl/#core-components-shape
 """
 
-from textwrap import indent
+from collections import Counter
 from typing import Dict, List, Optional
 from warnings import warn
 
@@ -12,7 +12,6 @@ import rdflib
 from pyshacl.constraints.constraint_component import ConstraintComponent
 from pyshacl.consts import (
     SH,
-    SH_detail,
     SH_node,
     SH_NodeConstraintComponent,
     SH_property,
@@ -27,6 +26,7 @@ from pyshacl.errors import (
 )
 from pyshacl.pytypes import GraphLike, SHACLExecutor
 from pyshacl.rdfutil import stringify_node
+from pyshacl.report import NO_TERM
 from pyshacl.shape import Shape
 
 SH_QualifiedValueCountConstraintComponent = SH.QualifiedValueConstraintComponent
@@ -125,13 +125,20 @@ class PropertyConstraintComponent(ConstraintComponent):
                 f"Ensure it has the correct type (sh:PropertyShape) and all required properties."
             )
 
-        for f, value_nodes in focus_value_nodes.items():
-            for v in value_nodes:
-                _is_conform, _r = found_prop_shape.validate(
-                    executor, target_graph, focus=v, _evaluation_path=_evaluation_path[:]
-                )
-                _non_conformant = _non_conformant or (not _is_conform)
-                _reports.extend(_r)
+        if executor.sparql_mode:
+            # Validate all the value nodes at once, so the property shape finds their values with batched queries.
+            # A value node shared by several focus nodes is validated again for each extra focus node.
+            counts = Counter(v for value_nodes in focus_value_nodes.values() for v in value_nodes)
+            focus_runs: List = [list(counts)]
+            focus_runs.extend(v for v, n in counts.items() for _ in range(n - 1))
+        else:
+            focus_runs = [v for value_nodes in focus_value_nodes.values() for v in value_nodes]
+        for focus in focus_runs:
+            _is_conform, _r = found_prop_shape.validate(
+                executor, target_graph, focus=focus, _evaluation_path=_evaluation_path[:]
+            )
+            _non_conformant = _non_conformant or (not _is_conform)
+            _reports.extend(_r)
         return _non_conformant, _reports
 
 
@@ -222,26 +229,21 @@ class NodeConstraintComponent(ConstraintComponent):
             )
         elif found_node_shape.is_property_shape:
             raise ReportableRuntimeError("Shape pointed to by sh:node is not a well-formed SHACL NodeShape.")
+        results = self.shape.sg.results
         for f, value_nodes in focus_value_nodes.items():
             for v in value_nodes:
-                _is_conform, _r = found_node_shape.validate(
-                    executor, target_graph, focus=v, _evaluation_path=_evaluation_path[:]
-                )
+                with results.nested():
+                    _is_conform, _r = found_node_shape.validate(
+                        executor, target_graph, focus=v, _evaluation_path=_evaluation_path[:]
+                    )
                 # Create a failure for this constraint component if any failures exist
                 if (not _is_conform) or len(_r) > 0:
                     _non_conformant = True
-                    rept_text, rept_node, rept_triples = self.make_v_result(target_graph, f, value_node=v)
-                    # Nest the others underneath via sh:detail
-                    rept_text = f"{rept_text}\tDetails:\n"
-                    for text_sub, node_sub, triples_sub in _r:
-                        # Add text of validation result in nested details section
-                        rept_text += indent(text_sub, "\t\t")
-                        # Add a triple connecting the new validation result to the
-                        # validation result for the nested node
-                        rept_triples.append((rept_node, SH_detail, node_sub))
-                        # Extend the triples in the report with the ones from the nested result
-                        rept_triples.extend(triples_sub)
-                    _reports.append((rept_text, rept_node, rept_triples))
+                    rept = self.make_v_result(target_graph, f, value_node=v)
+                    if rept != NO_TERM:
+                        # Nest the others underneath via sh:detail
+                        results.add_details(rept, _r)
+                    _reports.append(rept)
         return _non_conformant, _reports
 
 
@@ -415,17 +417,19 @@ class QualifiedValueShapeConstraintComponent(ConstraintComponent):
             number_conforms = 0
             for v in value_nodes:
                 try:
-                    _is_conform, _r = other_shape.validate(
-                        executor, target_graph, focus=v, _evaluation_path=_evaluation_path[:]
-                    )
+                    with self.shape.sg.results.nested():
+                        _is_conform, _r = other_shape.validate(
+                            executor, target_graph, focus=v, _evaluation_path=_evaluation_path[:]
+                        )
                     if len(_r):
                         upstream_reports.extend(_r)
                     if _is_conform:
                         _conforms_to_sibling = False
                         for sibling_shape in sibling_shapes:
-                            _c2, _r = sibling_shape.validate(
-                                executor, target_graph, focus=v, _evaluation_path=_evaluation_path[:]
-                            )
+                            with self.shape.sg.results.nested():
+                                _c2, _r = sibling_shape.validate(
+                                    executor, target_graph, focus=v, _evaluation_path=_evaluation_path[:]
+                                )
                             _conforms_to_sibling = _conforms_to_sibling or _c2
                         if not _conforms_to_sibling:
                             number_conforms += 1
@@ -443,6 +447,6 @@ class QualifiedValueShapeConstraintComponent(ConstraintComponent):
             self.shape.logger.debug(
                 "sh:qualifiedValueShape constraint reports will be ignored and not passed to the parent Node:"
             )
-            for v_str, v_node, v_parts in upstream_reports:
-                self.shape.logger.debug(v_str)
+            for rept in upstream_reports:
+                self.shape.logger.debug(self.shape.sg.results.text_of(rept))
         return _non_conformant, _reports
@@ -4,15 +4,16 @@ https://www.w3.org/TR/shacl/#core-components-string
 """
 
 import logging
-import re
-from typing import Dict, List, cast
+from typing import Dict, FrozenSet, List, cast
 
 import rdflib
 from rdflib.namespace import XSD
 
-from pyshacl.constraints.constraint_component import ConstraintComponent
+from pyshacl.constraints.constraint_component import ConstraintComponent, ValueCheck
 from pyshacl.consts import RDF, SH, XSD_WHOLE_INTEGERS
 from pyshacl.errors import ConstraintLoadError, ReportableRuntimeError
+from pyshacl.helper.regex_helper import compile_pattern, compile_pattern_set, get_regex_engine, pattern_flags
+from pyshacl.helper.vectorized import length_batch
 from pyshacl.pytypes import GraphLike, RDFNode, SHACLExecutor
 from pyshacl.rdfutil import stringify_node
 from pyshacl.shape import Shape
@@ -32,6 +33,9 @@ SH_maxLength = SH.maxLength
 SH_languageIn = SH.languageIn
 SH_uniqueLang = SH.uniqueLang
 
+# The most value node strings that a multi-pattern check remembers the matches of
+PATTERN_SET_MEMO_SIZE = 4096
+
 
 class StringBasedConstraintBase(ConstraintComponent):
     """
@@ -66,7 +70,7 @@ class StringBasedConstraintBase(ConstraintComponent):
             v_string = str(v)
         return v_string
 
-    def _evaluate_string_rule(self, r, target_graph, f_v_dict):
+    def _string_rule_checks(self, r) -> List[ValueCheck]:
         raise NotImplementedError()
 
     def evaluate(
@@ -78,16 +82,15 @@ class StringBasedConstraintBase(ConstraintComponent):
         :type focus_value_nodes: dict
         :type _evaluation_path: list
         """
-        reports = []
-        non_conformant = False
+        return self.evaluate_value_checks(target_graph, focus_value_nodes)
 
+    def value_checks(self) -> List[ValueCheck]:
+        checks: List[ValueCheck] = []
         for r in self.string_rules:
-            _nc, _r = self._evaluate_string_rule(r, target_graph, focus_value_nodes)
-            non_conformant = non_conformant or _nc
-            reports.extend(_r)
+            checks.extend(self._string_rule_checks(r))
             if not self.allow_multi_rules:
                 break
-        return (not non_conformant), reports
+        return checks
 
 
 class MinLengthConstraintComponent(StringBasedConstraintBase):
@@ -146,29 +149,23 @@ class MinLengthConstraintComponent(StringBasedConstraintBase):
         m = "String length not >= {}".format(stringify_node(datagraph, self.string_rules[0]))
         return [rdflib.Literal(m)]
 
-    def _evaluate_string_rule(self, r, target_graph, f_v_dict):
-        reports = []
-        non_conformant = False
+    def _string_rule_checks(self, r) -> List[ValueCheck]:
         assert isinstance(r, rdflib.Literal)
         min_len = r.value
         if min_len < 0:
             raise ReportableRuntimeError("Minimum length cannot be less than zero!")
-        for f, value_nodes in f_v_dict.items():
-            for v in value_nodes:
-                flag = False
-                if min_len == 0:
-                    flag = True  # min len zero always passes
-                elif isinstance(v, rdflib.BNode):
-                    # blank nodes cannot pass minLen validation
-                    pass
-                else:
-                    v_string = self.value_node_to_string(v)
-                    flag = len(v_string) >= min_len
-                if not flag:
-                    non_conformant = True
-                    rept = self.make_v_result(target_graph, f, value_node=v)
-                    reports.append(rept)
-        return non_conformant, reports
+        if min_len == 0:
+            # min len zero always passes
+            return []
+        value_node_to_string = self.value_node_to_string
+
+        def check(v) -> bool:
+            if isinstance(v, rdflib.BNode):
+                # blank nodes cannot pass minLen validation
+                return False
+            return len(value_node_to_string(v)) >= min_len
+
+        return [ValueCheck(False, check, length_batch(value_node_to_string, lambda lengths: lengths >= min_len))]
 
 
 class MaxLengthConstraintComponent(StringBasedConstraintBase):
@@ -226,27 +223,20 @@ class MaxLengthConstraintComponent(StringBasedConstraintBase):
         m = "String length not <= {}".format(stringify_node(datagraph, self.string_rules[0]))
         return [rdflib.Literal(m)]
 
-    def _evaluate_string_rule(self, r, target_graph, f_v_dict):
-        reports = []
-        non_conformant = False
+    def _string_rule_checks(self, r) -> List[ValueCheck]:
         assert isinstance(r, rdflib.Literal)
         max_len = r.value
         if max_len < 0:
             raise ReportableRuntimeError("Maximum length cannot be less than zero!")
-        for f, value_nodes in f_v_dict.items():
-            for v in value_nodes:
-                flag = False
-                if isinstance(v, rdflib.BNode):
-                    # blank nodes cannot pass minLen validation
-                    pass
-                else:
-                    v_string = self.value_node_to_string(v)
-                    flag = len(v_string) <= max_len
-                if not flag:
-                    non_conformant = True
-                    rept = self.make_v_result(target_graph, f, value_node=v)
-                    reports.append(rept)
-        return non_conformant, reports
+        value_node_to_string = self.value_node_to_string
+
+        def check(v) -> bool:
+            if isinstance(v, rdflib.BNode):
+                # blank nodes cannot pass maxLen validation
+                return False
+            return len(value_node_to_string(v)) <= max_len
+
+        return [ValueCheck(False, check, length_batch(value_node_to_string, lambda lengths: lengths <= max_len))]
 
 
 class PatternConstraintComponent(StringBasedConstraintBase):
@@ -283,23 +273,17 @@ class PatternConstraintComponent(StringBasedConstraintBase):
         else:
             self.flags = None
 
-        re_flags = 0
-        if self.flags:
-            flags = str(self.flags.value).lower()
-            case_insensitive = 'i' in flags
-            if case_insensitive:
-                re_flags |= re.I
-            m = 'm' in flags
-            if m:
-                re_flags |= re.M
+        self.re_flags = pattern_flags(str(self.flags.value) if self.flags else None)
+        self.re_patterns: Dict[rdflib.Literal, str] = {}
         self.compiled_cache = {}
         for p in patterns_found:
             if p.value is not None and len(p.value) > 1:
                 re_pattern = str(p.value)
             else:
                 re_pattern = str(p)
-            re_matcher = re.compile(re_pattern, re_flags)
-            self.compiled_cache[p] = re_matcher
+            self.re_patterns[p] = re_pattern
+            # Compiled patterns are shared by every shape, and every validation run
+            self.compiled_cache[p] = compile_pattern(re_pattern, self.re_flags)
 
     @classmethod
     def constraint_parameters(cls) -> List[rdflib.URIRef]:
@@ -327,28 +311,51 @@ class PatternConstraintComponent(StringBasedConstraintBase):
             m = "Value does not match every pattern in ('{}')".format(rules)
         return [rdflib.Literal(m)]
 
-    def _evaluate_string_rule(self, r, target_graph, f_v_dict):
-        reports = []
-        non_conformant = False
+    def value_checks_key(self) -> str:
+        # The checks hold patterns compiled with the regex engine, so they are compiled again when it changes
+        return get_regex_engine()
+
+    def value_checks(self) -> List[ValueCheck]:
+        patterns = tuple(self.re_patterns[cast(rdflib.Literal, r)] for r in self.string_rules)
+        matched_by = compile_pattern_set(patterns, self.re_flags)
+        if matched_by is None:
+            return super(PatternConstraintComponent, self).value_checks()
+        # Every pattern is matched against the string of a value node at once, the first time any of them checks it
+        value_node_to_string = self.value_node_to_string
+        matched_memo: Dict[str, FrozenSet[int]] = {}
+
+        def make_check(i: int):
+            def check(v) -> bool:
+                if isinstance(v, rdflib.BNode):
+                    # blank nodes cannot pass pattern validation
+                    return False
+                v_string = value_node_to_string(v)
+                try:
+                    matched = matched_memo[v_string]
+                except KeyError:
+                    if len(matched_memo) >= PATTERN_SET_MEMO_SIZE:
+                        matched_memo.clear()
+                    matched = matched_memo[v_string] = matched_by(v_string)
+                return i in matched
+
+            return check
+
+        return [ValueCheck(False, make_check(i)) for i in range(len(patterns))]
+
+    def _string_rule_checks(self, r) -> List[ValueCheck]:
         re_matcher = self.compiled_cache.get(r, None)
         if re_matcher is None:
             raise RuntimeError(f"No compiled regex for {r}")
-        for f, value_nodes in f_v_dict.items():
-            for v in value_nodes:
-                match = False
-                if isinstance(v, rdflib.BNode):
-                    # blank nodes cannot pass pattern validation
-                    pass
-                else:
-                    v_string = self.value_node_to_string(v)
-                    match = re_matcher.match(v_string)
-                    if not match:
-                        match = re_matcher.search(v_string)
-                if not match:
-                    non_conformant = True
-                    rept = self.make_v_result(target_graph, f, value_node=v)
-                    reports.append(rept)
-        return non_conformant, reports
+        search = re_matcher.search
+        value_node_to_string = self.value_node_to_string
+
+        def check(v) -> bool:
+            if isinstance(v, rdflib.BNode):
+                # blank nodes cannot pass pattern validation
+                return False
+            return search(value_node_to_string(v)) is not None
+
+        return [ValueCheck(False, check)]
 
 
 class LanguageInConstraintComponent(StringBasedConstraintBase):
@@ -392,9 +399,7 @@ class LanguageInConstraintComponent(StringBasedConstraintBase):
         m = "String language is not in {}".format(stringify_node(self.shape.sg.graph, self.string_rules[0]))
         return [rdflib.Literal(m)]
 
-    def _evaluate_string_rule(self, r, target_graph, f_v_dict):
-        reports = []
-        non_conformant = False
+    def _string_rule_checks(self, r) -> List[ValueCheck]:
         languages_need = set()
         sg = self.shape.sg.graph
         try:
@@ -411,29 +416,23 @@ class LanguageInConstraintComponent(StringBasedConstraintBase):
                 languages_need.add(str(lang_in.value).lower())
         except (KeyError, AttributeError, ValueError):
             raise ReportableRuntimeError("Value of sh:languageIn must be a RDF List")
-        wildcard = False
-        if '*' in languages_need:
-            wildcard = True
-        for f, value_nodes in f_v_dict.items():
-            for v in value_nodes:
-                flag = False
-                if isinstance(v, rdflib.Literal):
-                    lang = v.language
-                    if lang:
-                        if wildcard:
-                            flag = True
-                        elif str(lang).lower() in languages_need:
-                            flag = True
-                        else:
-                            lang_parts = str(lang).split('-')
-                            first_part = lang_parts[0]
-                            if str(first_part).lower() in languages_need:
-                                flag = True
-                if not flag:
-                    non_conformant = True
-                    rept = self.make_v_result(target_graph, f, value_node=v)
-                    reports.append(rept)
-        return non_conformant, reports
+        wildcard = '*' in languages_need
+
+        def check(v) -> bool:
+            if not isinstance(v, rdflib.Literal):
+                return False
+            lang = v.language
+            if not lang:
+                return False
+            if wildcard:
+                return True
+            elif str(lang).lower() in languages_need:
+                return True
+            lang_parts = str(lang).split('-')
+            first_part = lang_parts[0]
+            return str(first_part).lower() in languages_need
+
+        return [ValueCheck(False, check)]
 
 
 class UniqueLangConstraintComponent(StringBasedConstraintBase):
@@ -485,14 +484,13 @@ class UniqueLangConstraintComponent(StringBasedConstraintBase):
     def make_generic_messages(self, datagraph: GraphLike, focus_node, value_node) -> List[rdflib.Literal]:
         return [rdflib.Literal("More than one String shares the same Language")]
 
-    def _evaluate_string_rule(self, is_unique_lang, target_graph, f_v_dict):
+    def _string_rule_checks(self, is_unique_lang) -> List[ValueCheck]:
         if not is_unique_lang:
             # why even have the constraint if it is set to false?
-            return False, []
-        reports = []
-        non_conformant = False
-        for f, value_nodes in f_v_dict.items():
-            found_langs = dict()
+            return []
+
+        def check(value_nodes) -> int:
+            found_langs = set()
             found_duplicates = set()
             for v in value_nodes:
                 if isinstance(v, rdflib.Literal):
@@ -502,17 +500,15 @@ class UniqueLangConstraintComponent(StringBasedConstraintBase):
                         if low_lang in found_langs:
                             found_duplicates.add(low_lang)
                         else:
-                            found_langs[low_lang] = lang
+                            found_langs.add(low_lang)
                         # TODO: determine if there is duplicate matching on parts of multi-part langs.
                         #  lang_parts = str(lang).split('-')
                         #  first_part = lang_parts[0]
                         #  if str(first_part).lower() in languages_need:
                         #      flag = True
-            for d in iter(found_duplicates):
-                non_conformant = True
-                # Adding value_node here causes SHT validation to fail.
-                # IMHO it should be present
-                # rept = self.make_v_result(target_graph, f, value_node=found_langs[d])
-                rept = self.make_v_result(target_graph, f, value_node=None)
-                reports.append(rept)
-        return non_conformant, reports
+            # One result for each duplicated language, without a value node.
+            # Adding value_node here causes SHT validation to fail.
+            # IMHO it should be present
+            return len(found_duplicates)
+
+        return [ValueCheck(True, check)]
@@ -11,7 +11,7 @@ import rdflib
 from rdflib.namespace import XSD
 from rdflib.term import Literal, URIRef
 
-from pyshacl.constraints.constraint_component import ConstraintComponent
+from pyshacl.constraints.constraint_component import ConstraintComponent, ValueCheck
 from pyshacl.consts import (
     RDF,
     RDFS,
@@ -28,8 +28,9 @@ from pyshacl.consts import (
     SH_nodeKind,
 )
 from pyshacl.errors import ConstraintLoadError
+from pyshacl.helper.sparql_remote_helper import batched_select, remote_query_options
 from pyshacl.pytypes import GraphLike, SHACLExecutor
-from pyshacl.rdfutil import stringify_node
+from pyshacl.rdfutil import literal_value, stringify_node
 from pyshacl.shape import Shape
 
 RDF_langString = RDF.langString
@@ -100,7 +101,7 @@ class ClassConstraintComponent(ConstraintComponent):
         non_conformant = False
         if executor.sparql_mode:
             for c in self.class_rules:
-                _n, _r = self._evaluate_class_rules_sparql(target_graph, focus_value_nodes, c)
+                _n, _r = self._evaluate_class_rules_sparql(executor, target_graph, focus_value_nodes, c)
                 non_conformant = non_conformant or _n
                 reports.extend(_r)
         else:
@@ -110,10 +111,33 @@ class ClassConstraintComponent(ConstraintComponent):
                 reports.extend(_r)
         return (not non_conformant), reports
 
-    def _evaluate_class_rules_sparql(self, target_graph, f_v_dict, class_rule):
+    def _evaluate_class_rules_sparql(self, executor, target_graph, f_v_dict, class_rule):
         reports = []
         non_conformant = False
-        sparql_ask = """ASK {$value rdf:type/rdfs:subClassOf* $class .}"""
+        if isinstance(class_rule, rdflib.BNode):
+            # A blank node class can't be written into the query, so it is bound in an ASK for each value node
+            sparql_ask = """ASK {$value rdf:type/rdfs:subClassOf* $class .}"""
+
+            def has_class(v):
+                return target_graph.query(sparql_ask, initBindings={"value": v, "class": class_rule}).askAnswer
+
+        else:
+            # Find which of all the value nodes are instances of the class, in one set-oriented query
+            instances = set(
+                r[0]
+                for r in batched_select(
+                    target_graph,
+                    (v for value_nodes in f_v_dict.values() for v in value_nodes if not isinstance(v, Literal)),
+                    "value",
+                    f"?value {RDF_type.n3()}/{RDFS_subClassOf.n3()}* {class_rule.n3()} .",
+                    "?value",
+                    **remote_query_options(executor),
+                )
+            )
+
+            def has_class(v):
+                return v in instances
+
         for f, value_nodes in f_v_dict.items():
             for v in value_nodes:
                 found = False
@@ -123,8 +147,7 @@ class ClassConstraintComponent(ConstraintComponent):
                         "Attempting to match Literal node {} to class of {} will fail.".format(v, class_rule)
                     )
                 else:
-                    resp = target_graph.query(sparql_ask, initBindings={"value": v, "class": class_rule})
-                    found = resp.askAnswer
+                    found = has_class(v)
                 if not found:
                     non_conformant = True
                     rept = self.make_v_result(target_graph, f, value_node=v)
@@ -206,46 +229,44 @@ class DatatypeConstraintComponent(ConstraintComponent):
         :type focus_value_nodes: dict
         :type _evaluation_path: list
         """
-        reports = []
-        non_conformant = False
-        dtype_rule = self.datatype_rule
-        for f, value_nodes in focus_value_nodes.items():
-            for v in value_nodes:
-                matches = False
-                if isinstance(v, Literal):
-                    datatype = v.datatype
-                    lang = v.language
-                    if datatype == dtype_rule:
-                        ill_formed = getattr(v, "ill_typed", None)
-                        if ill_formed is True:
-                            matches = False
-                        else:
-                            matches = self._assert_actual_datatype(v, dtype_rule)
-                    elif dtype_rule == RDFS_Literal:
-                        # Special case. All literals are instance of RDFS.Literal
-                        # and all literals have datatype of RDFS.Literal
-                        matches = True
-                    elif dtype_rule == RDFS_Datatype and datatype:
-                        # Special case. All literals with a datatype are instances of RDFS.Datatype
-                        # and all literals with datatype have datatype of RDFS.Datatype
-                        matches = True
-                    elif datatype is None and lang is None and dtype_rule == XSD_string:
-                        matches = self._assert_actual_datatype(v, dtype_rule)
-                    elif dtype_rule == RDF_langString and lang:
-                        matches = self._assert_actual_datatype(v, dtype_rule)
-                else:
-                    self.shape.logger.debug(
-                        "Datatype Constraint only works on Literal datatypes. "
-                        "Attempting to match non-Literal node {} to datatype of {} will fail.".format(v, dtype_rule)
-                    )
-                if not matches:
-                    non_conformant = True
-                    rept = self.make_v_result(target_graph, f, value_node=v)
-                    reports.append(rept)
-        return (not non_conformant), reports
+        return self.evaluate_value_checks(target_graph, focus_value_nodes)
 
-    def _assert_actual_datatype(self, value_node, datatype_rule):
-        value = value_node.value
+    def value_checks(self) -> List[ValueCheck]:
+        dtype_rule = self.datatype_rule
+        assert_actual_datatype = self._assert_actual_datatype
+        logger = self.shape.logger
+
+        def check(v) -> bool:
+            if not isinstance(v, Literal):
+                logger.debug(
+                    "Datatype Constraint only works on Literal datatypes. "
+                    "Attempting to match non-Literal node {} to datatype of {} will fail.".format(v, dtype_rule)
+                )
+                return False
+            datatype = v.datatype
+            lang = v.language
+            if datatype == dtype_rule:
+                value, ill_typed = literal_value(v)
+                if ill_typed:
+                    return False
+                return assert_actual_datatype(value, dtype_rule)
+            elif dtype_rule == RDFS_Literal:
+                # Special case. All literals are instance of RDFS.Literal
+                # and all literals have datatype of RDFS.Literal
+                return True
+            elif dtype_rule == RDFS_Datatype and datatype:
+                # Special case. All literals with a datatype are instances of RDFS.Datatype
+                # and all literals with datatype have datatype of RDFS.Datatype
+                return True
+            elif datatype is None and lang is None and dtype_rule == XSD_string:
+                return assert_actual_datatype(v.value, dtype_rule)
+            elif dtype_rule == RDF_langString and lang:
+                return assert_actual_datatype(v.value, dtype_rule)
+            return False
+
+        return [ValueCheck(False, check)]
+
+    def _assert_actual_datatype(self, value, datatype_rule):
         if datatype_rule == XSD_string or datatype_rule == RDF_langString:
             return isinstance(value, (str, bytes))
         elif datatype_rule == XSD_integer:
@@ -263,7 +284,7 @@ class DatatypeConstraintComponent(ConstraintComponent):
         elif datatype_rule == XSD_dateTime:
             return isinstance(value, datetime)
         else:
-            # We don't know how to check other datatypes. Assume pass.
+            # Other datatypes are checked against their lexical space by literal_value(), if at all.
             return True
 
 
@@ -314,23 +335,22 @@ class NodeKindConstraintComponent(ConstraintComponent):
         :type focus_value_nodes: dict
         :type _evaluation_path: list
         """
+        return self.evaluate_value_checks(target_graph, focus_value_nodes)
+
+    def value_checks(self) -> List[ValueCheck]:
         n_rule = self.nodekind_rule
-        reports = []
-        non_conformant = False
-        for f, value_nodes in focus_value_nodes.items():
-            for v in value_nodes:
-                match = False
-                if isinstance(v, rdflib.BNode):
-                    if n_rule in (SH_BlankNode, SH_BlankNodeORLiteral, SH_BlankNodeOrIRI):
-                        match = True
-                elif isinstance(v, rdflib.Literal):
-                    if n_rule in (SH_Literal, SH_BlankNodeORLiteral, SH_IRIOrLiteral):
-                        match = True
-                elif isinstance(v, rdflib.term.Identifier):
-                    if n_rule in (SH_IRI, SH_IRIOrLiteral, SH_BlankNodeOrIRI):
-                        match = True
-                if not match:
-                    non_conformant = True
-                    rept = self.make_v_result(target_graph, f, value_node=v)
-                    reports.append(rept)
-        return (not non_conformant), reports
+        # The node kinds that match this rule
+        bnode_match = n_rule in (SH_BlankNode, SH_BlankNodeORLiteral, SH_BlankNodeOrIRI)
+        literal_match = n_rule in (SH_Literal, SH_BlankNodeORLiteral, SH_IRIOrLiteral)
+        iri_match = n_rule in (SH_IRI, SH_IRIOrLiteral, SH_BlankNodeOrIRI)
+
+        def check(v) -> bool:
+            if isinstance(v, rdflib.BNode):
+                return bnode_match
+            elif isinstance(v, rdflib.Literal):
+                return literal_match
+            elif isinstance(v, rdflib.term.Identifier):
+                return iri_match
+            return False
+
+        return [ValueCheck(False, check)]
@@ -3,15 +3,16 @@
 https://www.w3.org/TR/shacl/#core-components-range
 """
 
-from typing import Dict, List
+from typing import Callable, Dict, List
 
 import rdflib
 
-from pyshacl.constraints.constraint_component import ConstraintComponent
+from pyshacl.constraints.constraint_component import ConstraintComponent, ValueCheck
 from pyshacl.consts import SH
 from pyshacl.errors import ConstraintLoadError, ReportableRuntimeError
+from pyshacl.helper.vectorized import range_batch
 from pyshacl.pytypes import GraphLike, SHACLExecutor
-from pyshacl.rdfutil import stringify_node
+from pyshacl.rdfutil import literal_value, stringify_node
 from pyshacl.rdfutil.compare import compare_literal
 from pyshacl.shape import Shape
 
@@ -25,6 +26,35 @@ SH_maxExclusive = SH.maxExclusive
 SH_maxInclusive = SH.maxInclusive
 
 
+def _range_check(m_val, accept: Callable[[int], bool]) -> ValueCheck:
+    """
+    A check that a value node compares to the literal m_val, where accept(cmp) is True for
+    the results of compare_literal(value_node, m_val) that pass.
+    """
+    assert isinstance(m_val, rdflib.Literal)
+    m_is_string = isinstance(m_val.value, str)
+
+    def check(v) -> bool:
+        if isinstance(v, rdflib.BNode):
+            # blank nodes cannot pass val comparison
+            return False
+        elif isinstance(v, rdflib.URIRef):
+            # TODO: Don't know if URIRefs can be compared here
+            return False
+        elif isinstance(v, rdflib.Literal):
+            value, ill_typed = literal_value(v)
+            if ill_typed or m_is_string != isinstance(value, str):
+                # an ill-typed literal cannot be compared
+                return False
+            try:
+                return accept(compare_literal(v, m_val))
+            except (TypeError, NotImplementedError):
+                return False
+        raise ReportableRuntimeError("Not sure how to compare anything else.")
+
+    return ValueCheck(False, check, range_batch(m_val, accept, check))
+
+
 class MinExclusiveConstraintComponent(ConstraintComponent):
     """
     Link:
@@ -70,49 +100,11 @@ class MinExclusiveConstraintComponent(ConstraintComponent):
         :type focus_value_nodes: dict
         :type _evaluation_path: list
         """
-        reports = []
-        non_conformant = False
-
-        for m_val in self.min_vals:
-            _nc, _r = self._evaluate_min_rule(m_val, target_graph, focus_value_nodes)
-            non_conformant = non_conformant or _nc
-            reports.extend(_r)
-        return (not non_conformant), reports
-
-    def _evaluate_min_rule(self, m_val, target_graph, f_v_dict):
-        reports = []
-        non_conformant = False
-        assert isinstance(m_val, rdflib.Literal)
-        min_is_string = isinstance(m_val.value, str)
-        for f, value_nodes in f_v_dict.items():
-            for v in value_nodes:
-                flag = False
-                if isinstance(v, rdflib.BNode):
-                    # blank nodes cannot pass val comparison
-                    pass
-                elif isinstance(v, rdflib.URIRef):
-                    # TODO: Don't know if URIRefs can be compared here
-                    pass
-                elif isinstance(v, rdflib.Literal):
-                    v_is_string = isinstance(v.value, str)
-                    if min_is_string and not v_is_string:
-                        pass
-                    elif v_is_string and not min_is_string:
-                        pass
-                    else:
-                        try:
-                            # pass if v > m_val
-                            cmp = compare_literal(v, m_val)
-                            flag = cmp > 0
-                        except (TypeError, NotImplementedError):
-                            flag = False
-                else:
-                    raise ReportableRuntimeError("Not sure how to compare anything else.")
-                if not flag:
-                    non_conformant = True
-                    rept = self.make_v_result(target_graph, f, value_node=v)
-                    reports.append(rept)
-        return non_conformant, reports
+        return self.evaluate_value_checks(target_graph, focus_value_nodes)
+
+    def value_checks(self) -> List[ValueCheck]:
+        # pass if v > m_val
+        return [_range_check(m_val, lambda cmp: cmp > 0) for m_val in self.min_vals]
 
 
 class MinInclusiveConstraintComponent(ConstraintComponent):
@@ -160,49 +152,11 @@ class MinInclusiveConstraintComponent(ConstraintComponent):
         :type focus_value_nodes: dict
         :type _evaluation_path: list
         """
-        reports = []
-        non_conformant = False
-
-        for m_val in self.min_vals:
-            _nc, _r = self._evaluate_min_rule(m_val, target_graph, focus_value_nodes)
-            non_conformant = non_conformant or _nc
-            reports.extend(_r)
-        return (not non_conformant), reports
-
-    def _evaluate_min_rule(self, m_val, target_graph, f_v_dict):
-        reports = []
-        non_conformant = False
-        assert isinstance(m_val, rdflib.Literal)
-        min_is_string = isinstance(m_val.value, str)
-        for f, value_nodes in f_v_dict.items():
-            for v in value_nodes:
-                flag = False
-                if isinstance(v, rdflib.BNode):
-                    # blank nodes cannot pass val comparison
-                    pass
-                elif isinstance(v, rdflib.URIRef):
-                    # TODO: Don't know if URIRefs can be compared here
-                    pass
-                elif isinstance(v, rdflib.Literal):
-                    v_is_string = isinstance(v.value, str)
-                    if min_is_string and not v_is_string:
-                        pass
-                    elif v_is_string and not min_is_string:
-                        pass
-                    else:
-                        try:
-                            # pass if v >= m_val
-                            cmp = compare_literal(v, m_val)
-                            flag = cmp >= 0
-                        except (TypeError, NotImplementedError):
-                            flag = False
-                else:
-                    raise ReportableRuntimeError("Not sure how to compare anything else.")
-                if not flag:
-                    non_conformant = True
-                    rept = self.make_v_result(target_graph, f, value_node=v)
-                    reports.append(rept)
-        return non_conformant, reports
+        return self.evaluate_value_checks(target_graph, focus_value_nodes)
+
+    def value_checks(self) -> List[ValueCheck]:
+        # pass if v >= m_val
+        return [_range_check(m_val, lambda cmp: cmp >= 0) for m_val in self.min_vals]
 
 
 class MaxExclusiveConstraintComponent(ConstraintComponent):
@@ -250,49 +204,11 @@ class MaxExclusiveConstraintComponent(ConstraintComponent):
         :type focus_value_nodes: dict
         :type _evaluation_path: list
         """
-        reports = []
-        non_conformant = False
-
-        for m_val in self.max_vals:
-            _nc, _r = self._evaluate_max_rule(m_val, target_graph, focus_value_nodes)
-            non_conformant = non_conformant or _nc
-            reports.extend(_r)
-        return (not non_conformant), reports
-
-    def _evaluate_max_rule(self, m_val, target_graph, f_v_dict):
-        reports = []
-        non_conformant = False
-        assert isinstance(m_val, rdflib.Literal)
-        max_is_string = isinstance(m_val.value, str)
-        for f, value_nodes in f_v_dict.items():
-            for v in value_nodes:
-                flag = False
-                if isinstance(v, rdflib.BNode):
-                    # blank nodes cannot pass val comparison
-                    pass
-                elif isinstance(v, rdflib.URIRef):
-                    # TODO: Don't know if URIRefs can be compared here
-                    pass
-                elif isinstance(v, rdflib.Literal):
-                    v_is_string = isinstance(v.value, str)
-                    if max_is_string and not v_is_string:
-                        pass
-                    elif v_is_string and not max_is_string:
-                        pass
-                    else:
-                        try:
-                            # pass if v < m_val
-                            cmp = compare_literal(v, m_val)
-                            flag = cmp < 0
-                        except (TypeError, NotImplementedError):
-                            flag = False
-                else:
-                    raise ReportableRuntimeError("Not sure how to compare anything else.")
-                if not flag:
-                    non_conformant = True
-                    rept = self.make_v_result(target_graph, f, value_node=v)
-                    reports.append(rept)
-        return non_conformant, reports
+        return self.evaluate_value_checks(target_graph, focus_value_nodes)
+
+    def value_checks(self) -> List[ValueCheck]:
+        # pass if v < m_val
+        return [_range_check(m_val, lambda cmp: cmp < 0) for m_val in self.max_vals]
 
 
 class MaxInclusiveConstraintComponent(ConstraintComponent):
@@ -340,46 +256,8 @@ class MaxInclusiveConstraintComponent(ConstraintComponent):
         :type focus_value_nodes: dict
         :type _evaluation_path: list
         """
-        reports = []
-        non_conformant = False
-
-        for m_val in self.max_vals:
-            _nc, _r = self._evaluate_max_rule(m_val, target_graph, focus_value_nodes)
-            non_conformant = non_conformant or _nc
-            reports.extend(_r)
-        return (not non_conformant), reports
-
-    def _evaluate_max_rule(self, m_val, target_graph, f_v_dict):
-        reports = []
-        non_conformant = False
-        assert isinstance(m_val, rdflib.Literal)
-        max_is_string = isinstance(m_val.value, str)
-        for f, value_nodes in f_v_dict.items():
-            for v in value_nodes:
-                flag = False
-                if isinstance(v, rdflib.BNode):
-                    # blank nodes cannot pass val comparison
-                    pass
-                elif isinstance(v, rdflib.URIRef):
-                    # TODO: Don't know if URIRefs can be compared here
-                    pass
-                elif isinstance(v, rdflib.Literal):
-                    v_is_string = isinstance(v.value, str)
-                    if max_is_string and not v_is_string:
-                        pass
-                    elif v_is_string and not max_is_string:
-                        pass
-                    else:
-                        try:
-                            # pass if v <= m_val
-                            cmp = compare_literal(v, m_val)
-                            flag = cmp <= 0
-                        except (TypeError, NotImplementedError):
-                            flag = False
-                else:
-                    raise ReportableRuntimeError("Not sure how to compare anything else.")
-                if not flag:
-                    non_conformant = True
-                    rept = self.make_v_result(target_graph, f, value_node=v)
-                    reports.append(rept)
-        return non_conformant, reports
+        return self.evaluate_value_checks(target_graph, focus_value_nodes)
+
+    def value_checks(self) -> List[ValueCheck]:
+        # pass if v <= m_val
+        return [_range_check(m_val, lambda cmp: cmp <= 0) for m_val in self.max_vals]
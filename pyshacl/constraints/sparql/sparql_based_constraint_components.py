@@ -4,7 +4,7 @@ https://www.w3.org/TR/shacl/#sparql-constraint-components
 """
 
 import typing
-from typing import Dict, List, Tuple, Type, Union
+from typing import Dict, List, Set, Tuple, Type, Union
 
 import rdflib
 
@@ -262,7 +262,7 @@ class AskConstraintValidator(SPARQLConstraintComponentValidator):
         new_bind_vals = new_bind_vals or {}
         bind_vals = param_bind_vals.copy()
         bind_vals.update(new_bind_vals)
-        violations = set()
+        violations = []
         for v in value_nodes:
             if query_helper is None:
                 # TODO:coverage: No test for this case when query_helper is None
@@ -281,7 +281,8 @@ class AskConstraintValidator(SPARQLConstraintComponentValidator):
                 # TODO:coverage: Can this ever actually happen?
                 raise ValidationFailure("ASK Query did not return an askAnswer.")
             if answer is False:
-                violations.add((v, False))
+                # Value nodes are a set, so each one fails at most once
+                violations.append((v, False))
         return violations
 
 
@@ -324,7 +325,8 @@ class SelectConstraintValidator(SPARQLConstraintComponentValidator):
         new_bind_vals = new_bind_vals or {}
         bind_vals = param_bind_vals.copy()
         bind_vals.update(new_bind_vals)
-        violations = set()
+        violations = []
+        seen: Set[Tuple] = set()
         for v in value_nodes:
             if query_helper is None:
                 # TODO:coverage: No test for this case when query_helper is None
@@ -354,15 +356,20 @@ class SelectConstraintValidator(SPARQLConstraintComponentValidator):
                     # TODO:coverage: No test for when result has no 'this' key
                     t = None
                 if p or v2 or t:
-                    violations.add((v, (t, p, v2)))
+                    key = (v, ConstraintComponent.result_key(t, v2, p))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    violations.append((v, (t, p, v2)))
                 else:
                     # TODO:coverage: No test for generic failure, when
                     #  'path' and 'value' and 'this' are not returned.
                     #  here 'failure' must exist
                     try:
                         f = r['failure']
-                        if f is True or (isinstance(f, rdflib.Literal) and f.value):
-                            violations.add((v, True))
+                        if (f is True or (isinstance(f, rdflib.Literal) and f.value)) and (v, True) not in seen:
+                            seen.add((v, True))
+                            violations.append((v, True))
                     except KeyError:
                         pass
         return violations
@@ -3,7 +3,7 @@
 https://www.w3.org/TR/shacl/#sparql-constraints
 """
 
-from typing import Dict, List
+from typing import Dict, List, Set, Tuple
 
 import rdflib
 from rdflib import URIRef
@@ -171,23 +171,26 @@ class SPARQLBasedConstraint(ConstraintComponent):
         if not results or len(results.bindings) < 1:
             return []
         violations = []
-        dedup_set = set()
+        seen: Set[Tuple] = set()
+        failed = False
         for r in results:
             var_dict: Dict = r.asdict()
             f = var_dict.pop('failure', None)
             if f is not None:
-                if True in dedup_set:
+                if failed:
                     continue
                 violations.append((True, var_dict))
-                dedup_set.add(True)
+                failed = True
             else:
                 p = var_dict.pop('path', None)
                 v = var_dict.pop('value', None)
                 t = var_dict.pop('this', None)
                 if (p is not None) or (v is not None) or (t is not None):
                     # Guard against duplicate results
-                    if (t, p, v, var_dict) in violations:
+                    key = self.result_key(t, v, p, var_dict)
+                    if key in seen:
                         continue
+                    seen.add(key)
                     violations.append((t, p, v, var_dict))
 
         return violations
@@ -122,5 +122,12 @@ SH_jsFunctionName = SH.jsFunctionName
 SH_jsLibrary = SH.jsLibrary
 SH_detail = SH.detail
 
+# PySHACL-specific report annotations, these are not part of the SHACL spec
+PYSHACL_PFX = 'urn:pyshacl:'
+PYSHACL = Namespace(PYSHACL_PFX)
+PYSHACL_truncatedResults = PYSHACL.truncatedResults
+PYSHACL_TruncatedResults = PYSHACL.TruncatedResults
+PYSHACL_count = PYSHACL['count']
+
 # For env var truth comparisons
 env_truths = ("t", "T", "y", "Y", "1", "True", "true", "TRUE", "yes", "YES", 1, True)
@@ -14,8 +14,10 @@ from pyshacl.pytypes import GraphLike
 
 from .consts import SH, RDF_type
 from .graph_abstraction import DataGraph, has_oxigraph, ox_Store
+from .helper.sparql_remote_helper import DEFAULT_SPARQL_CONCURRENCY
 from .monkey import apply_patches, rdflib_bool_patch, rdflib_bool_unpatch
-from .rdfutil import load_from_source
+from .rdfutil import load_from_source, load_sources
+from .report import LazyValidationReport, ValidationReport
 from .rule_expand_runner import RuleExpandRunner
 from .validator import Validator, assign_baked_in
 from .validator_conformance import check_dash_result
@@ -46,6 +48,10 @@ def validate(
     focus_nodes: Optional[List[Union[str, URIRef]]] = None,
     use_shapes: Optional[List[Union[str, URIRef]]] = None,
     multi_data_graphs_mode: Optional[str] = None,
+    conforms_only: Optional[bool] = False,
+    max_results_per_shape: Optional[int] = None,
+    max_results_total: Optional[int] = None,
+    sample_rate: Optional[float] = None,
     **kwargs,
 ):
     """
@@ -80,20 +86,52 @@ def validate(
     :type use_shapes: list | None
     :param multi_data_graphs_mode: "combine" or "validate_each" for multiple data graphs
     :type multi_data_graphs_mode: str | None
-    :param kwargs:
-    :return:
+    :param conforms_only: Only determine conformance. Stop at the first violation, and make no Validation Report.
+    The results_graph and results_text are returned as None.
+    :type conforms_only: bool | None
+    :param max_results_per_shape: Put at most this many results from each shape into the Validation Report.
+    :type max_results_per_shape: int | None
+    :param max_results_total: Put at most this many results into the Validation Report.
+    :type max_results_total: int | None
+    :param sample_rate: Put only this fraction (0.0 < sample_rate <= 1.0) of the results from each shape and
+    constraint component into the Validation Report.
+    :type sample_rate: float | None
+    :param kwargs: Also accepts load_workers (int | None), the number of worker processes used to parse multiple data
+    graphs in "combine" mode. The default uses one per CPU when there are enough data graphs, 0 loads them one by one.
+    Also accepts use_oxigraph (bool), to parse the data graph with Oxigraph straight into an Oxigraph Store.
+    In sparql_mode, also accepts sparql_batch_size (int, default 100), the number of focus nodes in each value node
+    query, sparql_page_size (int | None, default 10000), the number of solutions read with each request, and
+    sparql_concurrency (int, default 4), the number of queries sent to the endpoint at once. Against an http(s)
+    endpoint, also accepts sparql_timeout (float | None, default 60.0) seconds to wait for each request,
+    sparql_retries (int, default 3) times to retry a failed request, and sparql_cache_size (int, default 1024)
+    result sets to keep in the query result cache.
+    Also accepts profile (bool | ValidationProfile), to time and count the work done by each shape and constraint.
+    The profile is found on the returned ValidationReport as report.profile, or a given ValidationProfile is filled in.
+    Also accepts lazy_report (bool), to return a LazyValidationReport, which renders the results graph and the results
+    text only when they are accessed. It keeps the data graph alive until both have been rendered.
+    :return: (conforms, results_graph, results_text). A ValidationReport, which is that tuple.
+    :rtype: ValidationReport | LazyValidationReport | tuple
     """
 
     do_debug = kwargs.get('debug', False)
     log = make_default_logger(name="pyshacl-validate", debug=do_debug)
     apply_patches()
     assign_baked_in()
+    use_oxigraph: bool = bool(kwargs.pop('use_oxigraph', False))
+    if use_oxigraph and not has_oxigraph:
+        raise ReportableRuntimeError(
+            "The use_oxigraph option needs the pyoxigraph package, install pyshacl[oxigraph]."
+        )
+    # A graph made here from multiple sources is ours, it doesn't need to be copied before validating
+    combined_sources = False
     if _is_multi_data_graph_input(data_graph):
+        data_graphs: List[Union[GraphLike, BufferedIOBase, TextIOBase, str, bytes]]
         data_graphs = list(data_graph)  # type: ignore[arg-type]
         if len(data_graphs) < 1:
             raise ReportableRuntimeError("No data graphs were provided for validation.")
         if sparql_mode and len(data_graphs) > 1:
             raise ReportableRuntimeError("SPARQL Remote Graph Mode does not support multiple data graphs.")
+        load_workers: Optional[int] = kwargs.pop('load_workers', None)
         resolved_mode = (multi_data_graphs_mode or "combine").lower()
         if resolved_mode not in ("combine", "validate_each"):
             raise ReportableRuntimeError(
@@ -115,6 +153,11 @@ def validate(
                 sparql_mode=sparql_mode,
                 focus_nodes=focus_nodes,
                 use_shapes=use_shapes,
+                conforms_only=conforms_only,
+                max_results_per_shape=max_results_per_shape,
+                max_results_total=max_results_total,
+                sample_rate=sample_rate,
+                use_oxigraph=use_oxigraph,
                 **kwargs,
             )
         if len(data_graphs) == 1:
@@ -122,17 +165,23 @@ def validate(
         else:
             # Combined mode, load all the sources into a single dataset
             data_graph_format = kwargs.get('data_graph_format', None)
-            combined_dataset = Dataset(default_union=True)
-            for source in data_graphs:
-                load_from_source(
-                    source,
-                    g=combined_dataset,
+            if use_oxigraph:
+                # Oxigraph's bulk loader parses in parallel itself
+                combined_store = ox_Store()
+                for source in data_graphs:
+                    load_from_source(source, g=combined_store, rdf_format=data_graph_format, logger=log)
+                data_graph = DataGraph.from_oxigraph_store(combined_store)
+            else:
+                combined_dataset = Dataset(default_union=True)
+                load_sources(
+                    data_graphs,
+                    combined_dataset,
                     rdf_format=data_graph_format,
-                    multigraph=True,
-                    do_owl_imports=False,
+                    max_workers=load_workers,
                     logger=log,
                 )
-            data_graph = combined_dataset
+                data_graph = combined_dataset
+            combined_sources = True
     do_check_dash_result: bool = kwargs.pop('check_dash_result', False)
     if kwargs.get('meta_shacl', False):
         to_meta_val = shacl_graph or data_graph
@@ -144,7 +193,7 @@ def validate(
     do_owl_imports = kwargs.pop('do_owl_imports', False)
     data_graph_format = kwargs.pop('data_graph_format', None)
 
-    if isinstance(data_graph, (str, bytes, BufferedIOBase, TextIOBase)):
+    if combined_sources or isinstance(data_graph, (str, bytes, BufferedIOBase, TextIOBase)):
         # DataGraph is passed in as Text. It is not an rdflib.Graph
         # That means we load it into an ephemeral graph at runtime
         # that means we don't need to make a copy to prevent polluting it.
@@ -168,7 +217,7 @@ def validate(
         and isinstance(data_graph, str)
         and (data_graph.lower().startswith("http:") or data_graph.lower().startswith("https:"))
     ):
-        from rdflib.plugins.stores.sparqlstore import SPARQLStore
+        from .rdfutil.remote_store import RemoteSPARQLStore
 
         query_endpoint: str = data_graph
         username = os.getenv("PYSHACL_SPARQL_USERNAME", "")
@@ -179,7 +228,17 @@ def validate(
             auth = (username, password)
         else:
             auth = None
-        store = SPARQLStore(query_endpoint=query_endpoint, auth=auth, method=method)
+        sparql_concurrency = int(kwargs.get('sparql_concurrency', DEFAULT_SPARQL_CONCURRENCY))
+        store = RemoteSPARQLStore(
+            query_endpoint=query_endpoint,
+            auth=auth,
+            method=method,
+            max_connections=sparql_concurrency,
+            max_in_flight=sparql_concurrency,
+            retries=int(kwargs.pop('sparql_retries', 3)),
+            timeout=kwargs.pop('sparql_timeout', 60.0),
+            cache_size=int(kwargs.pop('sparql_cache_size', 1024)),
+        )
         loaded_dg = Dataset(store=store, default_union=True)
         dg = DataGraph.from_rdflib_dataset(loaded_dg)
     elif isinstance(data_graph, DataGraph):
@@ -191,9 +250,17 @@ def validate(
     else:
         # force no owl imports on data_graph
         loaded_dg = load_from_source(
-            data_graph, rdf_format=data_graph_format, multigraph=True, do_owl_imports=False, logger=log
+            data_graph,
+            rdf_format=data_graph_format,
+            multigraph=True,
+            do_owl_imports=False,
+            logger=log,
+            use_oxigraph=use_oxigraph,
         )
-        dg = DataGraph.from_rdflib(loaded_dg)
+        if has_oxigraph and isinstance(loaded_dg, ox_Store):
+            dg = DataGraph.from_oxigraph_store(loaded_dg)
+        else:
+            dg = DataGraph.from_rdflib(loaded_dg)
     ont_graph_format = kwargs.pop('ont_graph_format', None)
     if ont_graph is not None:
         loaded_og = load_from_source(
@@ -220,6 +287,7 @@ def validate(
         'inference': inference,
         'inplace': inplace or ephemeral,
         'abort_on_first': abort_on_first,
+        'conforms_only': conforms_only,
         'allow_infos': allow_infos,
         'allow_warnings': allow_warnings,
         'advanced': advanced,
@@ -229,7 +297,17 @@ def validate(
         'logger': log,
         'focus_nodes': focus_nodes,
         'use_shapes': use_shapes,
+        'max_results_per_shape': max_results_per_shape,
+        'max_results_total': max_results_total,
+        'sample_rate': sample_rate,
     }
+    for sparql_option in ('sparql_batch_size', 'sparql_page_size', 'sparql_concurrency'):
+        if sparql_option in kwargs:
+            validator_options_dict[sparql_option] = kwargs.pop(sparql_option)
+    if 'profile' in kwargs:
+        validator_options_dict['profile'] = kwargs.pop('profile')
+    if 'lazy_report' in kwargs:
+        validator_options_dict['lazy_report'] = bool(kwargs.pop('lazy_report'))
     if max_validation_depth is not None:
         validator_options_dict['max_validation_depth'] = max_validation_depth
     validator = None
@@ -240,20 +318,27 @@ def validate(
             ont_graph=loaded_og,
             options=validator_options_dict,
         )
-        conforms, report_graph, report_text = validator.run()
+        report: Union[
+            ValidationReport, LazyValidationReport, Tuple[bool, Union[ValidationFailure, None], Union[str, None]]
+        ]
+        report = validator.run()
     except ValidationFailure as e:
-        conforms = False
-        report_graph = e
-        report_text = "Validation Failure - {}".format(e.message)
+        report = (False, e, "Validation Failure - {}".format(e.message))
     if do_check_dash_result and validator is not None:
-        passes = check_dash_result(validator, report_graph, loaded_sg or dg)
+        _, report_graph, report_text = report
+        # After a ValidationFailure, the failure is checked in place of the report graph
+        passes = check_dash_result(validator, report_graph, loaded_sg or dg)  # type: ignore[arg-type]
         return passes, report_graph, report_text
     do_serialize_report_graph = kwargs.pop('serialize_report_graph', False)
-    if do_serialize_report_graph and isinstance(report_graph, Graph):
+    if do_serialize_report_graph and isinstance(report, (ValidationReport, LazyValidationReport)):
         if not (isinstance(do_serialize_report_graph, str)):
             do_serialize_report_graph = 'turtle'
-        report_graph = report_graph.serialize(None, encoding='utf-8', format=do_serialize_report_graph)
-    return conforms, report_graph, report_text
+        return (
+            report.conforms,
+            report.graph.serialize(None, encoding='utf-8', format=do_serialize_report_graph),
+            report.text,
+        )
+    return report
 
 
 def validate_each(
@@ -272,7 +357,9 @@ def validate_each(
     focus_nodes: Optional[List[Union[str, URIRef]]] = None,
     use_shapes: Optional[List[Union[str, URIRef]]] = None,
     **kwargs,
-) -> Dict[int, Tuple[bool, Union[GraphLike, bytes, ValidationFailure], str]]:
+) -> Dict[
+    int, Union[ValidationReport, LazyValidationReport, Tuple[bool, Union[GraphLike, bytes, ValidationFailure], str]]
+]:
     """
     :param data_graphs: Sequence of data graphs or sources to validate independently
     :type data_graphs: Sequence
@@ -286,7 +373,10 @@ def validate_each(
     data_graph_list = list(data_graphs)
     if len(data_graph_list) < 1:
         raise ReportableRuntimeError("No data graphs were provided for validate_each.")
-    results: Dict[int, Tuple[bool, Union[GraphLike, bytes, ValidationFailure], str]] = {}
+    results: Dict[
+        int,
+        Union[ValidationReport, LazyValidationReport, Tuple[bool, Union[GraphLike, bytes, ValidationFailure], str]],
+    ] = {}
     for datagraph_i, data_graph in enumerate(data_graph_list):
         result = validate(
             data_graph,
@@ -398,6 +488,11 @@ def shacl_rules(
     assign_baked_in()
     do_owl_imports = kwargs.pop('do_owl_imports', False)
     data_graph_format = kwargs.pop('data_graph_format', None)
+    use_oxigraph: bool = bool(kwargs.pop('use_oxigraph', False))
+    if use_oxigraph and not has_oxigraph:
+        raise ReportableRuntimeError(
+            "The use_oxigraph option needs the pyoxigraph package, install pyshacl[oxigraph]."
+        )
     if kwargs.get('sparql_mode', None):
         raise ReportableRuntimeError("The SHACL Rules expander cannot be used in SPARQL Remote Graph Mode.")
     if isinstance(data_graph, (str, bytes, BufferedIOBase, TextIOBase)):
@@ -417,9 +512,17 @@ def shacl_rules(
     else:
         # force no owl imports on data_graph
         loaded_dg = load_from_source(
-            data_graph, rdf_format=data_graph_format, multigraph=True, do_owl_imports=False, logger=log
+            data_graph,
+            rdf_format=data_graph_format,
+            multigraph=True,
+            do_owl_imports=False,
+            logger=log,
+            use_oxigraph=use_oxigraph,
         )
-        dg = DataGraph.from_rdflib(loaded_dg)
+        if has_oxigraph and isinstance(loaded_dg, ox_Store):
+            dg = DataGraph.from_oxigraph_store(loaded_dg)
+        else:
+            dg = DataGraph.from_rdflib(loaded_dg)
     ont_graph_format = kwargs.pop('ont_graph_format', None)
     if ont_graph is not None:
         loaded_og = load_from_source(
@@ -15,7 +15,12 @@ else:
 dev_mode = False
 
 
-extras_requirements = {"js": ["pyduktape2"], "http": ["sanic", "sanic-ext", "sanic-cors"]}
+extras_requirements = {
+    "js": ["pyduktape2"],
+    "http": ["sanic", "sanic-ext", "sanic-cors"],
+    "numpy": ["numpy"],
+    "re2": ["google-re2"],
+}
 
 
 @lru_cache()
@@ -46,9 +46,13 @@ except ImportError:
     ox_Variable = None
 
 import shutil
+import threading
 import warnings
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Any, Callable, Dict, Generator, Iterable, Mapping, Sequence, Tuple, Type, Union
+from time import perf_counter
+from types import GeneratorType
+from typing import Any, Callable, Dict, Generator, Iterable, List, Mapping, Optional, Sequence, Tuple, Type, Union
 
 from rdflib import Dataset as rdf_Dataset
 from rdflib import Graph as rdf_Graph
@@ -1419,3 +1423,187 @@ def clone_oxigraph_store(store1: Union[ox_Store], store2: Union[ox_Store, None]
     for q in store1.quads_for_pattern(None, None, None, None):
         store2.add(q)
     return store2
+
+
+# The shape and constraint that are running now, calls to an InstrumentedDataGraph are attributed to this scope
+data_graph_scope: ContextVar[Any] = ContextVar("pyshacl_data_graph_scope", default=None)
+# Asks GraphCallStats for its totals over every scope, None is itself a scope (calls made outside of any shape)
+ALL_SCOPES: Any = object()
+
+
+class InstrumentedDataGraph(object):
+    """
+    Wraps a DataGraph, and counts and times every call to one of its access methods.
+    All other attributes are passed through to the wrapped DataGraph.
+
+    Each call is reported to the on_call callback as (scope, method name, elapsed seconds), where scope is the
+    value of data_graph_scope when the call was made. When an access method returns a generator, the time spent
+    iterating it is included, and the call is reported when the generator is exhausted, closed or discarded.
+    Without a callback, the calls are collected into a GraphCallStats, found on the wrapper as stats.
+
+    The calls and their results are passed through unchanged. The wrapper reports the class of the wrapped
+    DataGraph as its own __class__, so isinstance() checks against rdflib Graph and Dataset still pass.
+    """
+
+    ACCESS_METHODS = (
+        "triples",
+        "subjects",
+        "predicates",
+        "objects",
+        "subject_objects",
+        "subject_predicates",
+        "predicate_objects",
+        "transitive_subjects",
+        "transitive_objects",
+        "value",
+        "items",
+        "query",
+    )
+
+    __slots__ = ("wrapped", "on_call", "stats")
+
+    def __init__(self, wrapped: DataGraph, on_call: Optional[Callable[[Any, str, float], None]] = None):
+        self.wrapped = wrapped
+        if on_call is None:
+            self.stats: Optional[GraphCallStats] = GraphCallStats()
+            on_call = self.stats.record
+        else:
+            self.stats = None
+        self.on_call = on_call
+
+    @property  # type: ignore[misc]
+    def __class__(self) -> type:
+        return self.wrapped.__class__
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.wrapped, name)
+
+    def __contains__(self, triple) -> bool:
+        scope = data_graph_scope.get()
+        t1 = perf_counter()
+        try:
+            return triple in self.wrapped
+        finally:
+            self.on_call(scope, "__contains__", perf_counter() - t1)
+
+    def __len__(self) -> int:
+        return len(self.wrapped)
+
+    def __iter__(self):
+        scope = data_graph_scope.get()
+        t1 = perf_counter()
+        it = iter(self.wrapped)
+        return _TimedIterator(self.on_call, scope, "__iter__", it, perf_counter() - t1)
+
+    def __repr__(self) -> str:
+        return f"<InstrumentedDataGraph of {self.wrapped!r}>"
+
+
+class _TimedIterator(object):
+    """Passes through the items of a generator from an access method, and reports the call once it is done."""
+
+    __slots__ = ("on_call", "scope", "method", "it", "elapsed", "done")
+
+    def __init__(self, on_call: Callable[[Any, str, float], None], scope: Any, method: str, it, elapsed: float):
+        self.on_call = on_call
+        self.scope = scope
+        self.method = method
+        self.it = it
+        self.elapsed = elapsed
+        self.done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t1 = perf_counter()
+        try:
+            item = next(self.it)
+        except StopIteration:
+            self.elapsed += perf_counter() - t1
+            self.close()
+            raise
+        self.elapsed += perf_counter() - t1
+        return item
+
+    def close(self) -> None:
+        if self.done:
+            return
+        self.done = True
+        close = getattr(self.it, "close", None)
+        if close is not None:
+            close()
+        self.on_call(self.scope, self.method, self.elapsed)
+
+    def __del__(self):
+        self.close()
+
+
+def _instrumented_method(name: str) -> Callable:
+    def method(self: InstrumentedDataGraph, *args, **kwargs):
+        scope = data_graph_scope.get()
+        t1 = perf_counter()
+        result = getattr(self.wrapped, name)(*args, **kwargs)
+        if isinstance(result, GeneratorType):
+            return _TimedIterator(self.on_call, scope, name, result, perf_counter() - t1)
+        self.on_call(scope, name, perf_counter() - t1)
+        return result
+
+    method.__name__ = name
+    return method
+
+
+for _name in InstrumentedDataGraph.ACCESS_METHODS:
+    setattr(InstrumentedDataGraph, _name, _instrumented_method(_name))
+del _name
+
+
+class GraphCallStats(object):
+    """
+    A histogram of the calls to the access methods of an InstrumentedDataGraph, for each scope they were made in.
+    Both the number of calls and the total time spent in them are kept, by scope and by method name.
+    """
+
+    __slots__ = ("counts", "times", "_lock")
+
+    def __init__(self):
+        self.counts: Dict[Any, Dict[str, int]] = {}
+        self.times: Dict[Any, Dict[str, float]] = {}
+        # Calls can be reported from the worker threads of a concurrent SPARQL-mode run.
+        # Reentrant, because the finalizer of a _TimedIterator can report a call while this thread holds the lock.
+        self._lock = threading.RLock()
+
+    def record(self, scope: Any, method: str, elapsed: float) -> None:
+        with self._lock:
+            counts = self.counts.setdefault(scope, {})
+            counts[method] = counts.get(method, 0) + 1
+            times = self.times.setdefault(scope, {})
+            times[method] = times.get(method, 0.0) + elapsed
+
+    @property
+    def scopes(self) -> List[Any]:
+        return list(self.counts.keys())
+
+    def histogram(self, scope: Any = ALL_SCOPES) -> Dict[str, int]:
+        """The number of calls to each method, in one scope, or summed over all scopes."""
+        return _sum_by_method(self.counts, scope, 0)
+
+    def time_histogram(self, scope: Any = ALL_SCOPES) -> Dict[str, float]:
+        """The time spent in the calls to each method, in one scope, or summed over all scopes."""
+        return _sum_by_method(self.times, scope, 0.0)
+
+    def total_calls(self, scope: Any = ALL_SCOPES) -> int:
+        return sum(self.histogram(scope).values())
+
+    def total_time(self, scope: Any = ALL_SCOPES) -> float:
+        return sum(self.time_histogram(scope).values())
+
+
+def _sum_by_method(table: Dict[Any, Dict[str, Any]], scope: Any, zero: Any) -> Dict[str, Any]:
+    if scope is not ALL_SCOPES:
+        return dict(table.get(scope, {}))
+    summed: Dict[str, Any] = {}
+    for by_method in table.values():
+        for method, v in by_method.items():
+            summed[method] = summed.get(method, zero) + v
+    return summed
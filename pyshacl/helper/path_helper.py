@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, Dict, Union
+from typing import TYPE_CHECKING, Dict, Iterable, Set, Union, cast
 
 import rdflib
 
@@ -6,8 +6,14 @@ from pyshacl.consts import SH_alternativePath, SH_inversePath, SH_oneOrMorePath,
 from pyshacl.errors import ReportableRuntimeError
 
 if TYPE_CHECKING:
+    from pyshacl.pytypes import GraphLike, RDFNode
     from pyshacl.shape import ShapesGraph
 
+# With at least this many subjects, objects_of_each() tries one scan over the triples of the predicate
+BULK_LOOKUP_MIN_SUBJECTS = 64
+# The scan gives up after this many triples for each subject, and looks up each subject on its own
+BULK_SCAN_FACTOR = 4
+
 
 def shacl_path_to_sparql_path(
     shapes_graph: 'ShapesGraph', path_node, prefixes: Union[None, Dict] = None, recursion: int = 0
@@ -102,3 +108,34 @@ def shacl_path_to_sparql_path(
         return f"{oom_path_string}+"
 
     raise NotImplementedError("That path method to get value nodes of property shapes is not yet implemented.")
+
+
+def objects_of_each(
+    target_graph: 'GraphLike', subjects: Iterable['RDFNode'], predicate: 'RDFNode'
+) -> Dict['RDFNode', Set['RDFNode']]:
+    """
+    The set of objects of the predicate for each of the subjects.
+    With many subjects, these are found in one scan over the triples of the predicate, instead of one lookup per
+    subject. The scan stops early if the predicate has many more triples than there are subjects, so it never
+    costs much more than the lookups it replaces.
+
+    :param target_graph: The graph to look in
+    :param subjects: The subjects
+    :param predicate: The predicate
+    :return: A dict of subject to its set of objects
+    """
+    found: Dict['RDFNode', Set['RDFNode']] = {s: set() for s in subjects}
+    if len(found) >= BULK_LOOKUP_MIN_SUBJECTS:
+        budget = BULK_SCAN_FACTOR * len(found)
+        for n, (s, o) in enumerate(target_graph.subject_objects(predicate)):
+            if n >= budget:
+                break
+            # The subjects and objects of a graph are always IdentifiedNodes or Literals
+            objects = found.get(cast('RDFNode', s), None)
+            if objects is not None:
+                objects.add(cast('RDFNode', o))
+        else:
+            return found
+    for s, objects in found.items():
+        objects.update(cast(Iterable['RDFNode'], target_graph.objects(s, predicate)))
+    return found
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#
+r"""
+Compiled sh:pattern regular expressions, shared by all shapes in the process.
+
+Patterns are compiled once per (pattern, flags), with the chosen regex engine. The default engine is Python's re
+module. RE2 (from the optional re2 extra, google-re2) is used only when it is chosen with set_regex_engine("re2").
+RE2 matches in linear time, so a pathological user-supplied pattern cannot backtrack catastrophically.
+But it does not match the same strings as re in every case: its \d, \w, \s and \b are ASCII-only, where re
+matches Unicode digits, word characters and whitespace. And RE2 does not support some constructs, like
+backreferences and lookarounds, so patterns that RE2 cannot compile are compiled with re instead.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, FrozenSet, Optional, Sequence
+
+try:
+    import re2
+
+    has_re2 = True
+except ImportError:
+    re2 = None
+    has_re2 = False
+
+REGEX_ENGINES = ("re", "re2")
+# The most compiled patterns kept in the process-wide cache
+PATTERN_CACHE_SIZE = 1024
+
+_regex_engine = "re"
+
+
+def get_regex_engine() -> str:
+    return _regex_engine
+
+
+def set_regex_engine(engine: str) -> None:
+    """
+    Choose the regex engine for sh:pattern, for the whole process.
+    The shapes compile their pattern checks again, with the new engine, the next time they are validated.
+    :param engine: "re" for Python's re module (the default), or "re2" for google-re2.
+    :type engine: str
+    """
+    global _regex_engine
+    if engine not in REGEX_ENGINES:
+        raise ValueError(f"Unknown regex engine \"{engine}\", must be one of {REGEX_ENGINES}.")
+    if engine == "re2" and not has_re2:
+        raise ValueError("The re2 regex engine needs the google-re2 package. Install pyshacl[re2].")
+    _regex_engine = engine
+    compile_pattern.cache_clear()
+    compile_pattern_set.cache_clear()
+
+
+def pattern_flags(flags: Optional[str]) -> int:
+    """The re module flags for the value of sh:flags."""
+    re_flags = 0
+    if flags:
+        flags = flags.lower()
+        if 'i' in flags:
+            re_flags |= re.I
+        if 'm' in flags:
+            re_flags |= re.M
+    return re_flags
+
+
+def _re2_options():
+    options = re2.Options()
+    # A pattern that RE2 cannot compile is not an error, it falls back to re
+    options.log_errors = False
+    return options
+
+
+def _re2_pattern(pattern: str, flags: int) -> str:
+    inline = ""
+    if flags & re.I:
+        inline += "i"
+    if flags & re.M:
+        inline += "m"
+    return f"(?{inline}){pattern}" if inline else pattern
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern: str, flags: int) -> Any:
+    """
+    The compiled regular expression for the pattern and re module flags, with the chosen engine.
+    Either way, the result has a search(string) method.
+    """
+    if _regex_engine == "re2":
+        try:
+            return re2.compile(_re2_pattern(pattern, flags), _re2_options())
+        except re2.error:
+            pass
+    return re.compile(pattern, flags)
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern_set(patterns: Sequence[str], flags: int) -> Optional[Callable[[str], FrozenSet[int]]]:
+    """
+    Several patterns matched together in one pass over the string, with an RE2 Set.
+    Returns a function from a string to the set of positions of the patterns that are found in it,
+    or None if the engine is not re2, or RE2 cannot compile all of the patterns.
+    """
+    if _regex_engine != "re2" or len(patterns) < 2:
+        return None
+    pattern_set = re2.Set.SearchSet(_re2_options())
+    try:
+        for p in patterns:
+            pattern_set.Add(_re2_pattern(p, flags))
+        pattern_set.Compile()
+    except re2.error:
+        return None
+    match = pattern_set.Match
+    empty: FrozenSet[int] = frozenset()
+
+    def matched(string: str) -> FrozenSet[int]:
+        found = match(string)
+        return empty if found is None else frozenset(found)
+
+    return matched
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+#
+"""
+Query strategies for SPARQL Remote Graph Mode.
+
+A remote endpoint is slow to answer one huge query, and often refuses it outright. These helpers split the work
+into many small queries: focus nodes are sent in batches using a VALUES block, each batch is read back in pages
+using LIMIT and OFFSET, and the batches are sent to the endpoint concurrently.
+Focus node discovery sends one query for each kind of target declaration, rather than one query for every
+combination of them. Constraint components that need to look at the data graph use batched_select to ask about
+their whole set of value nodes at once, rather than sending one query per value node or per focus node.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+from rdflib import BNode
+
+from ..consts import RDF_type, RDFS_subClassOf
+
+if TYPE_CHECKING:
+    # Only for annotations, pytypes imports the defaults below
+    from rdflib.query import ResultRow
+
+    from ..pytypes import GraphLike, RDFNode, SHACLExecutor
+
+DEFAULT_SPARQL_BATCH_SIZE = 100
+DEFAULT_SPARQL_PAGE_SIZE = 10000
+DEFAULT_SPARQL_CONCURRENCY = 4
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def is_remote_graph(target_graph: GraphLike) -> bool:
+    """
+    Is this graph backed by a remote SPARQL endpoint?
+    Local graphs parse and evaluate each query in-process, so they gain nothing from concurrent queries.
+    """
+    store = getattr(target_graph, 'store', None)
+    if store is None:
+        return False
+    from rdflib.plugins.stores.sparqlstore import SPARQLStore
+
+    return isinstance(store, SPARQLStore)
+
+
+def batched(items: Sequence[T], batch_size: int) -> Iterator[Sequence[T]]:
+    for i in range(0, len(items), batch_size):
+        yield items[i : i + batch_size]
+
+
+def run_concurrently(fn: Callable[[T], R], items: Sequence[T], concurrency: int) -> List[R]:
+    """
+    Call fn on each item, using up to `concurrency` threads. Results are returned in the order of the items.
+    """
+    if concurrency <= 1 or len(items) <= 1:
+        return [fn(i) for i in items]
+    # Each call runs in a copy of the caller's context, so the running shape is known to the profiler
+    contexts = [copy_context() for _ in items]
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(items)), thread_name_prefix="pyshacl-sparql") as pool:
+        return list(pool.map(lambda ctx, item: ctx.run(fn, item), contexts, items))
+
+
+def paged_select(
+    target_graph: GraphLike, query: str, page_size: Optional[int], init_bindings: Optional[Dict] = None
+) -> Iterator[ResultRow]:
+    """
+    Run a SELECT query, reading the solutions back one page at a time.
+    The query must have an ORDER BY clause, so that the pages do not overlap.
+    The next page is only requested when the previous page was full.
+
+    :param target_graph: The graph to query
+    :param query: A SELECT query, without LIMIT or OFFSET
+    :param page_size: The number of solutions in each page, None reads all solutions with one request
+    :param init_bindings: Variable bindings passed to the query
+    :return: A generator of result rows
+    """
+    if not page_size:
+        # The solutions of a SELECT query are always ResultRows
+        yield from cast(Iterable["ResultRow"], target_graph.query(query, initBindings=init_bindings))
+        return
+    offset = 0
+    while True:
+        page_query = f"{query}\nLIMIT {page_size} OFFSET {offset}"
+        count = 0
+        for row in cast(Iterable["ResultRow"], target_graph.query(page_query, initBindings=init_bindings)):
+            count += 1
+            yield row
+        if count < page_size:
+            break
+        offset += page_size
+
+
+def remote_query_options(executor: Optional[SHACLExecutor]) -> Dict[str, Any]:
+    """The batch size, page size and concurrency settings of an executor, as keyword args for these helpers."""
+    if executor is None:
+        return {}
+    return {
+        "batch_size": executor.sparql_batch_size,
+        "page_size": executor.sparql_page_size,
+        "concurrency": executor.sparql_concurrency,
+    }
+
+
+def batched_select(
+    target_graph: GraphLike,
+    nodes: Iterable[RDFNode],
+    var: str,
+    where: str,
+    project: str,
+    batch_size: int = DEFAULT_SPARQL_BATCH_SIZE,
+    page_size: Optional[int] = DEFAULT_SPARQL_PAGE_SIZE,
+    concurrency: int = DEFAULT_SPARQL_CONCURRENCY,
+) -> List[Tuple]:
+    """
+    Run one set-oriented SELECT query for a whole set of nodes.
+    The nodes are sent in batches with a VALUES block for ?var, and each batch is read back in pages.
+
+    Blank nodes cannot be written into a query, so each blank node is bound in a query of its own.
+
+    :param target_graph: The graph to query
+    :param nodes: The nodes to bind to ?var
+    :param var: The name of the variable to bind the nodes to, without the "?"
+    :param where: The graph pattern of the query
+    :param project: The projected variables, the first one must be ?var
+    :param batch_size: The maximum number of nodes in each VALUES block
+    :param page_size: The number of solutions to read with each request
+    :param concurrency: The maximum number of queries to send at once, to a remote graph
+    :return: The result rows, as tuples of the projected variables
+    """
+    unique_nodes = list(dict.fromkeys(nodes))
+    named_nodes = [n for n in unique_nodes if not isinstance(n, BNode)]
+    blank_nodes = [n for n in unique_nodes if isinstance(n, BNode)]
+    select = "SELECT DISTINCT {project} WHERE {{\n{values}\t{where}\n}}\nORDER BY {project}"
+
+    def fetch_batch(batch: Sequence[RDFNode]) -> List[Tuple]:
+        values = "VALUES ?{} {{ {} }}\n".format(var, " ".join(n.n3() for n in batch))
+        query = select.format(project=project, values=values, where=where)
+        return [tuple(r) for r in paged_select(target_graph, query, page_size)]
+
+    def fetch_blank(n: RDFNode) -> List[Tuple]:
+        query = select.format(project=project, values="", where=where)
+        rows = paged_select(target_graph, query, page_size, init_bindings={var: n})
+        return [(n, *tuple(r)[1:]) for r in rows]
+
+    if not is_remote_graph(target_graph):
+        concurrency = 1
+    batches = list(batched(named_nodes, max(1, batch_size)))
+    pages = run_concurrently(fetch_batch, batches, concurrency)
+    pages.extend(run_concurrently(fetch_blank, blank_nodes, concurrency))
+    return [row for page in pages for row in page]
+
+
+def batched_value_nodes(
+    target_graph: GraphLike,
+    focus: Sequence[RDFNode],
+    sparql_path: str,
+    batch_size: int = DEFAULT_SPARQL_BATCH_SIZE,
+    page_size: Optional[int] = DEFAULT_SPARQL_PAGE_SIZE,
+    concurrency: int = DEFAULT_SPARQL_CONCURRENCY,
+) -> Dict[RDFNode, Set[RDFNode]]:
+    """
+    Get the value nodes of each focus node, following a SPARQL property path.
+    The focus nodes are sent in batches with a VALUES block, and each query projects (?f ?v) pairs.
+
+    :param target_graph: The graph to query
+    :param focus: The focus nodes
+    :param sparql_path: The SPARQL property path, as it is written in a query
+    :param batch_size: The maximum number of focus nodes in each VALUES block
+    :param page_size: The number of (?f ?v) solutions to read with each request
+    :param concurrency: The maximum number of queries to send at once, to a remote graph
+    :return: A dict of focus node to its set of value nodes
+    """
+    focus_dict: Dict[RDFNode, Set[RDFNode]] = {f: set() for f in focus}
+    rows = batched_select(
+        target_graph,
+        focus_dict.keys(),
+        "f",
+        f"?f {sparql_path} ?v .",
+        "?f ?v",
+        batch_size=batch_size,
+        page_size=page_size,
+        concurrency=concurrency,
+    )
+    for f, v in rows:
+        if v is None:
+            continue
+        try:
+            focus_dict[f].add(v)
+        except KeyError:
+            # The endpoint gave back a focus node we didn't ask for
+            continue
+    return focus_dict
+
+
+TARGET_CLASS = "class"
+TARGET_SUBJECTS_OF = "subjectsOf"
+TARGET_OBJECTS_OF = "objectsOf"
+
+_target_patterns = {
+    TARGET_CLASS: f"?f {RDF_type.n3()}/{RDFS_subClassOf.n3()}* ?t .",
+    TARGET_SUBJECTS_OF: "?f ?t ?any .",
+    TARGET_OBJECTS_OF: "?any ?t ?f .",
+}
+
+
+def target_focus_nodes(
+    target_graph: GraphLike,
+    targets: Iterable[Tuple[str, Iterable[RDFNode]]],
+    batch_size: int = DEFAULT_SPARQL_BATCH_SIZE,
+    page_size: Optional[int] = DEFAULT_SPARQL_PAGE_SIZE,
+    concurrency: int = DEFAULT_SPARQL_CONCURRENCY,
+    cache: Optional[Dict[Any, FrozenSet[RDFNode]]] = None,
+) -> Set[RDFNode]:
+    """
+    Find the focus nodes of target declarations, with a separate query for each kind of target.
+
+    The targets of each kind are sent in batches with a VALUES block. Blank node targets are each bound in a
+    query of their own. Queries already in the cache are not sent again, so shapes with the same target
+    declarations share their focus nodes.
+
+    :param target_graph: The graph to query
+    :param targets: Pairs of (target kind, target nodes), the kind is one of TARGET_CLASS, TARGET_SUBJECTS_OF
+    or TARGET_OBJECTS_OF
+    :param batch_size: The maximum number of targets in each VALUES block
+    :param page_size: The number of solutions to read with each request
+    :param concurrency: The maximum number of queries to send at once, to a remote graph
+    :param cache: A dict to keep the focus nodes of each query in, for the validation run
+    :return: The set of focus nodes
+    """
+    queries: List[Tuple[str, Optional[RDFNode]]] = []
+    for kind, nodes in targets:
+        pattern = _target_patterns[kind]
+        nodes = set(nodes)
+        named = sorted(n for n in nodes if not isinstance(n, BNode))
+        for batch in batched(named, max(1, batch_size)):
+            values = "VALUES ?t {{ {} }}\n".format(" ".join(n.n3() for n in batch))
+            queries.append((f"SELECT DISTINCT ?f WHERE {{\n{values}\t{pattern}\n}}\nORDER BY ?f", None))
+        for n in nodes:
+            if isinstance(n, BNode):
+                queries.append((f"SELECT DISTINCT ?f WHERE {{\n\t{pattern}\n}}\nORDER BY ?f", n))
+    graph_id = id(target_graph)
+    if cache is None:
+        cache = {}
+    to_fetch = [q for q in dict.fromkeys(queries) if (graph_id, q) not in cache]
+
+    def fetch(query: Tuple[str, Optional[RDFNode]]) -> FrozenSet[RDFNode]:
+        text, bound = query
+        init_bindings = None if bound is None else {"t": bound}
+        rows = paged_select(target_graph, text, page_size, init_bindings=init_bindings)
+        return frozenset(cast("RDFNode", r[0]) for r in rows)
+
+    if not is_remote_graph(target_graph):
+        concurrency = 1
+    for query, found in zip(to_fetch, run_concurrently(fetch, to_fetch, concurrency)):
+        cache[(graph_id, query)] = found
+    focus_nodes: Set[RDFNode] = set()
+    for query in queries:
+        focus_nodes.update(cache[(graph_id, query)])
+    return focus_nodes
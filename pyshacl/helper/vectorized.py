@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+#
+"""
+Vectorized value checks, with NumPy.
+
+When the optional numpy extra is installed, the value range and string length checks of a shape can test all of
+its value nodes at once. The values of well-typed integer and floating point literals are extracted into typed arrays
+and compared with vectorized operations. Every other value node (a non-literal, an ill-typed literal, a literal of
+any other datatype, or an integer too big for an int64) is tested one at a time by the scalar check, so the results
+are exactly the same as without NumPy.
+"""
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from rdflib import BNode, Literal
+from rdflib.namespace import XSD
+
+from pyshacl.consts import XSD_WHOLE_INTEGERS
+from pyshacl.rdfutil import literal_value
+
+try:
+    import numpy as np
+
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+    if not TYPE_CHECKING:
+        np = None
+
+# Below this number of value nodes, building the arrays costs more than it saves.
+MIN_VECTORIZED_VALUES = 64
+
+# Integers and floats with a magnitude up to this are converted between int64 and float64 exactly
+_MAX_EXACT_FLOAT_INT = 2**53
+
+_INTEGER_DATATYPES = frozenset(XSD_WHOLE_INTEGERS)
+_FLOAT_DATATYPES = frozenset((XSD.double, XSD.float))
+
+# A batch check takes the value nodes, and a memo shared by the batch checks of the same pass.
+# It returns an array of booleans, True for each value node that conforms.
+BatchCheck = Callable[[Sequence[Any], Dict], Any]
+
+
+def numeric_arrays(values: Sequence[Any], memo: Dict) -> Tuple[Any, Any, Any, Any, List[int]]:
+    """
+    Split the value nodes into well-typed integer literals, well-typed float and double literals, and all the rest.
+    Returns the positions and values of the integers (as int64), the positions and values of the floats
+    (as float64), and the positions of the rest.
+    """
+    try:
+        return memo["numeric"]
+    except KeyError:
+        pass
+    int_pos: List[int] = []
+    int_vals: List[int] = []
+    float_pos: List[int] = []
+    float_vals: List[float] = []
+    rest: List[int] = []
+    for k, v in enumerate(values):
+        if isinstance(v, Literal):
+            value, ill_typed = literal_value(v)
+            if ill_typed:
+                rest.append(k)
+                continue
+            value_type = type(value)
+            if value_type is int and v.datatype in _INTEGER_DATATYPES:
+                int_pos.append(k)
+                int_vals.append(value)
+                continue
+            elif value_type is float and v.datatype in _FLOAT_DATATYPES:
+                float_pos.append(k)
+                float_vals.append(value)
+                continue
+        rest.append(k)
+    try:
+        ints = np.array(int_vals, dtype=np.int64)
+    except OverflowError:
+        # Too big for an int64, these are compared as Python ints
+        rest.extend(int_pos)
+        rest.sort()
+        int_pos = []
+        ints = np.array([], dtype=np.int64)
+    arrays = (np.array(int_pos, dtype=np.intp), ints, np.array(float_pos, dtype=np.intp), np.array(float_vals), rest)
+    memo["numeric"] = arrays
+    return arrays
+
+
+def _compare(arr, m):
+    """The results of compare_literal() between each value in the array and m: 0 if equal, 1 if greater, else -1."""
+    return np.where(arr == m, 0, np.where(arr > m, 1, -1))
+
+
+def range_batch(m_val: Literal, accept: Callable, scalar_check: Callable[[Any], bool]) -> Optional[BatchCheck]:
+    """
+    A batch version of a value range check against m_val, where accept(cmp) is True for the results of
+    compare_literal(value_node, m_val) that pass. Returns None if NumPy is not installed, or m_val is not a
+    well-typed integer or float literal.
+    """
+    if not has_numpy:
+        return None
+    m, ill_typed = literal_value(m_val)
+    if ill_typed:
+        return None
+    m_type = type(m)
+    if not (
+        (m_type is int and m_val.datatype in _INTEGER_DATATYPES)
+        or (m_type is float and m_val.datatype in _FLOAT_DATATYPES)
+    ):
+        return None
+
+    def batch(values: Sequence[Any], memo: Dict):
+        int_pos, ints, float_pos, floats, rest = numeric_arrays(values, memo)
+        ok = np.zeros(len(values), dtype=bool)
+        rest = list(rest)
+        if len(ints):
+            if m_type is int and -(2**63) <= m < 2**63:
+                ok[int_pos] = accept(_compare(ints, m))
+            elif m_type is float and -_MAX_EXACT_FLOAT_INT <= ints.min() and ints.max() <= _MAX_EXACT_FLOAT_INT:
+                ok[int_pos] = accept(_compare(ints.astype(np.float64), m))
+            else:
+                rest.extend(int_pos.tolist())
+        if len(floats):
+            if m_type is float or abs(m) <= _MAX_EXACT_FLOAT_INT:
+                ok[float_pos] = accept(_compare(floats, float(m)))
+            else:
+                rest.extend(float_pos.tolist())
+        for k in rest:
+            ok[k] = scalar_check(values[k])
+        return ok
+
+    return batch
+
+
+def length_batch(value_node_to_string: Callable[[Any], str], accept: Callable) -> Optional[BatchCheck]:
+    """
+    A batch version of a string length check, where accept(lengths) is True for the lengths that pass.
+    Blank nodes never pass. Returns None if NumPy is not installed.
+    """
+    if not has_numpy:
+        return None
+
+    def batch(values: Sequence[Any], memo: Dict):
+        try:
+            lengths, bnodes = memo["lengths"]
+        except KeyError:
+            n = len(values)
+            lengths = np.fromiter(
+                (0 if isinstance(v, BNode) else len(value_node_to_string(v)) for v in values), dtype=np.int64, count=n
+            )
+            bnodes = np.fromiter((isinstance(v, BNode) for v in values), dtype=bool, count=n)
+            memo["lengths"] = lengths, bnodes
+        return accept(lengths) & ~bnodes
+
+    return batch
+
+
+def failing_positions(ok) -> List[int]:
+    """The positions of the value nodes that do not conform, from the result of a batch check."""
+    return np.flatnonzero(~ok).tolist()
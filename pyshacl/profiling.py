@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+#
+"""
+Structured profiling of a validation run.
+
+When profiling is enabled, every run of a shape and of each of its constraint components is timed, and its focus
+nodes, value nodes, results, data graph calls and SPARQL queries are counted. Data graph calls are also timed, and
+kept as a histogram by access method. The counts are collected into a ValidationProfile, which can be read as Python
+objects, dumped to JSON, or summarised as a table of the most expensive shapes and constraints.
+
+Times include the time spent validating any other shapes that a shape or constraint refers to (eg, with
+sh:property or sh:node). Graph calls and SPARQL queries are counted against the innermost running shape and
+constraint only, through the data_graph_scope context variable of the InstrumentedDataGraph.
+"""
+
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Union
+
+from .graph_abstraction import data_graph_scope
+from .rdfutil import stringify_node
+
+if TYPE_CHECKING:
+    from .shape import Shape
+
+# Fields that the records can be sorted by
+PROFILE_KEYS = (
+    'time',
+    'runs',
+    'focus_count',
+    'value_count',
+    'result_count',
+    'graph_calls',
+    'graph_time',
+    'sparql_queries',
+)
+
+
+class ConstraintProfile(object):
+    """The counters of one constraint component on one shape, over all of its runs."""
+
+    __slots__ = (
+        'shape',
+        'component',
+        'runs',
+        'time',
+        'focus_count',
+        'value_count',
+        'result_count',
+        'graph_calls',
+        'graph_time',
+        'graph_call_histogram',
+        'sparql_queries',
+    )
+
+    def __init__(self, shape: 'ShapeProfile', component: str):
+        self.shape = shape
+        self.component = component
+        self.runs = 0
+        self.time = 0.0
+        self.focus_count = 0
+        self.value_count = 0
+        self.result_count = 0
+        self.graph_calls = 0
+        self.graph_time = 0.0
+        # The number of calls to each access method of the data graph
+        self.graph_call_histogram: Dict[str, int] = {}
+        self.sparql_queries = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {'component': self.component}
+        d.update((k, getattr(self, k)) for k in PROFILE_KEYS)
+        d['graph_call_histogram'] = dict(self.graph_call_histogram)
+        return d
+
+    def __repr__(self) -> str:
+        return f"<ConstraintProfile {self.component} on {self.shape.name} time={self.time:.6f}s runs={self.runs}>"
+
+
+class ShapeProfile(object):
+    """
+    The counters of one shape, over all of its runs.
+    The graph calls, graph time and SPARQL queries include those made by its constraints, and in finding its
+    focus nodes and value nodes.
+    """
+
+    __slots__ = (
+        'shape',
+        '_name',
+        'constraints',
+        'runs',
+        'time',
+        'focus_count',
+        'value_count',
+        'result_count',
+        'graph_calls',
+        'graph_time',
+        'graph_call_histogram',
+        'sparql_queries',
+    )
+
+    def __init__(self, shape: 'Shape'):
+        self.shape = shape
+        self._name: Optional[str] = None
+        self.constraints: Dict[str, ConstraintProfile] = {}
+        self.runs = 0
+        self.time = 0.0
+        self.focus_count = 0
+        self.value_count = 0
+        self.result_count = 0
+        self.graph_calls = 0
+        self.graph_time = 0.0
+        # The number of calls to each access method of the data graph
+        self.graph_call_histogram: Dict[str, int] = {}
+        self.sparql_queries = 0
+
+    @property
+    def name(self) -> str:
+        if self._name is None:
+            self._name = stringify_node(self.shape.sg.graph, self.shape.node)
+        return self._name
+
+    def constraint(self, component: str) -> ConstraintProfile:
+        try:
+            return self.constraints[component]
+        except KeyError:
+            c = self.constraints[component] = ConstraintProfile(self, component)
+            return c
+
+    def to_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {'shape': self.name}
+        d.update((k, getattr(self, k)) for k in PROFILE_KEYS)
+        d['graph_call_histogram'] = dict(self.graph_call_histogram)
+        d['constraints'] = [c.to_dict() for c in self.constraints.values()]
+        return d
+
+    def __repr__(self) -> str:
+        return f"<ShapeProfile {self.name} time={self.time:.6f}s runs={self.runs}>"
+
+
+# The list that collect_profiles() is gathering profiles into, if any
+_collecting: ContextVar[Optional[List['ValidationProfile']]] = ContextVar("pyshacl_profile_collecting", default=None)
+
+
+class ValidationProfile(object):
+    """
+    The profile of a validation run.
+
+    Pass profile=True to validate() to collect one, it is then found on the returned ValidationReport as
+    report.profile. An existing ValidationProfile can be passed as the profile option instead, to collect the
+    counters of a run that does not return a ValidationReport (eg, in conforms_only mode), or of several runs.
+    Inside a collect_profiles() block, every validation run collects a profile without being asked to.
+    """
+
+    __slots__ = ('_shapes', 'time')
+
+    def __init__(self):
+        self._shapes: Dict[int, ShapeProfile] = {}
+        self.time = 0.0
+
+    @property
+    def shapes(self) -> List[ShapeProfile]:
+        return list(self._shapes.values())
+
+    @property
+    def constraints(self) -> List[ConstraintProfile]:
+        return [c for s in self._shapes.values() for c in s.constraints.values()]
+
+    def shape(self, shape: 'Shape') -> ShapeProfile:
+        # Shapes are kept by identity, like in the results table
+        try:
+            return self._shapes[id(shape)]
+        except KeyError:
+            s = self._shapes[id(shape)] = ShapeProfile(shape)
+            return s
+
+    def shape_named(self, name: str) -> ShapeProfile:
+        """The record of the shape with this name, as it is written in the profile (eg, "ex:PersonShape")."""
+        for s in self._shapes.values():
+            if s.name == name:
+                return s
+        raise KeyError(name)
+
+    @contextmanager
+    def run(self) -> Iterator['ValidationProfile']:
+        t1 = perf_counter()
+        try:
+            yield self
+        finally:
+            self.time += perf_counter() - t1
+
+    @contextmanager
+    def shape_run(self, shape: 'Shape') -> Iterator[ShapeProfile]:
+        record = self.shape(shape)
+        token = data_graph_scope.set((record, None))
+        t1 = perf_counter()
+        try:
+            yield record
+        finally:
+            record.time += perf_counter() - t1
+            record.runs += 1
+            data_graph_scope.reset(token)
+
+    @contextmanager
+    def constraint_run(self, shape_record: ShapeProfile, component: str) -> Iterator[ConstraintProfile]:
+        record = shape_record.constraint(component)
+        token = data_graph_scope.set((shape_record, record))
+        t1 = perf_counter()
+        try:
+            yield record
+        finally:
+            record.time += perf_counter() - t1
+            record.runs += 1
+            data_graph_scope.reset(token)
+
+    @staticmethod
+    def count_call(scope: Any, method: str, elapsed: float) -> None:
+        """
+        Count one call to an access method of the data graph, against the shape and constraint it was made in.
+        This is the callback given to the InstrumentedDataGraph that wraps the data graph while profiling.
+        """
+        if scope is None:
+            return
+        shape_record, constraint_record = scope
+        for record in (shape_record, constraint_record):
+            if record is None:
+                continue
+            if method == "query":
+                record.sparql_queries += 1
+            else:
+                record.graph_calls += 1
+            record.graph_time += elapsed
+            record.graph_call_histogram[method] = record.graph_call_histogram.get(method, 0) + 1
+
+    def top(
+        self, n: Optional[int] = 10, key: str = 'time', constraints: bool = False
+    ) -> List[Union[ShapeProfile, ConstraintProfile]]:
+        """
+        The most expensive shapes, or constraints, sorted by one of their counters.
+
+        :param n: The number of records to return, None returns all of them
+        :param key: The counter to sort by, one of PROFILE_KEYS
+        :param constraints: Sort the constraint records, rather than the shape records
+        """
+        if key not in PROFILE_KEYS:
+            raise ValueError(f"Cannot sort the profile by {key}, expected one of {', '.join(PROFILE_KEYS)}.")
+        records: List[Union[ShapeProfile, ConstraintProfile]]
+        records = list(self.constraints) if constraints else list(self.shapes)
+        records.sort(key=lambda r: getattr(r, key), reverse=True)
+        return records if n is None else records[:n]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'time': self.time,
+            'shapes': [s.to_dict() for s in self.top(None)],
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def summary(self, n: int = 10, key: str = 'time') -> str:
+        """A text table of the top n shapes and the top n constraints, sorted by one of their counters."""
+        header = (
+            f"{'time (ms)':>12} {'runs':>7} {'focus':>9} {'values':>9} {'results':>9} {'calls':>9} "
+            f"{'call (ms)':>10} {'queries':>9}"
+        )
+
+        def row(r: Union[ShapeProfile, ConstraintProfile], label: str) -> str:
+            return (
+                f"{r.time * 1000.0:>12.3f} {r.runs:>7} {r.focus_count:>9} {r.value_count:>9} "
+                f"{r.result_count:>9} {r.graph_calls:>9} {r.graph_time * 1000.0:>10.3f} {r.sparql_queries:>9}  {label}"
+            )
+
+        lines = [
+            f"Validation Profile: {len(self._shapes)} shapes, {len(self.constraints)} constraints, "
+            f"{self.time * 1000.0:.3f}ms",
+            f"Top {n} shapes by {key}:",
+            header + "  shape",
+        ]
+        for s in self.top(n, key):
+            assert isinstance(s, ShapeProfile)
+            lines.append(row(s, s.name))
+        lines.append(f"Top {n} constraints by {key}:")
+        lines.append(header + "  constraint")
+        for c in self.top(n, key, constraints=True):
+            assert isinstance(c, ConstraintProfile)
+            lines.append(row(c, f"{c.component} on {c.shape.name}"))
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def collect_profiles() -> Iterator[List[ValidationProfile]]:
+    """
+    Profile every validation run inside this block, without passing the profile option to each one.
+    Yields a list, which gets the ValidationProfile of each run appended to it as the run starts.
+    Runs that are given their own profile option are not collected.
+    """
+    profiles: List[ValidationProfile] = []
+    token = _collecting.set(profiles)
+    try:
+        yield profiles
+    finally:
+        _collecting.reset(token)
+
+
+def collected_profile() -> Optional[ValidationProfile]:
+    """A new ValidationProfile for a validation run, when inside a collect_profiles() block."""
+    profiles = _collecting.get()
+    if profiles is None:
+        return None
+    profile = ValidationProfile()
+    profiles.append(profile)
+    return profile
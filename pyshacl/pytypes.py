@@ -2,11 +2,20 @@
 #
 
 from dataclasses import dataclass
-from typing import List, Optional, Union
+from typing import TYPE_CHECKING, List, Optional, Union
 
 from rdflib import Dataset, Graph, Literal
 from rdflib.term import IdentifiedNode, URIRef
 
+from .helper.sparql_remote_helper import (
+    DEFAULT_SPARQL_BATCH_SIZE,
+    DEFAULT_SPARQL_CONCURRENCY,
+    DEFAULT_SPARQL_PAGE_SIZE,
+)
+
+if TYPE_CHECKING:
+    from .profiling import ValidationProfile
+
 GraphLike = Union[Dataset, Graph]
 RDFNode = Union[IdentifiedNode, Literal]
 
@@ -16,6 +25,7 @@ class SHACLExecutor:
     validator: Optional[object] = None
     advanced_mode: bool = False
     abort_on_first: bool = False
+    conforms_only: bool = False
     allow_infos: bool = False
     allow_warnings: bool = False
     iterate_rules: bool = False
@@ -23,3 +33,10 @@ class SHACLExecutor:
     sparql_mode: bool = False
     max_validation_depth: int = 15
     focus_nodes: Optional[List[URIRef]] = None
+    max_results_per_shape: Optional[int] = None
+    max_results_total: Optional[int] = None
+    sample_rate: Optional[float] = None
+    sparql_batch_size: int = DEFAULT_SPARQL_BATCH_SIZE
+    sparql_page_size: Optional[int] = DEFAULT_SPARQL_PAGE_SIZE
+    sparql_concurrency: int = DEFAULT_SPARQL_CONCURRENCY
+    profile: Optional['ValidationProfile'] = None
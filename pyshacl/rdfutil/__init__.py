@@ -4,5 +4,14 @@
 
 from .clone import clone_blank_node, clone_graph, clone_literal, clone_node, mix_datasets, mix_graphs  # noqa: F401
 from .compare import compare_blank_node, compare_literal, compare_node, order_graph_literal  # noqa: F401
-from .load import add_baked_in, get_rdf_from_web, load_from_source  # noqa: F401
-from .stringify import stringify_blank_node, stringify_graph, stringify_literal, stringify_node  # noqa: F401
+from .literal import LEXICAL_VALIDATORS, is_lexically_valid, literal_memo, literal_value  # noqa: F401
+from .load import add_baked_in, get_rdf_from_web, load_from_source, load_sources  # noqa: F401
+from .snapshot import is_snapshot, read_snapshot, write_snapshot  # noqa: F401
+from .stringify import (  # noqa: F401
+    stringify_blank_node,
+    stringify_graph,
+    stringify_literal,
+    stringify_memo,
+    stringify_node,
+)
+from .web_cache import get_web_cache, set_web_cache  # noqa: F401
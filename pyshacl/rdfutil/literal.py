@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+"""
+Literal values and ill-typedness, with the lexical checks memoized.
+
+RDFLib converts the lexical form of a literal to a Python value, and marks it ill_typed when that conversion fails.
+But RDFLib has no converter for many XSD datatypes (like xsd:gYear or xsd:NCName), and converts some others
+(like xsd:language) to a plain string, which never fails. Literals of those datatypes are checked here against the
+XSD lexical space of their datatype instead, with a compiled regular expression each.
+Literals that RDFLib did convert to some other value are not checked again, because RDFLib replaces their lexical
+form with the canonical form of their value.
+Within a literal_memo() context, such as a validation run, literal_value() is also memoized by lexical form and
+datatype.
+"""
+
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, Optional, Pattern, Tuple
+
+from rdflib import Literal
+from rdflib.namespace import XSD
+
+# The most lexical checks kept in the memo. When full, the least recently used entry is forgotten.
+LITERAL_CACHE_MAX = 100000
+# Bound on the number of memoized literal values in a literal_memo(), the memo is emptied when it is full
+LITERAL_MEMO_MAX = 65536
+
+_literal_memo: ContextVar[Optional[Dict[Tuple[str, Any], Tuple[Any, bool]]]] = ContextVar("literal_memo", default=None)
+
+_XSD_WHITESPACE = " \t\n\r"
+
+_year = r"-?(?:[1-9][0-9]{3,}|0[0-9]{3})"
+_month = r"(?:0[1-9]|1[0-2])"
+_day = r"(?:0[1-9]|[12][0-9]|3[01])"
+_tz = r"(?:Z|[+-](?:(?:0[0-9]|1[0-3]):[0-5][0-9]|14:00))"
+# A month and day, where the day is in that month (in a leap year)
+_month_day = r"(?:(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9])|(?:0[13-9]|1[0-2])-30|(?:0[13578]|1[02])-31)"
+_time = r"(?:(?:[01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9](?:\.[0-9]+)?|24:00:00(?:\.0+)?)"
+# NameStartChar and NameChar, from the XML 1.0 (fifth edition) recommendation, without ":"
+_name_start_char = (
+    "A-Z_a-z\u00c0-\u00d6\u00d8-\u00f6\u00f8-\u02ff\u0370-\u037d\u037f-\u1fff\u200c-\u200d\u2070-\u218f"
+    "\u2c00-\u2fef\u3001-\ud7ff\uf900-\ufdcf\ufdf0-\ufffd\U00010000-\U000effff"
+)
+_name_char = _name_start_char + "\\-.0-9\u00b7\u0300-\u036f\u203f-\u2040"
+_ncname = f"[{_name_start_char}][{_name_char}]*"
+
+_lexical_spaces = {
+    XSD.dateTimeStamp: f"{_year}-{_month}-{_day}T{_time}{_tz}",
+    XSD.gYear: f"{_year}{_tz}?",
+    XSD.gYearMonth: f"{_year}-{_month}{_tz}?",
+    XSD.gMonth: f"--{_month}{_tz}?",
+    XSD.gMonthDay: f"--{_month_day}{_tz}?",
+    XSD.gDay: f"---{_day}{_tz}?",
+    XSD.language: r"[a-zA-Z]{1,8}(?:-[a-zA-Z0-9]{1,8})*",
+    XSD.NMTOKEN: f"[{_name_char}:]+",
+    XSD.Name: f"[{_name_start_char}:][{_name_char}:]*",
+    XSD.NCName: _ncname,
+    XSD.ID: _ncname,
+    XSD.IDREF: _ncname,
+    XSD.ENTITY: _ncname,
+}
+
+# The lexical space of each XSD datatype that is checked, as a compiled regular expression
+LEXICAL_VALIDATORS: Dict[Any, Pattern] = {dt: re.compile(p) for dt, p in _lexical_spaces.items()}
+
+
+@lru_cache(maxsize=LITERAL_CACHE_MAX)
+def is_lexically_valid(lexical: str, datatype) -> bool:
+    """
+    True if the lexical form is in the lexical space of the datatype, or the datatype is not one that is checked.
+    The XSD whitespace facet of all the checked datatypes is collapse, so leading and trailing whitespace is allowed.
+    This is a pure function of its arguments, so it is memoized for the whole process.
+    """
+    validator = LEXICAL_VALIDATORS.get(datatype, None)
+    if validator is None:
+        return True
+    return validator.fullmatch(lexical.strip(_XSD_WHITESPACE)) is not None
+
+
+@contextmanager
+def literal_memo(memo: Optional[Dict] = None):
+    """
+    Memoize literal_value() by (lexical form, datatype) in the given dict (or a new one) within this context.
+    Each validation run uses a memo of its own, which is dropped when the run ends.
+    Outside of any memo context, only the lexical checks are memoized.
+    """
+    if memo is None:
+        memo = {}
+    token = _literal_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _literal_memo.reset(token)
+
+
+def literal_value(lit: Literal) -> Tuple[Any, bool]:
+    """
+    The Python value of a literal, and True if the literal is ill-typed.
+    The lexical checks are memoized by lexical form and datatype, and so is the result within a literal_memo().
+    """
+    datatype = lit.datatype
+    memo = _literal_memo.get()
+    if memo is None or datatype is None:
+        return _literal_value(lit)
+    key = (str(lit), datatype)
+    try:
+        return memo[key]
+    except KeyError:
+        pass
+    result = _literal_value(lit)
+    if len(memo) >= LITERAL_MEMO_MAX:
+        memo.clear()
+    memo[key] = result
+    return result
+
+
+def _literal_value(lit: Literal) -> Tuple[Any, bool]:
+    value = lit.value
+    ill_typed = lit.ill_typed
+    if ill_typed is False and not isinstance(value, str):
+        # RDFLib has already checked it
+        return value, False
+    elif ill_typed is True:
+        return value, True
+    datatype = lit.datatype
+    if datatype not in LEXICAL_VALIDATORS:
+        return value, False
+    return value, not is_lexically_valid(str(lit), datatype)
@@ -5,19 +5,41 @@ import os
 import pickle
 import platform
 import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from io import BufferedIOBase, BytesIO, TextIOBase, UnsupportedOperation
 from logging import WARNING, Logger, getLogger
 from pathlib import Path, PurePath
-from typing import IO, List, Optional, Union, cast
+from typing import IO, TYPE_CHECKING, Any, Iterable, List, Optional, Tuple, Union, cast
 from urllib import request
-from urllib.error import HTTPError
+from urllib.error import HTTPError, URLError
 from urllib.parse import unquote_to_bytes
 
 import rdflib
 from rdflib.namespace import SDO, NamespaceManager
 from rdflib.term import URIRef
 
+from ..graph_abstraction import convert_triple_to_oxigraph, to_ox
 from .clone import clone_dataset, clone_graph
+from .snapshot import is_snapshot, read_snapshot, write_snapshot
+from .web_cache import get_web_cache, parse_web_response
+
+try:
+    from pyoxigraph import DefaultGraph as ox_DefaultGraph
+    from pyoxigraph import NamedNode as ox_NamedNode
+    from pyoxigraph import Quad as ox_Quad
+    from pyoxigraph import RdfFormat as ox_RdfFormat
+    from pyoxigraph import Store as ox_Store
+
+    has_oxigraph = True
+except ImportError:
+    has_oxigraph = False
+    if not TYPE_CHECKING:
+        ox_DefaultGraph = None
+        ox_NamedNode = None
+        ox_Quad = None
+        ox_RdfFormat = None
+        ox_Store = None
 
 SCHEMA = SDO
 
@@ -25,6 +47,8 @@ GraphLike = Union[rdflib.Dataset, rdflib.Graph]
 
 is_windows = platform.system() == "Windows"
 MAX_OWL_IMPORT_DEPTH = 3
+# Fewer sources than this are not worth starting a process pool for
+PARALLEL_LOAD_THRESHOLD = 4
 baked_in = {}
 
 
@@ -90,8 +114,28 @@ def get_rdf_from_web(url: Union[URIRef, str]):
     }
     known_format = None
 
+    cache = get_web_cache()
+    cached_graph: Optional[rdflib.Graph]
+    cached_graph, validators = cache.lookup(no_hash_url)
+    if cache.offline:
+        if cached_graph is None:
+            raise RuntimeError("Cannot pull RDF URL from the web in offline mode, it is not cached: {}".format(url))
+        return cached_graph, None, "graph", False
+    # Ask the server to skip sending it again if our cached snapshot is still current
+    headers.update(validators)
+
     r: request.Request = request.Request(url, headers=headers)
-    resp: http.client.HTTPResponse = request.urlopen(r)
+    try:
+        resp: http.client.HTTPResponse = request.urlopen(r)
+    except HTTPError as e:
+        if e.code == 304 and cached_graph is not None:
+            return cached_graph, None, "graph", False
+        raise
+    except URLError:
+        if cached_graph is not None:
+            # Can't reach the server, the last snapshot is better than nothing
+            return cached_graph, None, "graph", False
+        raise
     code: int = resp.getcode()
     if not (200 <= code <= 210):
         raise RuntimeError("Cannot pull RDF URL from the web: {}, code: {}".format(url, str(code)))
@@ -129,6 +173,18 @@ def get_rdf_from_web(url: Union[URIRef, str]):
                 continue
             break
 
+    if cache.enabled:
+        data = resp.read()
+        resp.close()
+        graph = parse_web_response(no_hash_url, data, known_format, filename)
+        cache.store(
+            no_hash_url,
+            graph,
+            etag=resp.headers.get('ETag', None),
+            last_modified=resp.headers.get('Last-Modified', None),
+        )
+        return graph, filename, "graph", False
+
     transfer_encodings: List[str] = resp.headers.get_all('Transfer-Encoding', [])
     for t_e in transfer_encodings:
         te_parts = [s.strip() for s in str(t_e).split(',')]
@@ -156,19 +212,22 @@ def get_rdf_from_web(url: Union[URIRef, str]):
 
 def load_from_source(
     source: Union[GraphLike, BufferedIOBase, TextIOBase, str, bytes],
-    g: Optional[GraphLike] = None,
+    g: Optional[Union[GraphLike, "ox_Store"]] = None,
     rdf_format: Optional[str] = None,
     identifier: Optional[Union[URIRef, str]] = None,
     multigraph: bool = False,
     do_owl_imports: Union[bool, int] = False,
     import_chain: Optional[List[Union[URIRef, str]]] = None,
     logger: Optional[Logger] = None,
+    use_oxigraph: bool = False,
 ):
     """
 
     :param source:
     :param g: The Graph to load into, optional. If not given, a new Dataset or Graph will be created.
-    :type g: rdflib.Graph | None
+    This can also be an Oxigraph Store, then the source is parsed by Oxigraph directly into it. A source Oxigraph
+    cannot load (eg, a web URL, or an rdflib Graph) is loaded by rdflib, and its triples are added to the Store.
+    :type g: rdflib.Graph | pyoxigraph.Store | None
     :param rdf_format:
     :type rdf_format: str | None
     :param multigraph:
@@ -181,8 +240,31 @@ def load_from_source(
     :type import_chain: list | None
     :param logger:
     :type logger: Logger | None
+    :param use_oxigraph: Parse the source with Oxigraph directly into a new Oxigraph Store, and return that Store.
+    If Oxigraph cannot load this source (eg, a web URL, or an unsupported format) it is loaded by rdflib as usual.
+    :type use_oxigraph: bool
     :return:
     """
+    if has_oxigraph and isinstance(g, ox_Store):
+        if not isinstance(source, (rdflib.Graph, rdflib.Dataset)):
+            if load_into_oxigraph(source, g, rdf_format, identifier) is not None:
+                return g
+            # Oxigraph cannot load this source itself, so rdflib loads it
+            source = load_from_source(
+                source,
+                rdf_format=rdf_format,
+                identifier=identifier,
+                multigraph=multigraph,
+                do_owl_imports=do_owl_imports,
+                import_chain=import_chain,
+                logger=logger,
+            )
+        add_to_oxigraph(g, cast(GraphLike, source), identifier)
+        return g
+    elif use_oxigraph and g is None and not do_owl_imports and not isinstance(source, (rdflib.Graph, rdflib.Dataset)):
+        ox_store = load_into_oxigraph(source, None, rdf_format, identifier)
+        if ox_store is not None:
+            return ox_store
     source_is_graph = False
     open_source: Optional[BufferedIOBase] = None
     source_was_open: bool = False
@@ -404,6 +486,9 @@ def load_from_source(
                 _source.close()
             source = _source = new_bytes
             source_was_open = False
+        if rdf_format in (None, 'snapshot') and is_snapshot(cast(IO[bytes], _source)):
+            # A pySHACL binary snapshot, this is loaded directly, not parsed
+            rdf_format = 'snapshot'
         if rdf_format is None:
             line: Union[bytes, None] = _source.readline()
             line = None if line is None else line.lstrip()
@@ -487,7 +572,10 @@ def load_from_source(
 
         # use base_uri if it is set, otherwise use identifier or _maybe_id
         parser_base_uri: Union[str, None] = base_uri if base_uri else (identifier if identifier else _maybe_id)
-        if isinstance(target_g, rdflib.Dataset):
+        if rdf_format == 'snapshot':
+            # The snapshot keeps the base URI of the graph it was made from
+            read_snapshot(_source, g=target_g, identifier=identifier)
+        elif isinstance(target_g, rdflib.Dataset):
             if identifier:
                 dest_g = target_g.get_context(URIRef(identifier))
                 dest_g.base = parser_base_uri
@@ -677,3 +765,219 @@ def chain_load_owl_imports(
                 else:
                     done_imports += _done_imports
     return target_g
+
+
+# rdflib format names, and the Oxigraph parsers that can read them natively
+OXIGRAPH_FORMATS = {
+    'turtle': 'TURTLE',
+    'ttl': 'TURTLE',
+    'nt': 'N_TRIPLES',
+    'nt11': 'N_TRIPLES',
+    'ntriples': 'N_TRIPLES',
+    'n-triples': 'N_TRIPLES',
+    'nquads': 'N_QUADS',
+    'nq': 'N_QUADS',
+    'n-quads': 'N_QUADS',
+    'trig': 'TRIG',
+    'xml': 'RDF_XML',
+    'rdf/xml': 'RDF_XML',
+    'application/rdf+xml': 'RDF_XML',
+    'n3': 'N3',
+    'json-ld': 'JSON_LD',
+    'jsonld': 'JSON_LD',
+}
+
+
+def load_into_oxigraph(
+    source: Union[BufferedIOBase, TextIOBase, str, bytes],
+    store: Optional["ox_Store"] = None,
+    rdf_format: Optional[str] = None,
+    identifier: Optional[Union[URIRef, str]] = None,
+) -> Optional["ox_Store"]:
+    """
+    Parse a source straight into an Oxigraph Store with Oxigraph's own parsers (via Store.bulk_load),
+    without any rdflib intermediate.
+    Turtle, N-Triples, N-Quads, TriG, N3, RDF/XML and JSON-LD are supported.
+
+    :param source: A file path, a file: URI, raw RDF data, or an open file.
+    :param store: The Oxigraph Store to load into, optional. If not given, a new in-memory Store is created.
+    :param rdf_format:
+    :type rdf_format: str | None
+    :param identifier: Load the triples into this named graph, rather than the default graph.
+    :type identifier: str | URIRef | None
+    :return: The Store, or None if this source cannot be loaded by Oxigraph (eg, a web URL or an unknown format)
+    """
+    if not has_oxigraph:
+        raise RuntimeError("Cannot load directly into Oxigraph, the pyoxigraph package is not installed.")
+    path: Optional[str] = None
+    data: Optional[Union[bytes, IO[bytes]]] = None
+    if isinstance(source, TextIOBase):
+        source = cast(BufferedIOBase, getattr(source, "buffer"))
+    if isinstance(source, BufferedIOBase):
+        name = getattr(source, 'name', None)
+        if isinstance(name, str) and os.path.isfile(name):
+            # Let Oxigraph read a regular file itself
+            path = name
+        else:
+            data = cast(IO[bytes], source)
+    elif isinstance(source, str):
+        if source.startswith('http:') or source.startswith('https:'):
+            # Web sources go through get_rdf_from_web, for content negotiation and the web cache
+            return None
+        if source in ("-", "stdin", "/dev/stdin"):
+            data = cast(IO[bytes], sys.stdin.buffer)
+        elif source.startswith('file:'):
+            path = str(path_from_uri(source, relative_to=None).absolute())
+        elif source[0:1] in ('#', '@', '<', '\n', '{', '[') or (len(source) >= 32 and '\n' in source[:32]):
+            data = source.encode('utf-8')
+        else:
+            path = source
+    elif isinstance(source, bytes):
+        if source.startswith(b'file:') or source.startswith(b'http:') or source.startswith(b'https:'):
+            raise ValueError("file: and http: strings should be given as str, not bytes.")
+        data = source
+    else:
+        return None
+    if rdf_format is None and path is not None:
+        ext = Path(path).suffix.lstrip('.').lower()
+        ox_format = ox_RdfFormat.from_extension(ext) if ext else None
+    elif rdf_format is None:
+        if isinstance(data, bytes):
+            head = data.lstrip()[:15].lower()
+        else:
+            # Can't peek at a stream, and Oxigraph needs a format up front
+            head = b""
+        if head.startswith(b"<?xml") or head.startswith(b"<rdf:"):
+            ox_format = ox_RdfFormat.RDF_XML
+        elif head.startswith(b"{") or head.startswith(b"["):
+            ox_format = ox_RdfFormat.JSON_LD
+        else:
+            ox_format = ox_RdfFormat.TURTLE
+    else:
+        format_name = OXIGRAPH_FORMATS.get(rdf_format.lower(), None)
+        ox_format = None if format_name is None else getattr(ox_RdfFormat, format_name)
+    if ox_format is None:
+        return None
+    if identifier:
+        base_iri: Optional[str] = str(identifier)
+    elif path is not None:
+        base_iri = Path(path).absolute().as_uri()
+    else:
+        base_iri = None
+    if store is None:
+        store = ox_Store()
+    to_graph = ox_NamedNode(str(identifier)) if identifier else None
+    if data is None:
+        store.bulk_load(path=path, format=ox_format, base_iri=base_iri, to_graph=to_graph)
+    else:
+        store.bulk_load(data, format=ox_format, base_iri=base_iri, to_graph=to_graph)
+    return store
+
+
+def add_to_oxigraph(store: "ox_Store", graph: GraphLike, identifier: Optional[Union[URIRef, str]] = None) -> None:
+    """
+    Add the quads of an rdflib Dataset, or the triples of an rdflib Graph, to an Oxigraph Store.
+    The triples of a Graph go into the default graph of the Store, or into the named graph identifier if given.
+    """
+    quads: Iterable[Tuple[Any, Any, Any, Any]]
+    if isinstance(graph, rdflib.Dataset):
+        quads = ((s, p, o, to_ox(c)) for s, p, o, c in graph.quads((None, None, None, None)))
+    else:
+        graph_name = ox_NamedNode(str(identifier)) if identifier else ox_DefaultGraph()
+        quads = ((s, p, o, graph_name) for s, p, o in graph)
+
+    def ox_quads():
+        for s, p, o, c in quads:
+            ox_s, ox_p, ox_o = convert_triple_to_oxigraph((s, p, o))
+            yield ox_Quad(ox_s, ox_p, ox_o, c)
+
+    store.extend(ox_quads())
+
+
+def _load_source_as_snapshot(source: Union[str, bytes], rdf_format: Optional[str]) -> bytes:
+    """Process pool worker. Parse one source into its own Dataset, and send it back as a binary snapshot."""
+    ds = load_from_source(source, rdf_format=rdf_format, multigraph=True, do_owl_imports=False)
+    buf = BytesIO()
+    write_snapshot(ds, buf)
+    return buf.getvalue()
+
+
+def _worker_source(source) -> Optional[Union[str, bytes]]:
+    """What to send to a worker process to load this source, or None if it must be loaded in this process."""
+    if isinstance(source, (str, bytes)):
+        if source in ("-", "stdin", "/dev/stdin", b"-", b"stdin", b"/dev/stdin"):
+            return None
+        return source
+    if isinstance(source, (BufferedIOBase, TextIOBase)):
+        # An open regular file can be opened again by name in the worker
+        name = getattr(source, 'name', None)
+        if isinstance(name, str) and os.path.isfile(name):
+            return os.path.abspath(name)
+    return None
+
+
+def load_sources(
+    sources: List[Union[GraphLike, BufferedIOBase, TextIOBase, str, bytes]],
+    g: rdflib.Dataset,
+    rdf_format: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    logger: Optional[Logger] = None,
+) -> rdflib.Dataset:
+    """
+    Load many sources into one Dataset.
+    File paths, URLs and RDF strings are parsed concurrently in a process pool, each into its own temporary
+    Dataset, and are then bulk-merged into g as binary snapshots. Regular files that are already open are opened
+    again by name in the worker. Streams and Graphs are loaded in this process.
+    Sources are always merged in the order they are given.
+
+    :param sources:
+    :param g: The Dataset to load into
+    :type g: rdflib.Dataset
+    :param rdf_format:
+    :type rdf_format: str | None
+    :param max_workers: The number of worker processes. None uses one per CPU, when there are at least
+    PARALLEL_LOAD_THRESHOLD sources that can be parsed in a worker. 0 or 1 loads all the sources one by one.
+    :type max_workers: int | None
+    :param logger:
+    :type logger: Logger | None
+    :return:
+    """
+    if logger is None:
+        logger = getLogger("rdfutil.load")
+        logger.setLevel(WARNING)
+    worker_sources = [_worker_source(s) for s in sources]
+    n_in_worker = sum(1 for s in worker_sources if s is not None)
+    if max_workers is None:
+        if n_in_worker >= PARALLEL_LOAD_THRESHOLD:
+            # Only count the CPUs this process is allowed to run on
+            max_workers = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+        else:
+            max_workers = 0
+    max_workers = min(max_workers, n_in_worker)
+    snapshots: List[Optional[Future]] = [None] * len(sources)
+    pool: Optional[ProcessPoolExecutor] = None
+    if max_workers > 1:
+        try:
+            pool = ProcessPoolExecutor(max_workers=max_workers)
+            for i, worker_source in enumerate(worker_sources):
+                if worker_source is not None:
+                    snapshots[i] = pool.submit(_load_source_as_snapshot, worker_source, rdf_format)
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            # Some platforms and sandboxes cannot start worker processes
+            logger.warning("Cannot load sources in a process pool, loading them one by one. {}".format(str(e)))
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            pool = None
+            snapshots = [None] * len(sources)
+    try:
+        for source, snapshot in zip(sources, snapshots):
+            if snapshot is None:
+                load_from_source(
+                    source, g=g, rdf_format=rdf_format, multigraph=True, do_owl_imports=False, logger=logger
+                )
+            else:
+                read_snapshot(BytesIO(snapshot.result()), g=g)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    return g
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+#
+"""
+A read-only rdflib SPARQLStore for SPARQL Remote Graph Mode, tuned for sending many small queries.
+
+rdflib's SPARQLStore opens a new HTTP connection for every query, and gives up on the first error. This store
+keeps a pool of keep-alive connections to the endpoint, limits the number of queries in flight at once, retries
+failed requests with exponential backoff, applies a timeout to every request, sends long queries with POST, and
+keeps an LRU cache of result sets keyed by the query text (which includes any bindings).
+"""
+
+import http.client
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+from queue import Empty, LifoQueue
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlencode, urlsplit
+
+from rdflib.plugins.stores.sparqlstore import SPARQLStore
+from rdflib.query import Result
+from rdflib.term import BNode
+
+# Responses with these statuses are worth trying again
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RemoteQueryError(RuntimeError):
+    def __init__(self, message: str, status: Optional[int] = None):
+        super(RemoteQueryError, self).__init__(message)
+        self.status = status
+
+
+class _ConnectionPool(object):
+    """A LIFO pool of keep-alive HTTP connections to one host."""
+
+    __slots__ = ("scheme", "host", "port", "timeout", "size", "_idle")
+
+    def __init__(self, scheme: str, host: str, port: Optional[int], size: int, timeout: Optional[float]):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.size = size
+        self.timeout = timeout
+        self._idle: LifoQueue = LifoQueue()
+
+    def get(self) -> http.client.HTTPConnection:
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def put(self, conn: http.client.HTTPConnection) -> None:
+        if self._idle.qsize() < self.size:
+            self._idle.put_nowait(conn)
+        else:
+            conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                break
+
+
+class RemoteSPARQLStore(SPARQLStore):
+    """
+    A SPARQLStore with connection pooling, concurrency limits, retries, timeouts and a result cache.
+
+    :param query_endpoint: The URL of the SPARQL query endpoint
+    :type query_endpoint: str
+    :param auth: A (username, password) tuple for HTTP Basic Authentication
+    :type auth: tuple | None
+    :param method: "GET", "POST" or "POST_FORM". A GET query longer than post_threshold is sent as POST_FORM.
+    :type method: str
+    :param max_connections: The number of keep-alive connections kept open to the endpoint
+    :type max_connections: int
+    :param max_in_flight: The maximum number of queries waiting on the endpoint at once, default max_connections
+    :type max_in_flight: int | None
+    :param retries: How many times a failed request is tried again
+    :type retries: int
+    :param backoff: Seconds to wait before the first retry, this doubles for each retry after that
+    :type backoff: float
+    :param timeout: Seconds to wait on the endpoint for each request, None waits forever
+    :type timeout: float | None
+    :param post_threshold: URL-encoded GET queries longer than this many characters are sent with POST
+    :type post_threshold: int
+    :param cache_size: The number of result sets to keep in the result cache, 0 disables the cache
+    :type cache_size: int
+    """
+
+    def __init__(
+        self,
+        query_endpoint: str,
+        auth: Optional[Tuple[str, str]] = None,
+        method: str = "GET",
+        max_connections: int = 4,
+        max_in_flight: Optional[int] = None,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: Optional[float] = 60.0,
+        post_threshold: int = 2000,
+        cache_size: int = 1024,
+        **kwargs,
+    ):
+        super(RemoteSPARQLStore, self).__init__(query_endpoint=query_endpoint, auth=auth, method=method, **kwargs)
+        parts = urlsplit(query_endpoint)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError("SPARQL endpoint must be an http:// or https:// URL: {}".format(query_endpoint))
+        self._path = parts.path or "/"
+        self._base_params = parts.query
+        self._pool = _ConnectionPool(parts.scheme, parts.hostname, parts.port, max(1, max_connections), timeout)
+        self._in_flight = threading.BoundedSemaphore(max(1, max_in_flight or max_connections))
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.timeout = timeout
+        self.post_threshold = post_threshold
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, Optional[str]], Result]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+        self.cache_hits = 0
+
+    def _query(self, query: str, default_graph: Optional[str] = None, named_graph: Optional[str] = None) -> Result:
+        self._queries += 1
+        if default_graph is not None and isinstance(default_graph, BNode):
+            default_graph = None
+        key = (query, None if default_graph is None else str(default_graph))
+        if self.cache_size > 0:
+            with self._lock:
+                cached = self._cache.get(key, None)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    self.cache_hits += 1
+                    return cached
+        result = self._send(query, key[1])
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    def _make_request(self, query: str, default_graph: Optional[str]) -> Tuple[str, str, Optional[bytes], Dict]:
+        params: Dict[str, Any] = {}
+        if default_graph is not None:
+            params["default-graph-uri"] = default_graph
+        headers = {"Accept": self.response_mime_types(), "Connection": "keep-alive"}
+        # This includes the Authorization header, when auth is given
+        headers.update(self.kwargs.get("headers", {}))
+        base = self._path + ("?" + self._base_params if self._base_params else "")
+        sep = "&" if self._base_params else "?"
+        method = self.method
+        if method == "GET":
+            qs = urlencode(dict(params, query=query))
+            if len(qs) <= self.post_threshold:
+                return "GET", base + sep + qs, None, headers
+            method = "POST_FORM"
+        if method == "POST":
+            headers["Content-Type"] = "application/sparql-query; charset=UTF-8"
+            url = base + (sep + urlencode(params) if params else "")
+            return "POST", url, query.encode('utf-8'), headers
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+        return "POST", base, urlencode(dict(params, query=query)).encode('utf-8'), headers
+
+    def _send(self, query: str, default_graph: Optional[str]) -> Result:
+        method, url, body, headers = self._make_request(query, default_graph)
+        attempt = 0
+        while True:
+            error: Union[Exception, None] = None
+            status: Optional[int] = None
+            with self._in_flight:
+                conn = self._pool.get()
+                try:
+                    conn.request(method, url, body=body, headers=headers)
+                    resp = conn.getresponse()
+                    data = resp.read()
+                    status = resp.status
+                    content_type = resp.getheader("Content-Type", "application/sparql-results+xml")
+                    if resp.will_close:
+                        conn.close()
+                    else:
+                        self._pool.put(conn)
+                except (OSError, http.client.HTTPException) as e:
+                    # Includes timeouts, and a kept-alive connection that the server has since closed
+                    conn.close()
+                    error = e
+            with self._lock:
+                self.requests_sent += 1
+            if error is None and status is not None and 200 <= status < 300:
+                return Result.parse(BytesIO(data), content_type=content_type.split(";")[0].strip())
+            if error is None and status not in RETRY_STATUSES:
+                raise RemoteQueryError(
+                    "SPARQL endpoint {} returned HTTP {}: {}".format(
+                        self.query_endpoint, status, data[:500].decode('utf-8', 'replace')
+                    ),
+                    status,
+                )
+            if attempt >= self.retries:
+                reason = str(error) if error is not None else "HTTP {}".format(status)
+                raise RemoteQueryError(
+                    "SPARQL endpoint {} failed after {} attempts: {}".format(self.query_endpoint, attempt + 1, reason),
+                    status,
+                )
+            time.sleep(self.backoff * (2**attempt))
+            attempt += 1
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def close(self, commit_pending_transaction: bool = False) -> None:
+        self._pool.close()
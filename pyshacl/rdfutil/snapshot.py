@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+#
+"""
+A compact binary snapshot format for RDF Graphs and Datasets.
+
+A snapshot is much faster to load than Turtle (or any other RDF syntax), because nothing needs to be tokenized.
+Every distinct term is stored once in an interned term table, and each triple (or quad) is stored as a row of
+integer indices into that table. The term table and the triples are stored as raw machine arrays, so they are
+memory-mapped and copied straight into arrays on load.
+
+Layout (all sections are 8-byte aligned):
+- SNAPSHOT_MAGIC
+- 4-byte little-endian length of the JSON header, then the JSON header
+- term kinds (one unsigned byte per term)
+- term extras (one int64 per term, the datatype or language term index of a Literal, else -1)
+- term string ends (one int64 per term, the end offset of each term string in the decoded text)
+- text (UTF-8, every term string concatenated)
+- rows (int64s, three per triple, or four per quad with the graph term index, -1 for the default graph)
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from io import BufferedIOBase, UnsupportedOperation
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple, Union, cast
+
+import rdflib
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
+from rdflib.term import BNode, Literal, URIRef
+
+from .consts import GraphLike
+
+SNAPSHOT_MAGIC = b"PYSHACL\x00SNAPSHOT"
+SNAPSHOT_VERSION = 1
+
+KIND_URI = 0
+KIND_BNODE = 1
+KIND_LITERAL = 2
+KIND_LANG_LITERAL = 3
+KIND_TYPED_LITERAL = 4
+KIND_STRING = 5  # A language tag, only referenced by a KIND_LANG_LITERAL
+
+_header_len_struct = struct.Struct("<I")
+
+
+def _pad(n: int) -> int:
+    return (8 - (n % 8)) % 8
+
+
+class _TermTable(object):
+    __slots__ = ("kinds", "extras", "ends", "parts", "length", "index")
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.extras = array('q')
+        self.ends = array('q')
+        self.parts: List[str] = []
+        self.length = 0
+        self.index: Dict[Any, int] = {}
+
+    def _append(self, key, kind: int, text: str, extra: int = -1) -> int:
+        i = self.index[key] = len(self.kinds)
+        self.kinds.append(kind)
+        self.extras.append(extra)
+        self.parts.append(text)
+        self.length += len(text)
+        self.ends.append(self.length)
+        return i
+
+    def intern(self, term) -> int:
+        # Terms of different kinds can be equal strings, so the kind is part of the key
+        key = (type(term), term)
+        try:
+            return self.index[key]
+        except KeyError:
+            pass
+        if isinstance(term, Literal):
+            if term.language:
+                lang_key = (str, term.language)
+                lang_i = self.index.get(lang_key, None)
+                if lang_i is None:
+                    lang_i = self._append(lang_key, KIND_STRING, str(term.language))
+                return self._append(key, KIND_LANG_LITERAL, str(term), lang_i)
+            elif term.datatype is not None:
+                return self._append(key, KIND_TYPED_LITERAL, str(term), self.intern(URIRef(term.datatype)))
+            return self._append(key, KIND_LITERAL, str(term))
+        elif isinstance(term, BNode):
+            return self._append(key, KIND_BNODE, str(term))
+        elif isinstance(term, URIRef):
+            return self._append(key, KIND_URI, str(term))
+        raise ValueError("Cannot snapshot RDF term of type {}: {!r}".format(type(term).__name__, term))
+
+
+def write_snapshot(graph: GraphLike, destination: Union[str, Path, IO[bytes]]) -> int:
+    """
+    Write a Graph or Dataset to a binary snapshot.
+
+    :param graph: The Graph or Dataset to snapshot
+    :type graph: rdflib.Graph | rdflib.Dataset
+    :param destination: A file path, or a writable binary file
+    :type destination: str | Path | IO[bytes]
+    :return: The number of triples (or quads) written
+    :rtype: int
+    """
+    terms = _TermTable()
+    rows = array('q')
+    is_quads = isinstance(graph, rdflib.Dataset)
+    if isinstance(graph, rdflib.Dataset):
+        for s, p, o, c in graph.quads((None, None, None, None)):
+            g_id = c.identifier if isinstance(c, rdflib.Graph) else c
+            rows.extend(
+                (
+                    terms.intern(s),
+                    terms.intern(p),
+                    terms.intern(o),
+                    -1 if g_id is None or g_id == DATASET_DEFAULT_GRAPH_ID else terms.intern(g_id),
+                )
+            )
+    else:
+        for s, p, o in graph.triples((None, None, None)):
+            rows.extend((terms.intern(s), terms.intern(p), terms.intern(o)))
+    identifier = graph.default_graph.identifier if is_quads else graph.identifier  # type: ignore[union-attr]
+    base = graph.default_graph.base if is_quads else graph.base  # type: ignore[union-attr]
+    text = "".join(terms.parts).encode('utf-8')
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "quads": is_quads,
+        "identifier": None if isinstance(identifier, BNode) or identifier is None else str(identifier),
+        "base": None if base is None else str(base),
+        "namespaces": [[str(p), str(n)] for p, n in graph.namespace_manager.namespaces()],
+        "terms": len(terms.kinds),
+        "text": len(text),
+        "rows": len(rows),
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    sections = [
+        SNAPSHOT_MAGIC,
+        _header_len_struct.pack(len(header_bytes)),
+        header_bytes,
+    ]
+    offset = sum(len(s) for s in sections)
+    for section in (terms.kinds.tobytes(), terms.extras.tobytes(), terms.ends.tobytes(), text, rows.tobytes()):
+        padding = b"\x00" * _pad(offset)
+        sections.append(padding)
+        sections.append(section)
+        offset += len(padding) + len(section)
+    if isinstance(destination, (str, Path)):
+        with open(destination, 'wb') as f:
+            f.writelines(sections)
+    else:
+        destination.writelines(sections)
+    return len(rows) // (4 if is_quads else 3)
+
+
+def is_snapshot(source: Union[str, Path, IO[bytes]]) -> bool:
+    """
+    Check for the snapshot magic bytes at the start of a file.
+    A seekable file is returned to its position.
+    """
+    if isinstance(source, (str, Path)):
+        try:
+            with open(source, 'rb') as f:
+                return f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+        except OSError:
+            return False
+    try:
+        pos = source.tell()
+        start = source.read(len(SNAPSHOT_MAGIC))
+        source.seek(pos)
+    except (AttributeError, OSError, ValueError, UnsupportedOperation):
+        return False
+    return start == SNAPSHOT_MAGIC
+
+
+def _map_source(source: Union[str, Path, IO[bytes]]) -> Tuple[Any, Optional[mmap.mmap]]:
+    if isinstance(source, (str, Path)):
+        with open(source, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty file can't be mapped
+                return f.read(), None
+        return mm, mm
+    try:
+        fileno = source.fileno()
+        mm = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        return mm, mm
+    except (AttributeError, OSError, ValueError, UnsupportedOperation):
+        # Not a real file (eg, a pipe or a BytesIO), read it all in
+        return source.read(), None
+
+
+def _read_array(buffer: memoryview, typecode: str, offset: int, count: int, swap: bool) -> Tuple[array, int]:
+    a = array(typecode)
+    offset += _pad(offset)
+    end = offset + (count * a.itemsize)
+    a.frombytes(buffer[offset:end])
+    if swap:
+        a.byteswap()
+    return a, end
+
+
+def read_snapshot(
+    source: Union[str, Path, IO[bytes], BufferedIOBase],
+    g: Optional[GraphLike] = None,
+    identifier: Optional[Union[str, URIRef]] = None,
+) -> GraphLike:
+    """
+    Load a binary snapshot. A snapshot file is memory-mapped when possible.
+
+    :param source: A file path, or a readable binary file
+    :type source: str | Path | IO[bytes]
+    :param g: The Graph or Dataset to load into, optional. If not given, a new Graph or Dataset is created.
+    :type g: rdflib.Graph | rdflib.Dataset | None
+    :param identifier: When loading a Graph snapshot into a Dataset, load it into this named graph.
+    :type identifier: str | URIRef | None
+    :return: The Graph (or named graph) that the triples were loaded into, or the Dataset for a Dataset snapshot
+    :rtype: rdflib.Graph | rdflib.Dataset
+    """
+    data, mm = _map_source(cast(Union[str, Path, IO[bytes]], source))
+    try:
+        buffer = memoryview(data)
+        try:
+            if bytes(buffer[: len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+                raise ValueError("Source is not a pySHACL snapshot.")
+            offset = len(SNAPSHOT_MAGIC)
+            (header_len,) = _header_len_struct.unpack_from(buffer, offset)
+            offset += _header_len_struct.size
+            header = json.loads(bytes(buffer[offset : offset + header_len]).decode('utf-8'))
+            offset += header_len
+            if header.get("version", None) != SNAPSHOT_VERSION:
+                raise ValueError("Unsupported pySHACL snapshot version: {}".format(header.get("version", None)))
+            swap = header["byteorder"] != sys.byteorder
+            n_terms: int = header["terms"]
+            kinds, offset = _read_array(buffer, 'B', offset, n_terms, False)
+            extras, offset = _read_array(buffer, 'q', offset, n_terms, swap)
+            ends, offset = _read_array(buffer, 'q', offset, n_terms, swap)
+            offset += _pad(offset)
+            text = bytes(buffer[offset : offset + header["text"]]).decode('utf-8')
+            offset += header["text"]
+            rows, offset = _read_array(buffer, 'q', offset, header["rows"], swap)
+        finally:
+            buffer.release()
+    finally:
+        if mm is not None:
+            mm.close()
+
+    terms: List[Any] = []
+    start = 0
+    for i, end in enumerate(ends):
+        value = text[start:end]
+        start = end
+        kind = kinds[i]
+        if kind == KIND_URI:
+            terms.append(URIRef(value))
+        elif kind == KIND_BNODE:
+            terms.append(BNode(value))
+        elif kind == KIND_LITERAL:
+            terms.append(Literal(value))
+        elif kind == KIND_LANG_LITERAL:
+            terms.append(Literal(value, lang=terms[extras[i]]))
+        elif kind == KIND_TYPED_LITERAL:
+            terms.append(Literal(value, datatype=terms[extras[i]]))
+        else:
+            terms.append(value)
+
+    snapshot_id = header["identifier"]
+    dest: rdflib.Graph
+    if header["quads"]:
+        if g is None:
+            g = rdflib.Dataset(default_union=True)
+            if snapshot_id is not None:
+                g.default_graph = g.graph(URIRef(snapshot_id))
+        elif not isinstance(g, rdflib.Dataset):
+            raise RuntimeError("Cannot load a Dataset snapshot into a bare Graph target.")
+        contexts: Dict[int, rdflib.Graph] = {-1: g.default_graph}
+        for i in set(rows[3::4]):
+            if i not in contexts:
+                contexts[i] = g.graph(terms[i])
+        g.addN(
+            (terms[rows[r]], terms[rows[r + 1]], terms[rows[r + 2]], contexts[rows[r + 3]])
+            for r in range(0, len(rows), 4)
+        )
+        dest = g
+    else:
+        if g is None:
+            dest = rdflib.Graph(identifier=None if snapshot_id is None else URIRef(snapshot_id))
+        elif isinstance(g, rdflib.Dataset):
+            dest = g.graph(URIRef(identifier)) if identifier else g.default_graph
+        else:
+            dest = g
+        dest.addN((terms[rows[r]], terms[rows[r + 1]], terms[rows[r + 2]], dest) for r in range(0, len(rows), 3))
+    for prefix, namespace in header["namespaces"]:
+        dest.namespace_manager.bind(prefix, namespace, override=False, replace=False)
+    if header["base"] is not None:
+        if isinstance(dest, rdflib.Dataset):
+            dest.default_graph.base = header["base"]
+        else:
+            dest.base = header["base"]
+    return dest
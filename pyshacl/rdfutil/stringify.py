@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 #
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
-from typing import Iterator, List, Optional, Tuple, Union, cast
+from typing import Dict, Iterator, List, Optional, Tuple, Union, cast
 
 import rdflib
 from rdflib.namespace import NamespaceManager
@@ -11,21 +13,71 @@ from .consts import OWL, SH, RDF_first, RDFNode
 OWLsameAs = OWL.sameAs
 
 
-def with_dict_cache(f):
-    @wraps(f)
-    def wrapped(*args, **kwargs):
-        dict_cache = getattr(wrapped, "dict_cache", None)
-        assert dict_cache is not None
-        return f(*args, **kwargs)
+# The nodes deeper than this in a blank node are rendered as a placeholder
+MAX_RECURSION = 12
+# Bound on the number of memoized node strings, the memo is emptied when it is full
+STRINGIFY_MEMO_MAX = 65536
 
-    dict_cache = getattr(wrapped, "dict_cache", None)
-    if dict_cache is None:
-        dict_cache = {}
-        setattr(wrapped, "dict_cache", dict_cache)
-    return wrapped
+_stringify_memo: ContextVar[Optional[Dict]] = ContextVar("stringify_memo", default=None)
 
 
-@with_dict_cache
+@contextmanager
+def stringify_memo(memo: Optional[Dict] = None):
+    """
+    Memoize stringify_node() and stringify_blank_node() in the given dict (or a new one) within this context.
+    Each validation run uses a memo of its own, that lives only as long as the run and its report.
+    Outside of any memo context, nothing is memoized.
+    """
+    if memo is None:
+        memo = {}
+    token = _stringify_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _stringify_memo.reset(token)
+
+
+def with_dict_cache(cache_key):
+    """
+    Memoize the decorated function in the current stringify_memo() dict, when there is one.
+    cache_key is called with the same arguments as the decorated function, and returns the memo key for that call.
+    The first argument (the graph) is kept alongside each memoized result, so the id() of a graph used in a key
+    cannot be reused by another graph while the entry lives.
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            memo = _stringify_memo.get()
+            if memo is None:
+                return f(*args, **kwargs)
+            key = (f.__name__, cache_key(*args, **kwargs))
+            try:
+                return memo[key][0]
+            except KeyError:
+                pass
+            result = f(*args, **kwargs)
+            if len(memo) >= STRINGIFY_MEMO_MAX:
+                memo.clear()
+            memo[key] = (result, args[0])
+            return result
+
+        return wrapped
+
+    return decorator
+
+
+def _blank_node_cache_key(graph: rdflib.Graph, bnode: rdflib.BNode, ns_manager=None, recursion: int = 0):
+    # A blank node is rendered down to MAX_RECURSION, so its string depends on the depth it starts at
+    return id(graph), id(ns_manager), bnode, recursion
+
+
+def _node_cache_key(graph: rdflib.Graph, node: RDFNode, ns_manager=None, recursion: int = 0):
+    # The same node can be rendered with different prefixes by a different namespace manager
+    return id(graph), id(ns_manager), node, recursion if isinstance(node, rdflib.BNode) else 0
+
+
+@with_dict_cache(_blank_node_cache_key)
 def stringify_blank_node(
     graph: rdflib.Graph, bnode: rdflib.BNode, ns_manager: Optional[NamespaceManager] = None, recursion: int = 0
 ):
@@ -33,15 +85,8 @@ def stringify_blank_node(
         raise RuntimeError("Can only stringify a blank node when graph is a rdflib.Graph")
     assert isinstance(graph, rdflib.Graph)
     assert isinstance(bnode, rdflib.BNode)
-    if recursion >= 12:
+    if recursion >= MAX_RECURSION:
         return "<http://recursion.too.deep>"
-    stringed_cache_key = id(graph), str(bnode)
-
-    try:
-        cached = stringify_blank_node.dict_cache[stringed_cache_key]
-        return cached
-    except LookupError:
-        pass
     if ns_manager is None:  # pragma: no cover
         ns_manager = graph.namespace_manager
         ns_manager.bind("sh", SH)
@@ -90,7 +135,6 @@ def stringify_blank_node(
         _p, _o = next(iter(p_string_map.items()))
         blank_string = "{} {}".format(_p, _o)
     blank_string = "[ {} ]".format(blank_string)
-    stringify_blank_node.dict_cache[stringed_cache_key] = blank_string
     return blank_string
 
 
@@ -155,6 +199,7 @@ def find_node_named_graph(dataset: rdflib.Dataset, node) -> rdflib.Graph:
     raise LookupError(f"Cannot find node {node} in any named graph.")
 
 
+@with_dict_cache(_node_cache_key)
 def stringify_node(
     graph: rdflib.Graph,
     node: RDFNode,
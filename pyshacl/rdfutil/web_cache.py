@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+"""
+A persistent on-disk cache for RDF documents fetched from the web, such as owl:imports.
+
+Each fetched document is stored in the cache directory as a pre-parsed binary snapshot (a pickled rdflib Store,
+the same format as the baked-in graphs), alongside a small JSON metadata file holding its ETag and Last-Modified
+headers. A cached document is revalidated with a conditional request each time it is used, so an unchanged
+document is never downloaded or parsed again. In offline mode the cache is used without any network requests.
+
+The cache is configured with set_web_cache(), or with the PYSHACL_WEB_CACHE_DIR and PYSHACL_OFFLINE
+environment variables.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import rdflib
+from rdflib.term import URIRef
+from rdflib.util import guess_format
+
+from ..consts import env_truths
+
+
+class WebCache(object):
+    __slots__ = ("cache_dir", "offline")
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, offline: bool = False):
+        self.cache_dir: Optional[Path] = None if not cache_dir else Path(cache_dir).expanduser()
+        self.offline = bool(offline)
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache_dir is not None
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        assert self.cache_dir is not None
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / "{}.pickle".format(key), self.cache_dir / "{}.json".format(key)
+
+    def lookup(self, url: str) -> Tuple[Optional[rdflib.Graph], Dict[str, str]]:
+        """
+        Find the snapshot of a previously fetched document.
+        :return: The cached graph (or None if it is not cached), and the validators to use in a conditional request.
+        """
+        if self.cache_dir is None:
+            return None, {}
+        snapshot_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(snapshot_path, 'rb') as f:
+                u = pickle.Unpickler(f, fix_imports=False)
+                g_store, identifier = u.load()
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            # Missing, or half-written by a worker that died, treat it as not cached
+            return None, {}
+        if meta.get("url", None) != url:
+            return None, {}
+        graph = rdflib.Graph(store=g_store, identifier=identifier)
+        validators = {}
+        if meta.get("etag", None):
+            validators["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified", None):
+            validators["If-Modified-Since"] = meta["last_modified"]
+        return graph, validators
+
+    def store(
+        self, url: str, graph: rdflib.Graph, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ) -> None:
+        """Save a snapshot of a freshly fetched and parsed document."""
+        if self.cache_dir is None:
+            return
+        snapshot_path, meta_path = self._paths(url)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified}
+        # Write to a temporary file then rename it, so concurrent workers never see a partial snapshot.
+        self._write_atomic(snapshot_path, pickle.dumps((graph.store, graph.identifier), protocol=5))
+        self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=str(self.cache_dir), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_name, str(path))
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+
+web_cache = WebCache(os.getenv("PYSHACL_WEB_CACHE_DIR", None), os.getenv("PYSHACL_OFFLINE", "") in env_truths)
+
+
+def set_web_cache(cache_dir: Optional[Union[str, Path]] = None, offline: bool = False) -> WebCache:
+    """
+    Configure the process-wide web cache.
+    :param cache_dir: Directory to keep the snapshots in. None disables the cache.
+    :type cache_dir: str | Path | None
+    :param offline: Never make a network request, only the cache (and the baked-in graphs) can be used.
+    :type offline: bool
+    :return: The new web cache
+    :rtype: WebCache
+    """
+    global web_cache
+    web_cache = WebCache(cache_dir, offline)
+    return web_cache
+
+
+def get_web_cache() -> WebCache:
+    return web_cache
+
+
+def parse_web_response(url: str, data: bytes, rdf_format: Optional[str], filename: Optional[str]) -> rdflib.Graph:
+    """Parse a fetched document into a new standalone Graph, ready to be snapshotted."""
+    if rdf_format in (None, 'auto'):
+        rdf_format = guess_format(filename or url)
+    if rdf_format is None:
+        head = data.lstrip()[:15].lower()
+        if head.startswith(b"<?xml") or head.startswith(b"<rdf:"):
+            rdf_format = "xml"
+        elif head.startswith(b"{") or head.startswith(b"["):
+            rdf_format = "json-ld"
+        else:
+            rdf_format = "turtle"
+    graph = rdflib.Graph(bind_namespaces='core', base=url, identifier=URIRef(url))
+    graph.parse(data=data, format=rdf_format, publicID=url)
+    return graph
@@ -0,0 +1,573 @@
+# -*- coding: utf-8 -*-
+#
+"""
+Validation results storage and Validation Report rendering.
+
+Validation results are recorded in a compact columnar table while the constraints are evaluated.
+Each result is a row of integer indices into interned term tables. The human-readable text and the
+SHACL Validation Report graph are rendered from the table at the end of the run, or, in a LazyValidationReport,
+only when they are requested.
+"""
+
+from array import array
+from collections.abc import Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from textwrap import indent
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import rdflib
+from rdflib import BNode, Literal, URIRef
+
+from .consts import (
+    PYSHACL_count,
+    PYSHACL_TruncatedResults,
+    PYSHACL_truncatedResults,
+    RDF_type,
+    SH_conforms,
+    SH_detail,
+    SH_focusNode,
+    SH_result,
+    SH_resultMessage,
+    SH_resultPath,
+    SH_resultSeverity,
+    SH_sourceConstraint,
+    SH_sourceConstraintComponent,
+    SH_sourceShape,
+    SH_ValidationReport,
+    SH_ValidationResult,
+    SH_value,
+)
+from .rdfutil import clone_blank_node, stringify_memo, stringify_node
+
+if TYPE_CHECKING:
+    from .constraints.constraint_component import ConstraintComponent
+    from .profiling import ValidationProfile
+    from .pytypes import GraphLike, RDFNode
+    from .shape import Shape
+    from .shapes_graph import ShapesGraph
+
+NO_TERM = -1
+
+# The results table of the validation run in progress in this context, see ValidationResults.recording()
+_recording_results: ContextVar[Optional['ValidationResults']] = ContextVar("pyshacl_recording_results", default=None)
+
+
+def recording_results() -> Optional['ValidationResults']:
+    """The results table of the validation run in progress in this context, or None outside of any run."""
+    return _recording_results.get()
+
+
+class StopAtFirstResult(BaseException):
+    """
+    Raised by make_v_result when the run is in conforms_only mode.
+    It ends the evaluation of the current constraint at its first result, and is caught by Shape.validate.
+    This is a BaseException so it is not swallowed by the except Exception handlers inside constraints.
+    """
+
+    def __init__(self, row: int):
+        super(StopAtFirstResult, self).__init__(row)
+        self.row = row
+
+
+class ValidationResults(object):
+    """
+    Columnar table of the validation results found in one validation run.
+    Every column is an integer array, one entry per result. Terms, shapes, constraints and graphs
+    are interned in lookup tables, so a result costs a few machine integers rather than a BNode,
+    a list of triples, and a description string.
+    """
+
+    __slots__ = (
+        'sg',
+        'terms',
+        '_term_index',
+        'shapes',
+        '_shape_index',
+        'constraints',
+        '_constraint_index',
+        'graphs',
+        '_graph_index',
+        'focus',
+        'value',
+        'path',
+        'shape',
+        'component',
+        'severity',
+        'source_constraint',
+        'constraint',
+        'graph',
+        'messages',
+        'extra_messages',
+        'details',
+        'conforms_only',
+        'max_results_per_shape',
+        'max_results_total',
+        'sample_rate',
+        'dropped',
+        'truncated',
+        '_limited',
+        '_nested',
+        '_kept_total',
+        '_generated',
+        '_kept_per_shape',
+        '_row_messages_memo',
+        'stringify_memo',
+    )
+
+    def __init__(self, sg: 'ShapesGraph'):
+        self.sg = sg
+        self.terms: List['RDFNode'] = []
+        self._term_index: Dict['RDFNode', int] = {}
+        self.shapes: List['Shape'] = []
+        self._shape_index: Dict[int, int] = {}
+        self.constraints: List['ConstraintComponent'] = []
+        self._constraint_index: Dict[int, int] = {}
+        self.graphs: List['GraphLike'] = []
+        self._graph_index: Dict[int, int] = {}
+        self.focus = array('l')
+        self.value = array('l')
+        self.path = array('l')
+        self.shape = array('l')
+        self.component = array('l')
+        self.severity = array('l')
+        self.source_constraint = array('l')
+        self.constraint = array('l')
+        self.graph = array('l')
+        # Index into extra_messages, for results with SPARQL or JS messages and bindings.
+        self.messages = array('l')
+        self.extra_messages: List[Tuple[Optional[Tuple], Any]] = []
+        # Nested results (from sh:node), keyed by the row of the parent result.
+        self.details: Dict[int, List[int]] = {}
+        # In conforms_only mode, recording a result stops the constraint that produced it.
+        self.conforms_only: bool = False
+        self.max_results_per_shape: Optional[int] = None
+        self.max_results_total: Optional[int] = None
+        self.sample_rate: Optional[float] = None
+        # Number of results not recorded because of the limits, in total and per (shape, component).
+        self.dropped: int = 0
+        self.truncated: Dict[Tuple[int, int], int] = {}
+        self._limited: bool = False
+        # Depth of nested validations (sh:node, sh:not, etc.), whose results are not subject to the limits.
+        self._nested: int = 0
+        self._kept_total: int = 0
+        self._generated: Dict[Tuple[int, int], int] = {}
+        self._kept_per_shape: Dict[int, int] = {}
+        # The messages of each rendered result, shared by the text and graph renderings
+        self._row_messages_memo: Dict[int, Tuple[List, List]] = {}
+        # The node strings of this run and its report, see stringify_memo()
+        self.stringify_memo: Dict = {}
+
+    def __len__(self) -> int:
+        return len(self.focus)
+
+    def set_limits(
+        self,
+        max_results_per_shape: Optional[int] = None,
+        max_results_total: Optional[int] = None,
+        sample_rate: Optional[float] = None,
+    ) -> None:
+        """
+        Bound the number of results recorded in this table.
+        Results over the limits are counted per shape and constraint component, but are not recorded.
+        :param max_results_per_shape: Record at most this many results from each shape.
+        :param max_results_total: Record at most this many results in total.
+        :param sample_rate: Record only this fraction (0.0 < rate <= 1.0) of the results from each shape
+        and constraint component. Sampling is evenly spaced, and always keeps the first result.
+        """
+        self.max_results_per_shape = max_results_per_shape
+        self.max_results_total = max_results_total
+        self.sample_rate = None if sample_rate is None or sample_rate >= 1.0 else sample_rate
+        self._limited = (
+            self.max_results_per_shape is not None
+            or self.max_results_total is not None
+            or self.sample_rate is not None
+        )
+
+    def _keep(self, shape_i: int, component_i: int) -> bool:
+        rate = self.sample_rate
+        if rate is not None:
+            key = (shape_i, component_i)
+            n = self._generated[key] = self._generated.get(key, 0) + 1
+            if n > 1 and int((n - 1) * rate) <= int((n - 2) * rate):
+                return False
+        if self.max_results_total is not None and self._kept_total >= self.max_results_total:
+            return False
+        if self.max_results_per_shape is not None:
+            kept = self._kept_per_shape.get(shape_i, 0)
+            if kept >= self.max_results_per_shape:
+                return False
+            self._kept_per_shape[shape_i] = kept + 1
+        self._kept_total += 1
+        return True
+
+    @contextmanager
+    def recording(self):
+        """
+        Record the validation results of this context into this table, for the length of a validation run.
+        Each run has a table of its own, so runs in other threads or nested runs do not share one.
+        Threads started for the run must run in a copy of this context to record into the table.
+        """
+        token = _recording_results.set(self)
+        try:
+            yield self
+        finally:
+            _recording_results.reset(token)
+
+    @contextmanager
+    def nested(self):
+        """
+        Record the results of a nested validation, of the shape of a sh:node, sh:not, sh:and, sh:or, sh:xone,
+        or sh:qualifiedValueShape, or of a rule condition.
+        Those results are only details of, or evidence for, a result of the outer shape, so they are all
+        recorded, and they do not count towards the limits, the sampling, or the dropped results.
+        """
+        self._nested += 1
+        try:
+            yield self
+        finally:
+            self._nested -= 1
+
+    def intern_term(self, term: Optional['RDFNode']) -> int:
+        if term is None:
+            return NO_TERM
+        try:
+            return self._term_index[term]
+        except KeyError:
+            i = self._term_index[term] = len(self.terms)
+            self.terms.append(term)
+            return i
+
+    def term(self, i: int) -> Optional['RDFNode']:
+        return None if i == NO_TERM else self.terms[i]
+
+    @staticmethod
+    def _intern_object(obj, table: List, index: Dict[int, int]) -> int:
+        # Shapes, constraints and graphs are interned by identity, not by equality.
+        try:
+            return index[id(obj)]
+        except KeyError:
+            i = index[id(obj)] = len(table)
+            table.append(obj)
+            return i
+
+    def add(
+        self,
+        constraint: 'ConstraintComponent',
+        datagraph: 'GraphLike',
+        focus_node: 'RDFNode',
+        value_node: Optional['RDFNode'],
+        result_path: Optional['RDFNode'],
+        constraint_component: 'RDFNode',
+        source_constraint: Optional['RDFNode'],
+        extra_messages: Optional[Iterable] = None,
+        bound_vars=None,
+    ) -> int:
+        """
+        Record a new validation result.
+        :return: The row index of the new result, or NO_TERM if the result is over the limits and was not recorded
+        :rtype: int
+        """
+        shape = constraint.shape
+        shape_i = self._intern_object(shape, self.shapes, self._shape_index)
+        component_i = self.intern_term(constraint_component)
+        if self._limited and not self._nested and not self.conforms_only and not self._keep(shape_i, component_i):
+            key = (shape_i, component_i)
+            self.truncated[key] = self.truncated.get(key, 0) + 1
+            self.dropped += 1
+            return NO_TERM
+        row = len(self.focus)
+        self.focus.append(self.intern_term(focus_node))
+        self.value.append(self.intern_term(value_node))
+        self.path.append(self.intern_term(result_path))
+        self.shape.append(shape_i)
+        self.component.append(component_i)
+        self.severity.append(self.intern_term(shape.severity))
+        self.source_constraint.append(self.intern_term(source_constraint))
+        self.constraint.append(self._intern_object(constraint, self.constraints, self._constraint_index))
+        self.graph.append(self._intern_object(datagraph, self.graphs, self._graph_index))
+        if extra_messages or bound_vars is not None:
+            self.messages.append(len(self.extra_messages))
+            self.extra_messages.append((tuple(extra_messages) if extra_messages else None, bound_vars))
+        else:
+            self.messages.append(NO_TERM)
+        return row
+
+    def add_details(self, row: int, detail_rows: Iterable[int]) -> None:
+        """
+        Nest the given results underneath the result at row, via sh:detail.
+        A result that has been given details (even none) renders a Details section in its text.
+        """
+        self.details.setdefault(row, []).extend(detail_rows)
+
+    def severity_of(self, row: int) -> URIRef:
+        return self.terms[self.severity[row]]  # type: ignore[return-value]
+
+    def shape_of(self, row: int) -> 'Shape':
+        return self.shapes[self.shape[row]]
+
+    def _extras(self, row: int) -> Tuple[Optional[Tuple], Any]:
+        m = self.messages[row]
+        if m == NO_TERM:
+            return None, None
+        return self.extra_messages[m]
+
+    def _row_messages(self, row: int) -> Tuple[List, List]:
+        try:
+            return self._row_messages_memo[row]
+        except KeyError:
+            pass
+        constraint = self.constraints[self.constraint[row]]
+        extra_messages, bound_vars = self._extras(row)
+        messages = self._row_messages_memo[row] = constraint.make_v_result_messages(
+            self.graphs[self.graph[row]],
+            self.terms[self.focus[row]],
+            self.term(self.value[row]),
+            extra_messages=extra_messages,
+            bound_vars=bound_vars,
+        )
+        return messages
+
+    def text_of(self, row: int) -> str:
+        """Render the human-readable description of one result, including its nested details."""
+        constraint = self.constraints[self.constraint[row]]
+        extra_messages, bound_vars = self._extras(row)
+        messages, _ = self._row_messages(row)
+        desc = constraint.make_v_result_description(
+            self.graphs[self.graph[row]],
+            self.terms[self.focus[row]],
+            self.severity_of(row),
+            self.term(self.value[row]),
+            messages,
+            result_path=self.term(self.path[row]),
+            constraint_component=self.terms[self.component[row]],
+            source_constraint=self.term(self.source_constraint[row]),
+            extra_messages=extra_messages,
+            bound_vars=bound_vars,
+        )
+        details = self.details.get(row, None)
+        if details is not None:
+            desc = f"{desc}\tDetails:\n"
+            for d in details:
+                # Add text of validation result in nested details section
+                desc += indent(self.text_of(d), "\t\t")
+        return desc
+
+    def render_text(self, conforms: bool, rows: Sequence) -> str:
+        v_text = "Validation Report\nConforms: {}\n".format(str(conforms))
+        result_len = len(rows)
+        if result_len > 0:
+            v_text += "Results ({}):\n".format(str(result_len))
+        text_results = sorted(self.text_of(r) for r in rows)
+        v_text += "".join(text_results)
+        if self.truncated:
+            sg = self.sg.graph
+            v_text += "Truncated Results ({}):\n".format(str(self.dropped))
+            truncated_texts = sorted(
+                "\tSource Shape: {}, Constraint Component: {}, Count: {}\n".format(
+                    stringify_node(sg, self.shapes[shape_i].node), str(self.terms[component_i]), str(count)
+                )
+                for (shape_i, component_i), count in self.truncated.items()
+            )
+            v_text += "".join(truncated_texts)
+        return v_text
+
+    def render_graph(self, conforms: bool, rows: Sequence) -> rdflib.Graph:
+        sg = self.sg.graph
+        vg = rdflib.Graph(bind_namespaces='core')
+        for p, n in sg.namespace_manager.namespaces():
+            vg.namespace_manager.bind(p, n)
+        vr = BNode()
+        vg.add((vr, RDF_type, SH_ValidationReport))
+        vg.add((vr, SH_conforms, Literal(conforms)))
+        cloned_nodes: Dict[Tuple[int, str], Union[BNode, URIRef, Literal]] = {}
+        # The focus node is looked up in the shapes graph when there is no (or an empty) data graph
+        focus_graphs: Dict[int, Any] = {}
+
+        def clone_node(source, node):
+            if isinstance(node, Literal):
+                return node  # No need to clone a literal from the data graph
+            _id = str(node)
+            key = (id(source), _id)
+            try:
+                return cloned_nodes[key]
+            except KeyError:
+                pass
+            if isinstance(node, BNode):
+                o = clone_blank_node(source, node, vg, keepid=True)
+            else:
+                o = URIRef(_id)
+            cloned_nodes[key] = o
+            return o
+
+        def add_row(row: int) -> BNode:
+            r_node = BNode()
+            g_idx = self.graph[row]
+            datagraph = self.graphs[g_idx]
+            try:
+                focus_graph = focus_graphs[g_idx]
+            except KeyError:
+                focus_graph = focus_graphs[g_idx] = datagraph or sg
+            vg.add((r_node, RDF_type, SH_ValidationResult))
+            vg.add((r_node, SH_sourceConstraintComponent, clone_node(sg, self.terms[self.component[row]])))
+            vg.add((r_node, SH_sourceShape, clone_node(sg, self.shape_of(row).node)))
+            vg.add((r_node, SH_resultSeverity, self.severity_of(row)))
+            vg.add((r_node, SH_focusNode, clone_node(focus_graph, self.terms[self.focus[row]])))
+            value_node = self.term(self.value[row])
+            if value_node is not None:
+                vg.add((r_node, SH_value, clone_node(datagraph, value_node)))
+            result_path = self.term(self.path[row])
+            if result_path is not None:
+                vg.add((r_node, SH_resultPath, clone_node(sg, result_path)))
+            source_constraint = self.term(self.source_constraint[row])
+            if source_constraint is not None:
+                vg.add((r_node, SH_sourceConstraint, clone_node(sg, source_constraint)))
+            _, message_terms = self._row_messages(row)
+            for m in message_terms:
+                vg.add((r_node, SH_resultMessage, m))
+            for d in self.details.get(row, ()):
+                vg.add((r_node, SH_detail, add_row(d)))
+            return r_node
+
+        for r in rows:
+            vg.add((vr, SH_result, add_row(r)))
+        for (shape_i, component_i), count in self.truncated.items():
+            t_node = BNode()
+            vg.add((vr, PYSHACL_truncatedResults, t_node))
+            vg.add((t_node, RDF_type, PYSHACL_TruncatedResults))
+            vg.add((t_node, SH_sourceShape, clone_node(sg, self.shapes[shape_i].node)))
+            vg.add((t_node, SH_sourceConstraintComponent, clone_node(sg, self.terms[component_i])))
+            vg.add((t_node, PYSHACL_count, Literal(count)))
+        return vg
+
+
+def _check_conformance(results: ValidationResults, conforms: bool, rows: List[int]) -> None:
+    if not conforms and len(rows) < 1 and results.dropped < 1:
+        raise RuntimeError("A Non-Conformant Validation Report must have at least one result.")
+
+
+class ValidationReport(tuple):
+    """
+    The outcome of a validation run, the (conforms, results_graph, results_text) tuple returned by validate().
+    The parts are also found by name, with the rows of the results it reports, and the ValidationProfile of the run
+    when profiling was enabled.
+    The results graph and results text are rendered when the report is made, so the report holds no reference to
+    the results table, or to the data graph it was found in.
+    """
+
+    rows: List[int]
+    profile: Optional['ValidationProfile']
+
+    def __new__(
+        cls,
+        conforms: bool,
+        results_graph: rdflib.Graph,
+        results_text: str,
+        rows: List[int],
+        profile: Optional['ValidationProfile'] = None,
+    ):
+        report = super(ValidationReport, cls).__new__(cls, (conforms, results_graph, results_text))
+        report.rows = rows
+        report.profile = profile
+        return report
+
+    def __getnewargs__(self):
+        return self[0], self[1], self[2], self.rows, self.profile
+
+    @classmethod
+    def render(
+        cls,
+        results: ValidationResults,
+        conforms: bool,
+        rows: List[int],
+        profile: Optional['ValidationProfile'] = None,
+    ) -> 'ValidationReport':
+        """Render the results graph and the results text of the rows of the results table, into a new report."""
+        _check_conformance(results, conforms, rows)
+        with stringify_memo(results.stringify_memo):
+            graph, text = results.render_graph(conforms, rows), results.render_text(conforms, rows)
+        return cls(conforms, graph, text, rows, profile=profile)
+
+    @property
+    def conforms(self) -> bool:
+        return self[0]
+
+    @property
+    def graph(self) -> rdflib.Graph:
+        return self[1]
+
+    @property
+    def text(self) -> str:
+        return self[2]
+
+    def __repr__(self) -> str:
+        return f"<ValidationReport conforms={self.conforms} results={len(self.rows)}>"
+
+
+class LazyValidationReport(Sequence):
+    """
+    The outcome of a validation run, returned by validate() when it is given lazy_report=True.
+    Behaves like the (conforms, results_graph, results_text) tuple, but the results graph and the results text are
+    each rendered only on first access. Unpacking the report accesses all three, so it renders both.
+    Until both are rendered, the report keeps the results table alive, and with it the data graph, shapes and
+    constraints of the run. The results table is released as soon as both are rendered.
+    """
+
+    __slots__ = ('conforms', 'results', 'rows', 'profile', '_graph', '_text')
+
+    def __init__(
+        self,
+        results: ValidationResults,
+        conforms: bool,
+        rows: List[int],
+        profile: Optional['ValidationProfile'] = None,
+    ):
+        _check_conformance(results, conforms, rows)
+        self.conforms = conforms
+        self.results: Optional[ValidationResults] = results
+        self.rows = rows
+        # The ValidationProfile of the run, when profiling was enabled
+        self.profile = profile
+        self._graph: Optional[rdflib.Graph] = None
+        self._text: Optional[str] = None
+
+    def _release(self) -> None:
+        if self._graph is not None and self._text is not None:
+            self.results = None
+
+    @property
+    def graph(self) -> rdflib.Graph:
+        if self._graph is None:
+            assert self.results is not None
+            with stringify_memo(self.results.stringify_memo):
+                self._graph = self.results.render_graph(self.conforms, self.rows)
+            self._release()
+        return self._graph
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            assert self.results is not None
+            with stringify_memo(self.results.stringify_memo):
+                self._text = self.results.render_text(self.conforms, self.rows)
+            self._release()
+        return self._text
+
+    def __len__(self) -> int:
+        return 3
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return tuple(self[i] for i in range(3)[item])
+        if item < 0:
+            item += 3
+        if item == 0:
+            return self.conforms
+        elif item == 1:
+            return self.graph
+        elif item == 2:
+            return self.text
+        raise IndexError("ValidationReport index out of range")
+
+    def __repr__(self) -> str:
+        return f"<LazyValidationReport conforms={self.conforms} results={len(self.rows)}>"
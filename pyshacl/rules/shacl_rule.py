@@ -27,7 +27,8 @@ class SHACLRuleCondition(object):
         return self.cond_shape.focus_nodes(data_graph)
 
     def validate_condition(self, executor, data_graph, focus_node):
-        return self.cond_shape.validate(executor, data_graph, focus=focus_node)
+        with self.cond_shape.sg.results.nested():
+            return self.cond_shape.validate(executor, data_graph, focus=focus_node)
 
 
 class SHACLRule(object):
@@ -1,7 +1,9 @@
 # HTTP Server for PySHACL
+import io
 import os
 import sys
-from typing import Union
+import tempfile
+from typing import Any, Dict, Optional, Union
 
 try:
     import sanic.application.logo
@@ -17,11 +19,13 @@ from dataclasses import dataclass
 from enum import Enum
 from textwrap import dedent
 
+from rdflib import Literal
 from sanic_ext.extensions.openapi import types as openapi_types
 from sanic_ext.extensions.openapi.definitions import RequestBody, Response
 
 from . import __version__ as pyshacl_version
 from . import validate
+from .consts import env_truths
 from .errors import ConstraintLoadError, ReportableRuntimeError, RuleLoadError, ShapeLoadError, ValidationFailure
 
 API_VERSION = "v1"
@@ -189,6 +193,33 @@ validation_response_xml_ref = make_validation_response_RDF("ApplicationXML", "ap
 validation_response_rdf_ref = make_validation_response_RDF("RDFXML", "application/rdf+xml")
 validation_response_ttl_ref = make_validation_response_RDF("Turtle", "text/turtle")
 
+# Raw RDF request bodies are streamed to a temporary file, then parsed from there.
+# Maps the request Content-Type to the RDFLib parser format name.
+RAW_RDF_REQUEST_TYPES = {
+    "text/turtle": "turtle",
+    "application/n-triples": "nt",
+    "application/n-quads": "nquads",
+}
+# Number of N-Triples lines to buffer before each write of a streamed response
+STREAM_RESPONSE_BATCH_SIZE = 1024
+# Options that can be given as query args when the request body is raw RDF
+QUERY_ARG_BOOL_OPTIONS = (
+    "advanced",
+    "do_owl_imports",
+    "allow_infos",
+    "allow_warnings",
+    "iterate_rules",
+    "js",
+    "metashacl",
+)
+QUERY_ARG_STR_OPTIONS = (
+    "shapes_graph",
+    "shapes_graph_format",
+    "ontology_graph",
+    "ontology_graph_format",
+    "inference",
+)
+
 ALLOWED_RESPONSE_TYPES = {
     "text/plain": validation_response_simple_ref,
     "application/json": validation_response_simple_ref,
@@ -200,18 +231,140 @@ ALLOWED_RESPONSE_TYPES = {
 }
 
 
+class SpooledBody(io.BufferedIOBase):
+    """
+    A reader over a request body spooled to an anonymous temporary file.
+    That file is named by its file descriptor, which RDFLib would take as a path for the base URI,
+    so this reader has no name. Closing it closes and deletes the temporary file.
+    """
+
+    def __init__(self, spool: io.BufferedRandom) -> None:
+        super().__init__()
+        self._spool = spool
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        return self._spool.read(size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self._spool.read1(size)
+
+    def readinto(self, b) -> int:
+        return self._spool.readinto(b)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._spool.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._spool.tell()
+
+    def close(self) -> None:
+        self._spool.close()
+        super().close()
+
+
+async def spool_request_body(request: Request) -> SpooledBody:
+    """
+    Read the streamed request body chunk-by-chunk into an anonymous temporary file.
+    The body is never held in memory as a whole, the RDF parser reads it back from the file.
+    """
+    stream = request.stream
+    if stream is None:
+        raise InvalidUsage("The request body was not streamed.")
+    spool = tempfile.TemporaryFile()
+    try:
+        while True:
+            # The stream is the HTTP protocol handler, which has read()
+            chunk = await stream.read()  # type: ignore[attr-defined]
+            if chunk is None:
+                break
+            spool.write(chunk)
+        spool.flush()
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return SpooledBody(spool)
+
+
+def options_from_query_args(request: Request) -> Dict[str, Any]:
+    """
+    When the request body is raw RDF, the remaining validation options are given as query args.
+    Only http(s) URLs are accepted for the ShapesGraph and OntologyGraph in this mode.
+    """
+    options: Dict[str, Any] = {}
+    for name in QUERY_ARG_BOOL_OPTIONS:
+        value = request.args.get(name, None)
+        if value is not None:
+            options[name] = value in env_truths
+    for name in QUERY_ARG_STR_OPTIONS:
+        value = request.args.get(name, None)
+        if value is not None:
+            options[name] = value
+    for name in ("shapes_graph", "ontology_graph"):
+        value = options.get(name, None)
+        if value is not None and not (value.startswith("http:") or value.startswith("https:")):
+            raise InvalidUsage(f"Query arg {name} must be an http or https URL when the request body is raw RDF.")
+    return options
+
+
+def _nt_literal(lit: Literal) -> str:
+    encoded = lit.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"').replace("\r", "\\r")
+    if lit.language:
+        return f'"{encoded}"@{lit.language}'
+    elif lit.datatype:
+        return f'"{encoded}"^^<{lit.datatype}>'
+    return f'"{encoded}"'
+
+
+def nt_row(triple) -> str:
+    """One N-Triples line for a triple, in the same form as the RDFLib N-Triples serializer writes it."""
+    s, p, o = triple
+    o_str = _nt_literal(o) if isinstance(o, Literal) else o.n3()
+    return f"{s.n3()} {p.n3()} {o_str} .\n"
+
+
+async def stream_ntriples_response(request: Request, graph) -> None:
+    """
+    Write the report graph to the client as N-Triples, in batches of lines.
+    The full serialized report is never built in memory.
+    """
+    response = await request.respond(content_type="application/n-triples")
+    batch = []
+    for t in graph.triples((None, None, None)):
+        batch.append(nt_row(t))
+        if len(batch) >= STREAM_RESPONSE_BATCH_SIZE:
+            await response.send("".join(batch))
+            batch.clear()
+    if batch:
+        await response.send("".join(batch))
+    await response.eof()
+
+
 @openapi.definition(
     summary="Validate",
-    description="Send a validation request, consisting of a DataGraph, SHACL shapes graph, and optional parameters.",
+    description="Send a validation request, consisting of a DataGraph, SHACL shapes graph, and optional parameters. "
+    "Alternatively send the DataGraph as a raw RDF body (Turtle, N-Triples, or N-Quads), "
+    "with the other options given as query args.",
     body=RequestBody(
-        {"application/json": validation_request_ref},
+        {
+            "application/json": validation_request_ref,
+            "text/turtle": openapi_types.String(format="text/turtle"),
+            "application/n-triples": openapi_types.String(format="application/n-triples"),
+            "application/n-quads": openapi_types.String(format="application/n-quads"),
+        },
         required=True,
-        description="ValidationRequest body",
+        description="ValidationRequest body, or a raw RDF DataGraph",
     ),
     validate=False,
     response=Response(ALLOWED_RESPONSE_TYPES, status=200),
 )
-async def sh_validate(request: Request) -> HTTPResponse:
+async def sh_validate(request: Request) -> Union[HTTPResponse, None]:
     content_type = "application/json"  # Default content type is the fallback
     content_types = (request.headers.getall("Content-Type"),)
     for c_t in content_types:
@@ -236,17 +389,29 @@ async def sh_validate(request: Request) -> HTTPResponse:
             for a_t3 in split_at:
                 accept_type = ([p.strip() for p in a_t3.split(";")][0]).lower()
 
-    if content_type != "application/json":
+    if content_type != "application/json" and content_type not in RAW_RDF_REQUEST_TYPES:
         raise InvalidUsage(
-            "Request should be encoded in format application/json in accordance with the OpenAPI schema."
+            "Request should be encoded in format application/json in accordance with the OpenAPI schema, "
+            "or be a raw RDF body in one of: " + ", ".join(RAW_RDF_REQUEST_TYPES.keys())
         )
     if accept_type not in ALLOWED_RESPONSE_TYPES.keys():
         raise InvalidUsage("Invalid response type requested.")
 
-    try:
-        body = request.json
-    except ValueError:
-        raise InvalidUsage("Invalid JSON payload.")
+    spooled_body: Union[SpooledBody, None] = None
+    if content_type in RAW_RDF_REQUEST_TYPES:
+        body = options_from_query_args(request)
+        spooled_body = await spool_request_body(request)
+        body["data_graph"] = spooled_body
+        body["data_graph_format"] = RAW_RDF_REQUEST_TYPES[content_type]
+    else:
+        # The route is streamed, so the JSON body must be read in before it is decoded
+        await request.receive_body()
+        try:
+            body = request.json
+        except ValueError:
+            raise InvalidUsage("Invalid JSON payload.")
+        if not isinstance(body, dict):
+            raise InvalidUsage("Invalid JSON payload.")
 
     data_graph = body.get("data_graph", None)
     if data_graph is None:
@@ -318,6 +483,9 @@ async def sh_validate(request: Request) -> HTTPResponse:
         simple_resp = ValidationResponseSimple(conforms=None, validation_report=None, validation_failures=[err])
     else:
         simple_resp = ValidationResponseSimple(conforms=_conforms, validation_report=_text, validation_failures=[])
+    finally:
+        if spooled_body is not None:
+            spooled_body.close()
     if accept_type == "text/plain":
         if simple_resp.validation_failures:
             failure_texts = "\r\n".join(simple_resp.validation_failures)
@@ -342,14 +510,15 @@ async def sh_validate(request: Request) -> HTTPResponse:
             "validation_failures": simple_resp.validation_failures,
         }
         return JSONResponse(resp_dict, content_type="application/json")
+    if accept_type == "application/n-triples":
+        await stream_ntriples_response(request, _graph)
+        return None
     if accept_type == "application/ld+json":
         graph_str = _graph.serialize(format="json-ld")
     elif accept_type == "text/turtle":
         graph_str = _graph.serialize(format="turtle")
-    elif accept_type == "application/xml" or accept_type == "application/rdf+xml":
+    else:  # application/xml or application/rdf+xml
         graph_str = _graph.serialize(format="xml")
-    else:
-        graph_str = _graph.serialize(format="ntriples")
     return HTTPResponse(body=graph_str, content_type=accept_type)
 
 
@@ -406,7 +575,7 @@ def app_factory() -> Sanic:
             """
         ),
     )
-    app.route("/validate", methods=('POST', 'OPTIONS'))(sh_validate)
+    app.route("/validate", methods=('POST', 'OPTIONS'), stream=True)(sh_validate)
     return app
 
 
@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 #
-import itertools
 import logging
 import sys
+from contextlib import nullcontext
 from decimal import Decimal
 from time import perf_counter
-from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set, Type, Union
+from typing import TYPE_CHECKING, Any, ContextManager, Dict, List, Optional, Sequence, Set, Tuple, Type, Union
 
 from rdflib import BNode, IdentifiedNode, Literal, URIRef
+from rdflib.term import Node
 
 from .consts import (
     RDF_type,
@@ -23,7 +24,6 @@ from .consts import (
     SH_name,
     SH_order,
     SH_property,
-    SH_resultSeverity,
     SH_select,
     SH_severity,
     SH_SPARQLTarget,
@@ -40,15 +40,29 @@ from .errors import ConstraintLoadError, ConstraintLoadWarning, ReportableRuntim
 from .helper import get_query_helper_cls
 from .helper.expression_helper import value_nodes_from_path
 from .helper.path_helper import shacl_path_to_sparql_path
+from .helper.sparql_remote_helper import (
+    TARGET_CLASS,
+    TARGET_OBJECTS_OF,
+    TARGET_SUBJECTS_OF,
+    batched_value_nodes,
+    target_focus_nodes,
+)
 from .pytypes import GraphLike, RDFNode, SHACLExecutor
+from .report import NO_TERM, StopAtFirstResult
 
 if TYPE_CHECKING:
     from pyshacl.constraints import ConstraintComponent
+    from pyshacl.constraints.constraint_component import FusedValueChecks, ValueCheck
+    from pyshacl.profiling import ConstraintProfile, ShapeProfile
     from pyshacl.shapes_graph import ShapesGraph
 
 module = sys.modules[__name__]
 
 
+# The predicates of a shape that the Shape constructor reads
+SHAPE_HEADER_PREDICATES = (SH_deactivated, SH_severity, SH_message, SH_name, SH_description)
+
+
 class Shape(object):
     __slots__ = (
         'logger',
@@ -62,6 +76,9 @@ class Shape(object):
         '_messages',
         '_names',
         '_descriptions',
+        '_value_checks',
+        '_fused_checks',
+        '_compiled',
     )
 
     def __init__(
@@ -71,6 +88,7 @@ class Shape(object):
         p=False,
         path: Optional[Union[URIRef, BNode]] = None,
         logger=None,
+        harvested: Optional[Dict[URIRef, Dict[Node, List[Node]]]] = None,
     ):
         """
         Shape
@@ -79,6 +97,9 @@ class Shape(object):
         :type p: bool
         :type path: URIRef | BNode | None
         :type logger: logging.Logger
+        :param harvested: The objects of each of the SHAPE_HEADER_PREDICATES, by subject, already read from
+            the shapes graph in one pass for all of the shapes. If None, they are looked up for this shape.
+        :type harvested: dict | None
         """
         self.logger = logger or logging.getLogger(__name__)
         self.sg = sg
@@ -86,8 +107,14 @@ class Shape(object):
         self._p = p
         self._path = path
         self._advanced = False
-
-        deactivated_vals = set(self.objects(SH_deactivated))
+        # Keyed by the class and value_checks_key() of each constraint component
+        self._value_checks: Dict[Tuple[Type['ConstraintComponent'], Any], Optional[List['ValueCheck']]] = {}
+        self._fused_checks: Dict[
+            Tuple[Tuple[Type['ConstraintComponent'], Any], ...], Tuple[List[int], 'FusedValueChecks']
+        ] = {}
+        self._compiled: Dict[Type['ConstraintComponent'], Any] = {}
+
+        deactivated_vals = self._header_objects(SH_deactivated, harvested)
         if len(deactivated_vals) > 1:
             # TODO:coverage: we don't have any tests for invalid shapes
             raise ShapeLoadError(
@@ -105,30 +132,98 @@ class Shape(object):
                     "https://www.w3.org/TR/shacl/#deactivated",
                 )
             self._deactivated = bool(d.value)
-        severity = set(self.objects(SH_severity))
+        severity = self._header_objects(SH_severity, harvested)
         if len(severity):
             self._severity = next(iter(severity))  # type: Union[URIRef, BNode, Literal]
         else:
             self._severity = SH_Violation
-        messages = set(self.objects(SH_message))
+        messages = self._header_objects(SH_message, harvested)
         if len(messages):
             self._messages = messages  # type: Set
         else:
             self._messages = set()
-        names = set(self.objects(SH_name))
+        names = self._header_objects(SH_name, harvested)
         if len(names):
             self._names = names  # type: Set
         else:
             self._names = set()
-        descriptions = set(self.objects(SH_description))
+        descriptions = self._header_objects(SH_description, harvested)
         if len(descriptions):
             self._descriptions = descriptions  # type: Set
         else:
             self._descriptions = set()
 
+    def _header_objects(
+        self, predicate: URIRef, harvested: Optional[Dict[URIRef, Dict[Node, List[Node]]]]
+    ) -> Set[Any]:
+        if harvested is None:
+            return set(self.objects(predicate))
+        return set(harvested[predicate].get(self.node, ()))
+
     def set_advanced(self, val):
         self._advanced = bool(val)
 
+    def value_checks_of(self, constraint: 'ConstraintComponent') -> Optional[List['ValueCheck']]:
+        """
+        The value checks of a constraint component on this shape. A new constraint component is constructed for
+        each validation run, so the checks are compiled on the first run and kept for the later ones,
+        for as long as the value_checks_key() of the component stays the same.
+        """
+        key = (constraint.__class__, constraint.value_checks_key())
+        try:
+            return self._value_checks[key]
+        except KeyError:
+            checks = self._value_checks[key] = constraint.value_checks()
+            return checks
+
+    def compiled_of(self, constraint: 'ConstraintComponent') -> Any:
+        """
+        The result of compile() for a constraint component on this shape, kept for the later validation runs
+        in the same way as value_checks_of().
+        One entry for each class of constraint component is enough: the shape has at most one component of each
+        class, and compile() only reads the shapes graph, which is loaded once and not changed afterwards (the
+        shapes are built from it only once, too).
+        """
+        cls = constraint.__class__
+        try:
+            return self._compiled[cls]
+        except KeyError:
+            compiled = self._compiled[cls] = constraint.compile()
+            return compiled
+
+    def _make_constraint(self, constraint_component: Type['ConstraintComponent']) -> Optional['ConstraintComponent']:
+        """Construct a constraint component on this shape, or None if it cannot be loaded."""
+        try:
+            return constraint_component(self)
+        except ConstraintLoadWarning as w:
+            self.logger.warning(repr(w))
+            return None
+        except ConstraintLoadError as e:
+            self.logger.error(repr(e))
+            raise e
+
+    def fused_value_checks(self, constraints: Sequence['ConstraintComponent']) -> Tuple[List[int], 'FusedValueChecks']:
+        """
+        The value checks of the simple value-local constraint components among the given ones, compiled into one
+        check list that runs in a single pass over the value nodes.
+        Returns the positions of those constraint components in the given sequence, and the compiled checks.
+        """
+        key = tuple((c.__class__, c.value_checks_key()) for c in constraints)
+        try:
+            return self._fused_checks[key]
+        except KeyError:
+            from .constraints.constraint_component import FusedValueChecks
+
+            positions: List[int] = []
+            check_lists: List[List['ValueCheck']] = []
+            for i, c in enumerate(constraints):
+                checks = self.value_checks_of(c)
+                if checks is not None:
+                    positions.append(i)
+                    check_lists.append(checks)
+            fused = self._fused_checks[key] = (positions, FusedValueChecks(check_lists))
+            return fused
+
     def get_other_shape(self, shape_node):
         if self.sg.is_filtered_out_shape(shape_node):
             return None
@@ -390,54 +485,18 @@ class Shape(object):
             self.logger.debug(f"Milliseconds to find focus nodes: {elapsed * 1000.0:.3f}ms")
         return found_node_targets
 
-    @classmethod
-    def make_focus_nodes_sparql_values(
-        cls, target_classes_s: Set, implicit_classes_s: Set, target_objects_of_s: Set, target_subjects_of_s: Set
-    ):
-        init_bindings = {}
-        values_keys = []
-        values_vals = []
-        if len(target_classes_s) > 1:
-            values_keys.append("$targetClass")
-            values_vals.append(list(target_classes_s))
-        else:
-            init_bindings["targetClass"] = next(iter(target_classes_s)) if len(target_classes_s) > 0 else "UNDEF"
-        if len(implicit_classes_s) > 1:
-            values_keys.append("$implicitClass")
-            values_vals.append(list(implicit_classes_s))
-        else:
-            init_bindings["implicitClass"] = next(iter(implicit_classes_s)) if len(implicit_classes_s) > 0 else "UNDEF"
-        if len(target_subjects_of_s) > 1:
-            values_keys.append("$targetSubjectsOf")
-            values_vals.append(list(target_subjects_of_s))
-        else:
-            init_bindings["targetSubjectsOf"] = (
-                next(iter(target_subjects_of_s)) if len(target_subjects_of_s) > 0 else "UNDEF"
-            )
-        if len(target_objects_of_s) > 1:
-            values_keys.append("$targetObjectsOf")
-            values_vals.append(list(target_objects_of_s))
-        else:
-            init_bindings["targetObjectsOf"] = (
-                next(iter(target_objects_of_s)) if len(target_objects_of_s) > 0 else "UNDEF"
-            )
-        if len(values_keys) < 1:
-            return "", init_bindings
-        else:
-            values_clause = f"VALUES ({' '.join(values_keys)}) {{\n"
-            product = itertools.product(*values_vals)
-            for p in product:
-                values_clause += f"\t( {' '.join(p_x.n3() for p_x in p)} )\n"
-            values_clause += "}"
-            return values_clause, init_bindings
-
-    def focus_nodes_sparql(self, data_graph, debug=False):
+    def focus_nodes_sparql(self, data_graph, debug=False, executor: Optional[SHACLExecutor] = None):
         """
         The set of focus nodes for a shape may be identified as follows:
 
         specified in a shape using target declarations
         specified in any constraint that references a shape in parameters of shape-expecting constraint parameters (e.g. sh:node)
         specified as explicit input to the SHACL processor for validating a specific RDF term against a shape
+
+        Each kind of target declaration is found with its own queries, and the focus nodes of each query are
+        cached in the ShapesGraph for the rest of the validation run.
+        :param executor: Gives the batch size, page size and concurrency of the queries
+        :type executor: SHACLExecutor | None
         :return:
         """
         t1 = 0.0
@@ -448,7 +507,7 @@ class Shape(object):
             advanced_targets = self.advanced_target()
         else:
             advanced_targets = False
-        found_node_targets = set()
+        found_node_targets: Set[RDFNode] = set()
         target_nodes = set(target_nodes)
         target_classes = set(target_classes)
         implicit_classes = set(implicit_classes)
@@ -481,36 +540,22 @@ class Shape(object):
             or len(target_objects_of) > 0
             or len(target_subjects_of) > 0
         ):
-            focus_query = """\
-            SELECT ?targetClass_F ?targetSubjectsOf_F ?targetObjectsOf_F WHERE {
-                {VALUES_CLAUSE}
-                OPTIONAL { {
-                ?targetClass_F rdf:type/rdfs:subClassOf* $targetClass .
-                } UNION {
-                ?targetClass_F rdf:type/rdfs:subClassOf* $implicitClass .
-                }. }
-                OPTIONAL { ?targetSubjectsOf_F $targetSubjectsOf ?anyA . }
-                OPTIONAL {?anyB $targetObjectsOf ?targetObjectsOf_F . }
-            }
-            """
-            values_clause, init_bindings = self.make_focus_nodes_sparql_values(
-                target_classes, implicit_classes, target_objects_of, target_subjects_of
+            if executor is None:
+                executor = SHACLExecutor(sparql_mode=True)
+            found_node_targets.update(
+                target_focus_nodes(
+                    data_graph,
+                    (
+                        (TARGET_CLASS, target_classes | implicit_classes),
+                        (TARGET_SUBJECTS_OF, target_subjects_of),
+                        (TARGET_OBJECTS_OF, target_objects_of),
+                    ),
+                    batch_size=executor.sparql_batch_size,
+                    page_size=executor.sparql_page_size,
+                    concurrency=executor.sparql_concurrency,
+                    cache=self.sg.focus_node_cache,
+                )
             )
-            new_query = focus_query.replace("{VALUES_CLAUSE}", values_clause)
-            try:
-                resp = data_graph.query(new_query, initBindings=init_bindings)
-            except Exception as e:
-                print(new_query)
-                raise e
-            if len(resp) > 0:
-                for result_set in resp:
-                    target_class_f, target_subjects_of_f, target_objects_of_f = result_set
-                    if target_class_f is not None and target_class_f != "UNDEF":
-                        found_node_targets.add(target_class_f)
-                    if target_subjects_of_f is not None and target_subjects_of_f != "UNDEF":
-                        found_node_targets.add(target_subjects_of_f)
-                    if target_objects_of_f is not None and target_objects_of_f != "UNDEF":
-                        found_node_targets.add(target_objects_of_f)
         if advanced_targets:
             for at_node, at in advanced_targets.items():
                 if at['type'] == SH_SPARQLTarget:
@@ -539,7 +584,14 @@ class Shape(object):
             self.logger.debug(f"Milliseconds to find focus nodes: {elapsed * 1000.0:.3f}ms")
         return found_node_targets
 
-    def value_nodes(self, target_graph, focus, sparql_mode: bool = False, debug: bool = False):
+    def value_nodes(
+        self,
+        target_graph,
+        focus,
+        sparql_mode: bool = False,
+        debug: bool = False,
+        executor: Optional[SHACLExecutor] = None,
+    ):
         """
         For each focus node, you can get a set of value nodes.
         For a Node Shape, each focus node has just one value node,
@@ -550,6 +602,8 @@ class Shape(object):
         :type sparql_mode: bool
         :param debug:
         :type debug: bool
+        :param executor: Gives the batch size, page size and concurrency of the queries in sparql_mode
+        :type executor: SHACLExecutor | None
         :return:
         """
         t1 = 0.0
@@ -573,27 +627,16 @@ class Shape(object):
             else:
                 prefixes = dict(target_graph.namespace_manager.namespaces())
                 sparql_path = shacl_path_to_sparql_path(self.sg, path_val, prefixes=prefixes)
-            values_query = f"SELECT {' '.join(f'?v{i}' for i, _ in enumerate(focus))} WHERE {{\n"
-            init_bindings = {}
-            for i, f in enumerate(focus):
-                focus_dict[f] = set()
-                values_query += f"OPTIONAL {{ \t$f{i} {sparql_path} ?v{i} . }}\n"
-                init_bindings[f"f{i}"] = f
-            values_query += "}"
-            try:
-                results = target_graph.query(values_query, initBindings=init_bindings)
-            except Exception as e:
-                print(e)
-                raise
-            if len(results) > 0:
-                for r in results:
-                    for i, f in enumerate(focus):
-                        row_focus_result = r[i]
-                        if row_focus_result is None or row_focus_result == "UNDEF":
-                            continue
-                        focus_dict[f].add(row_focus_result)
-            else:
-                pass
+            if executor is None:
+                executor = SHACLExecutor(sparql_mode=True)
+            focus_dict = batched_value_nodes(
+                target_graph,
+                list(focus),
+                sparql_path,
+                batch_size=executor.sparql_batch_size,
+                page_size=executor.sparql_page_size,
+                concurrency=executor.sparql_concurrency,
+            )
         else:
             for f in focus:
                 focus_dict[f] = value_nodes_from_path(self.sg, f, path_val, target_graph)
@@ -618,6 +661,14 @@ class Shape(object):
                 applicable_custom_constraints.add(c)
         return applicable_custom_constraints
 
+    @staticmethod
+    def _profile_constraint(
+        executor: SHACLExecutor, shape_record: Optional['ShapeProfile'], component: str
+    ) -> ContextManager[Optional['ConstraintProfile']]:
+        if executor.profile is None or shape_record is None:
+            return nullcontext()
+        return executor.profile.constraint_run(shape_record, component)
+
     def validate(
         self,
         executor: SHACLExecutor,
@@ -629,6 +680,22 @@ class Shape(object):
             ]
         ] = None,
         _evaluation_path: Optional[List] = None,
+    ):
+        profile = executor.profile
+        if profile is None:
+            return self._validate(executor, target_graph, focus, _evaluation_path)
+        with profile.shape_run(self) as record:
+            _is_conform, reports = self._validate(executor, target_graph, focus, _evaluation_path, record)
+            record.result_count += len(reports)
+        return _is_conform, reports
+
+    def _validate(
+        self,
+        executor: SHACLExecutor,
+        target_graph: GraphLike,
+        focus: Optional[Union[Sequence[RDFNode], RDFNode]],
+        _evaluation_path: Optional[List],
+        _profile: Optional['ShapeProfile'] = None,
     ):
         if self.deactivated:
             if executor.debug:
@@ -652,7 +719,7 @@ class Shape(object):
             self.logger.debug(f"Checking if Shape {str(self)} defines its own targets.")
             self.logger.debug("Identifying targets to find focus nodes.")
             if executor.sparql_mode:
-                focus_set = self.focus_nodes_sparql(target_graph, debug=executor.debug)
+                focus_set = self.focus_nodes_sparql(target_graph, debug=executor.debug, executor=executor)
             else:
                 focus_set = self.focus_nodes(target_graph, debug=executor.debug)
             focus_list = list(focus_set)
@@ -682,6 +749,8 @@ class Shape(object):
                     f"Filtered focus nodes based on focus_nodes option. Only {len_filtered_focus} of {len_orig_focus} focus nodes remain."
                 )
             focus_list = filtered_focus_nodes
+        if _profile is not None:
+            _profile.focus_count += len(focus_list)
         t1 = ct1 = 0.0  # prevent warnings about use-before-assign
         collect_stats = bool(executor.debug)
 
@@ -724,8 +793,11 @@ class Shape(object):
         parameters = (p for p, v in self.sg.predicate_objects(self.node) if p in search_parameters)
         reports = []
         focus_value_nodes = self.value_nodes(
-            target_graph, focus_list, sparql_mode=executor.sparql_mode, debug=executor.debug
+            target_graph, focus_list, sparql_mode=executor.sparql_mode, debug=executor.debug, executor=executor
         )
+        value_count = sum(len(v) for v in focus_value_nodes.values()) if _profile is not None else 0
+        if _profile is not None:
+            _profile.value_count += value_count
         filter_reports: bool = False
         allow_conform: bool = False
         allowed_severities: Set[URIRef] = set()
@@ -743,25 +815,42 @@ class Shape(object):
         non_conformant = False
         done_constraints = set()
         run_count = 0
+        results = self.sg.results
         _evaluation_path.append(self)
         if executor.debug:
             path_str = " -> ".join((str(e) for e in _evaluation_path))
             self.logger.debug(f"Current shape evaluation path: {path_str}")
         constraint_components = [constraint_map[p] for p in iter(parameters)]
         constraint_component: Type['ConstraintComponent']
+        # The constraint components built before the loop below, None for those that could not be loaded
+        built: Dict[Type['ConstraintComponent'], Optional['ConstraintComponent']] = {}
+        fused_failures: Dict[Type['ConstraintComponent'], List] = {}
+        if not executor.debug and executor.profile is None and not executor.conforms_only:
+            # Run the checks of the simple value-local constraints in one pass over the value nodes.
+            # Only those constraint components are built up front, the others are built when they are evaluated.
+            # In debug mode and when profiling, each constraint is evaluated on its own so it can be timed.
+            # In conforms_only mode, each constraint is evaluated on its own so it can stop at its first failure.
+            for constraint_component in constraint_components:
+                if constraint_component not in built and constraint_component.has_value_checks():
+                    built[constraint_component] = self._make_constraint(constraint_component)
+            value_check_constraints = [c for c in built.values() if c is not None]
+            if len(value_check_constraints) > 1:
+                positions, fused = self.fused_value_checks(value_check_constraints)
+                if len(positions) > 1:
+                    fused_failures = {
+                        value_check_constraints[i].__class__: failures
+                        for i, failures in zip(positions, fused(focus_value_nodes))
+                    }
         for constraint_component in constraint_components:
             if constraint_component in done_constraints:
                 continue
-            try:
-                # if executor.debug:
-                #     self.logger.debug(f"Constructing Constraint Component: {repr(constraint_component)}")
-                c = constraint_component(self)
-            except ConstraintLoadWarning as w:
-                self.logger.warning(repr(w))
+            if constraint_component in built:
+                c = built[constraint_component]
+            else:
+                c = self._make_constraint(constraint_component)
+            if c is None:
                 continue
-            except ConstraintLoadError as e:
-                self.logger.error(repr(e))
-                raise e
+            done_constraints.add(constraint_component)
             _e_p_copy = _evaluation_path[:]
             _e_p_copy.append(c)
             if executor.debug:
@@ -771,7 +860,26 @@ class Shape(object):
             if executor.debug:
                 path_str = " -> ".join((str(e) for e in _e_p_copy))
                 self.logger.debug(f"Current constraint evaluation path: {path_str}")
-            _is_conform, _reports = c.evaluate(executor, target_graph, focus_value_nodes, _e_p_copy)
+            dropped_before = results.dropped
+            with self._profile_constraint(executor, _profile, c.constraint_name()) as c_record:
+                try:
+                    if constraint_component in fused_failures:
+                        _is_conform, _reports = c.make_check_results(
+                            target_graph, fused_failures[constraint_component]
+                        )
+                    else:
+                        _is_conform, _reports = c.evaluate(executor, target_graph, focus_value_nodes, _e_p_copy)
+                except StopAtFirstResult as s:
+                    # conforms_only mode, the constraint stopped at its first result.
+                    _is_conform, _reports = False, [s.row]
+            if c_record is not None:
+                c_record.focus_count += len(focus_value_nodes)
+                c_record.value_count += value_count
+                c_record.result_count += len(_reports)
+            # Some results were over the report limits, and were not recorded.
+            truncated = results.dropped != dropped_before
+            if truncated:
+                _reports = [r for r in _reports if r != NO_TERM]
             if executor.debug:
                 if collect_stats:
                     ct2 = perf_counter()
@@ -784,33 +892,43 @@ class Shape(object):
                 else:
                     self.logger.debug(f"Focus nodes do _not_ conform to constraint {c}.")
                     if lh_shape or (not rh_shape):
-                        for v_str, v_node, v_parts in _reports:
-                            self.logger.debug(v_str)
+                        for rept in _reports:
+                            self.logger.debug(results.text_of(rept))
 
             if _is_conform or allow_conform:
                 ...
             elif filter_reports:
-                all_allow = True
-                for v_str, v_node, v_parts in _reports:
-                    severity_bits = list(filter(lambda p: p[0] == v_node and p[1] == SH_resultSeverity, v_parts))
-                    if severity_bits:
-                        all_allow = all_allow and (severity_bits[0][2] in allowed_severities)
+                # Results that were not recorded are from this shape, or from one of its property shapes
+                # that does not conform, so their severity is not allowed.
+                all_allow = not truncated
+                for rept in _reports:
+                    all_allow = all_allow and (results.severity_of(rept) in allowed_severities)
                 non_conformant = non_conformant or (not all_allow)
             else:
                 non_conformant = non_conformant or (not _is_conform)
             reports.extend(_reports)
             run_count += 1
-            done_constraints.add(constraint_component)
-            if non_conformant and executor.abort_on_first:
+            if non_conformant and (executor.abort_on_first or executor.conforms_only):
                 break
         applicable_custom_constraints = self.find_custom_constraints()
         for a in applicable_custom_constraints:
-            if non_conformant and executor.abort_on_first:
+            if non_conformant and (executor.abort_on_first or executor.conforms_only):
                 break
             _e_p_copy2 = _evaluation_path[:]
             validator = a.make_validator_for_shape(self)
             _e_p_copy2.append(validator)
-            _is_conform, _r = validator.evaluate(executor, target_graph, focus_value_nodes, _e_p_copy2)
+            dropped_before = results.dropped
+            with self._profile_constraint(executor, _profile, str(a.node)) as c_record:
+                try:
+                    _is_conform, _r = validator.evaluate(executor, target_graph, focus_value_nodes, _e_p_copy2)
+                except StopAtFirstResult as s:
+                    _is_conform, _r = False, [s.row]
+            if c_record is not None:
+                c_record.focus_count += len(focus_value_nodes)
+                c_record.value_count += value_count
+                c_record.result_count += len(_r)
+            if results.dropped != dropped_before:
+                _r = [r for r in _r if r != NO_TERM]
             non_conformant = non_conformant or (not _is_conform)
             reports.extend(_r)
             run_count += 1
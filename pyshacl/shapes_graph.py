@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 import logging
 import warnings
-from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Union
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Optional, Sequence, Union
 
 import rdflib
+from rdflib.term import Node
 
 from .constraints.constraint_component import CustomConstraintComponentFactory
 from .constraints.core.logical_constraints import SH_and, SH_not, SH_or, SH_xone
@@ -28,11 +29,28 @@ from .consts import (
     SH_targetSubjectsOf,
 )
 from .errors import ShapeLoadError
-from .shape import Shape
+from .report import ValidationResults, recording_results
+from .shape import SHAPE_HEADER_PREDICATES, Shape
 
 if TYPE_CHECKING:
     from .pytypes import RDFNode
 
+# The predicates that ShapesGraph._harvest() reads from the shapes graph, to find the shapes and construct them
+HARVEST_PREDICATES = (
+    SH_path,
+    SH_targetClass,
+    SH_targetNode,
+    SH_targetObjectsOf,
+    SH_targetSubjectsOf,
+    SH_property,
+    SH_node,
+    SH_not,
+    SH_qualifiedValueShape,
+    SH_and,
+    SH_or,
+    SH_xone,
+) + SHAPE_HEADER_PREDICATES
+
 
 class ShapesGraph(object):
     system_triples = [(OWL_Class, RDFS_subClassOf, RDFS_Class), (OWL_DatatypeProperty, RDFS_subClassOf, RDF_Property)]
@@ -62,8 +80,35 @@ class ShapesGraph(object):
         self._shacl_target_types: Dict[str, 'RDFNode'] = {}
         self._filtered_out_shapes: set = set()
         self._use_js = False
+        self._results: Optional[ValidationResults] = None
+        self._focus_node_cache: Dict[Any, FrozenSet['RDFNode']] = {}
         self._add_system_triples()
 
+    @property
+    def results(self) -> ValidationResults:
+        """
+        The table that validation results are recorded into: the table of the validation run of this shapes graph
+        in progress in this context (see ValidationResults.recording()).
+        Outside of any run, this is the table of the last run that was started.
+        """
+        results = recording_results()
+        if results is not None and results.sg is self:
+            return results
+        if self._results is None:
+            self._results = ValidationResults(self)
+        return self._results
+
+    def new_results(self) -> ValidationResults:
+        """Start a new, empty, results table for a new validation run. The run records into it with recording()."""
+        self._results = ValidationResults(self)
+        self._focus_node_cache = {}
+        return self._results
+
+    @property
+    def focus_node_cache(self) -> Dict[Any, FrozenSet['RDFNode']]:
+        """Focus nodes found by target queries in SPARQL Remote Graph Mode, for the current validation run."""
+        return self._focus_node_cache
+
     def enable_js(self):
         self._use_js = True
 
@@ -199,6 +244,28 @@ class ShapesGraph(object):
         s is a value of a shape-expecting, non-list-taking parameter such as sh:node, or a member of a SHACL list that is a value of a shape-expecting and list-taking parameter such as sh:or.
     """
 
+    def _harvest(self) -> Dict[rdflib.URIRef, Dict[Node, List[Node]]]:
+        """
+        Read the triples of each of the HARVEST_PREDICATES from the shapes graph, in one pass over each of
+        their predicate indexes, and bucket their objects by predicate and subject.
+        Triples of other predicates are never visited, so this costs no more when the shapes graph is also a
+        large data graph.
+
+        :returns: predicate -> subject -> objects
+        :rtype: dict
+        """
+        g = self.graph
+        harvested: Dict[rdflib.URIRef, Dict[Node, List[Node]]] = {}
+        for p in HARVEST_PREDICATES:
+            bucket: Dict[Node, List[Node]] = {}
+            for s, o in g.subject_objects(p):
+                try:
+                    bucket[s].append(o)
+                except KeyError:
+                    bucket[s] = [o]
+            harvested[p] = bucket
+        return harvested
+
     def _build_node_shape_cache(self):
         """
         :returns: None
@@ -206,12 +273,13 @@ class ShapesGraph(object):
         """
         g = self.graph
         self._filtered_out_shapes = set()
+        harvested = self._harvest()
+        paths = harvested[SH_path]
         defined_node_shapes = set(g.subjects(RDF_type, SH_NodeShape))
         if self.debug:
             self.logger.debug(f"Found {len(defined_node_shapes)} SHACL Shapes defined with type sh:NodeShape.")
         for s in defined_node_shapes:
-            path_vals = list(g.objects(s, SH_path))
-            if len(path_vals) > 0:
+            if s in paths:
                 # TODO:coverage: we don't have any tests for invalid shapes
                 raise ShapeLoadError(
                     "A shape defined as a NodeShape cannot be the subject of a 'sh:path' predicate.",
@@ -228,7 +296,7 @@ class ShapesGraph(object):
                     "A shape defined as a NodeShape cannot also be defined as a PropertyShape.",
                     "https://www.w3.org/TR/shacl/#node-shapes",
                 )
-            path_vals = list(g.objects(s, SH_path))
+            path_vals = paths.get(s, [])
             if len(path_vals) < 1:
                 # TODO:coverage: we don't have any tests for invalid shapes
                 raise ShapeLoadError(
@@ -244,33 +312,23 @@ class ShapesGraph(object):
             found_prop_shapes_paths[s] = path_vals[0]
         if self.debug:
             self.logger.debug(f"Found {len(found_prop_shapes_paths)} property paths to follow.")
-        has_target_class = {s for s, o in g.subject_objects(SH_targetClass)}
-        has_target_node = {s for s, o in g.subject_objects(SH_targetNode)}
-        has_target_objects_of = {s for s, o in g.subject_objects(SH_targetObjectsOf)}
-        has_target_subjects_of = {s for s, o in g.subject_objects(SH_targetSubjectsOf)}
-        subject_shapes = set(has_target_class).union(
-            set(has_target_node).union(set(has_target_objects_of).union(set(has_target_subjects_of)))
-        )
-        # implicit shapes: their subjects must be shapes
-        subject_of_property = {s for s, o in g.subject_objects(SH_property)}
-        subject_of_node = {s for s, o in g.subject_objects(SH_node)}
-        subject_shapes = subject_shapes.union(set(subject_of_property).union(set(subject_of_node)))
+        subject_shapes = set()
+        # targets, and implicit shapes: their subjects must be shapes
+        for p in (SH_targetClass, SH_targetNode, SH_targetObjectsOf, SH_targetSubjectsOf, SH_property, SH_node):
+            subject_shapes.update(harvested[p].keys())
         if self.debug:
             self.logger.debug(f"Found {len(subject_shapes)} implied SHACL Shapes based on their properties.")
 
         # shape-expecting properties, their values must be shapes.
-        value_of_property = {o for s, o in g.subject_objects(SH_property)}
-        value_of_node = {o for s, o in g.subject_objects(SH_node)}
-        value_of_not = {o for s, o in g.subject_objects(SH_not)}
-        value_of_qvs = {o for s, o in g.subject_objects(SH_qualifiedValueShape)}
-        value_of_shape_expecting = set(value_of_property).union(
-            set(value_of_node).union(set(value_of_not).union(set(value_of_qvs)))
-        )
-
-        value_of_and = {o for s, o in g.subject_objects(SH_and)}
-        value_of_or = {o for s, o in g.subject_objects(SH_or)}
-        value_of_xone = {o for s, o in g.subject_objects(SH_xone)}
-        value_of_s_list_expecting = set(value_of_and).union(set(value_of_or).union(set(value_of_xone)))
+        value_of_shape_expecting = set()
+        for p in (SH_property, SH_node, SH_not, SH_qualifiedValueShape):
+            for objects in harvested[p].values():
+                value_of_shape_expecting.update(objects)
+
+        value_of_s_list_expecting = set()
+        for p in (SH_and, SH_or, SH_xone):
+            for objects in harvested[p].values():
+                value_of_s_list_expecting.update(objects)
 
         for lst in value_of_s_list_expecting:
             list_contents = set(g.items(lst))
@@ -292,7 +350,7 @@ class ShapesGraph(object):
         for s in subject_shapes:
             if s in defined_node_shapes or s in defined_prop_shapes:
                 continue
-            path_vals = list(g.objects(s, SH_path))
+            path_vals = paths.get(s, [])
             if len(path_vals) < 1:
                 found_node_shapes.add(s)
             elif len(path_vals) > 1:
@@ -313,7 +371,7 @@ class ShapesGraph(object):
                 or s in found_node_shapes
             ):
                 continue
-            path_vals = list(g.objects(s, SH_path))
+            path_vals = paths.get(s, [])
             if len(path_vals) < 1:
                 found_node_shapes.add(s)
             elif len(path_vals) > 1:
@@ -331,7 +389,7 @@ class ShapesGraph(object):
             if node_shape in self._node_shape_cache:
                 # TODO:coverage: we don't have any tests where a shape is loaded twice
                 raise ShapeLoadError("That shape has already been loaded!", "None")
-            s = Shape(self, node_shape, p=False, logger=self.logger)
+            s = Shape(self, node_shape, p=False, logger=self.logger, harvested=harvested)
             self._node_shape_cache[node_shape] = s
             node_shape_count += 1
         for prop_shape in defined_prop_shapes.union(found_prop_shapes):
@@ -339,7 +397,7 @@ class ShapesGraph(object):
                 # TODO:coverage: we don't have any tests where a shape is loaded twice
                 raise ShapeLoadError("That shape has already been loaded!", "None")
             prop_shape_path = found_prop_shapes_paths[prop_shape]
-            s = Shape(self, prop_shape, p=True, path=prop_shape_path, logger=self.logger)
+            s = Shape(self, prop_shape, p=True, path=prop_shape_path, logger=self.logger, harvested=harvested)
             self._node_shape_cache[prop_shape] = s
             property_shape_count += 1
         if self.debug:
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+#
+"""
+A pytest plugin with fixtures for testing the cost of validating with PySHACL.
+
+Enable it in the conftest.py at the root of a test suite, with:
+
+    pytest_plugins = ["pyshacl.testing"]
+
+The shacl_profiles fixture profiles every validation run in a test, so the test can assert on the number of data
+graph calls each shape makes. Asserting that these grow linearly with the size of the data graph catches
+accidental O(n^2) access patterns in CI, where wall-clock times are too noisy to rely on.
+
+This module needs pytest, which is not a dependency of PySHACL itself.
+"""
+
+from typing import Iterator, List
+
+import pytest
+
+from .profiling import ValidationProfile, collect_profiles
+
+
+@pytest.fixture
+def shacl_profiles() -> Iterator[List[ValidationProfile]]:
+    """
+    The ValidationProfile of each validation run made in the test, in the order the runs started.
+    Each shape and constraint record has a graph_call_histogram of its calls to the data graph, by access method.
+    """
+    with collect_profiles() as profiles:
+        yield profiles
@@ -2,30 +2,33 @@
 #
 import logging
 import sys
+from contextlib import nullcontext
 from os import getenv, path
 from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 import rdflib
-from rdflib import BNode, Literal, URIRef
+from rdflib import URIRef
 
-from .consts import (
-    RDF_type,
-    SH_conforms,
-    SH_result,
-    SH_ValidationReport,
-    env_truths,
-)
+from .consts import env_truths
 from .errors import ReportableRuntimeError
 from .extras import check_extra_installed
 from .functions import apply_functions, gather_functions, unapply_functions
-from .graph_abstraction import DataGraph, clone_oxigraph_store, has_oxigraph, ox_Store
+from .graph_abstraction import DataGraph, InstrumentedDataGraph, clone_oxigraph_store, has_oxigraph, ox_Store
+from .helper.sparql_remote_helper import (
+    DEFAULT_SPARQL_BATCH_SIZE,
+    DEFAULT_SPARQL_CONCURRENCY,
+    DEFAULT_SPARQL_PAGE_SIZE,
+)
+from .profiling import ValidationProfile, collected_profile
 from .pytypes import GraphLike, SHACLExecutor
 from .rdfutil import (
     add_baked_in,
-    clone_blank_node,
+    literal_memo,
     mix_datasets,
     mix_graphs,
+    stringify_memo,
 )
+from .report import LazyValidationReport, ValidationReport
 from .rules import apply_rules, gather_rules
 from .run_type import PySHACLRunType
 from .shapes_graph import ShapesGraph
@@ -43,6 +46,7 @@ class Validator(PySHACLRunType):
     pre_inferenced: bool
     inplace: bool
     options: Dict[str, Any]
+    profile: Optional[ValidationProfile]
 
     def __init__(
         self,
@@ -84,6 +88,26 @@ class Validator(PySHACLRunType):
         assert isinstance(shacl_graph, rdflib.Graph), "shacl_graph must be a rdflib Graph object"
         self.shacl_graph = ShapesGraph(shacl_graph, self.debug, self.logger)
 
+        for limit_option in ('max_results_per_shape', 'max_results_total'):
+            if options[limit_option] is not None and int(options[limit_option]) < 1:
+                raise ReportableRuntimeError(f"The {limit_option} option must be a positive integer.")
+        if options['sample_rate'] is not None and not (0.0 < float(options['sample_rate']) <= 1.0):
+            raise ReportableRuntimeError("The sample_rate option must be greater than 0.0 and at most 1.0.")
+        for sparql_option in ('sparql_batch_size', 'sparql_concurrency'):
+            if int(options[sparql_option]) < 1:
+                raise ReportableRuntimeError(f"The {sparql_option} option must be a positive integer.")
+        if options['sparql_page_size'] is not None and int(options['sparql_page_size']) < 1:
+            raise ReportableRuntimeError("The sparql_page_size option must be a positive integer, or None.")
+
+        profile = options['profile']
+        if profile is True:
+            profile = ValidationProfile()
+        elif profile is None:
+            profile = collected_profile()
+        elif profile is not None and profile is not False and not isinstance(profile, ValidationProfile):
+            raise ReportableRuntimeError("The profile option must be True, False, or a ValidationProfile.")
+        self.profile = profile or None
+
         if options['use_js']:
             if options['sparql_mode']:
                 raise ReportableRuntimeError("Cannot use SHACL-JS in SPARQL Remote Graph Mode.")
@@ -100,56 +124,30 @@ class Validator(PySHACLRunType):
         options_dict.setdefault('use_js', False)
         options_dict.setdefault('iterate_rules', False)
         options_dict.setdefault('abort_on_first', False)
+        options_dict.setdefault('conforms_only', False)
         options_dict.setdefault('allow_infos', False)
         options_dict.setdefault('allow_warnings', False)
         options_dict.setdefault('sparql_mode', False)
         options_dict.setdefault('max_validation_depth', 15)
         options_dict.setdefault('focus_nodes', None)
         options_dict.setdefault('use_shapes', None)
+        options_dict.setdefault('max_results_per_shape', None)
+        options_dict.setdefault('max_results_total', None)
+        options_dict.setdefault('sample_rate', None)
+        options_dict.setdefault('sparql_batch_size', DEFAULT_SPARQL_BATCH_SIZE)
+        options_dict.setdefault('sparql_page_size', DEFAULT_SPARQL_PAGE_SIZE)
+        options_dict.setdefault('sparql_concurrency', DEFAULT_SPARQL_CONCURRENCY)
+        options_dict.setdefault('profile', None)
+        options_dict.setdefault('lazy_report', False)
         if 'logger' not in options_dict:
             options_dict['logger'] = logging.getLogger(__name__)
             if options_dict['debug']:
                 options_dict['logger'].setLevel(logging.DEBUG)
 
     @classmethod
-    def create_validation_report(cls, sg, conforms: bool, results: List[Tuple]):
-        v_text = "Validation Report\nConforms: {}\n".format(str(conforms))
-        result_len = len(results)
-        if not conforms and result_len < 1:
-            raise RuntimeError("A Non-Conformant Validation Report must have at least one result.")
-        if result_len > 0:
-            v_text += "Results ({}):\n".format(str(result_len))
-        vg = rdflib.Graph(bind_namespaces='core')
-        for p, n in sg.graph.namespace_manager.namespaces():
-            vg.namespace_manager.bind(p, n)
-        vr = BNode()
-        vg.add((vr, RDF_type, SH_ValidationReport))
-        vg.add((vr, SH_conforms, Literal(conforms)))
-        cloned_nodes: Dict[Tuple[GraphLike, str], Union[BNode, URIRef]] = {}
-        text_results = sorted(results, key=lambda r: r[0])
-        for result in iter(text_results):
-            _d, _bn, _tr = result
-            v_text += _d
-        for result in iter(results):
-            _d, _bn, _tr = result
-            vg.add((vr, SH_result, _bn))
-            for tr in iter(_tr):
-                s, p, o = tr
-                if isinstance(o, tuple):
-                    source = o[0]
-                    node = o[1]
-                    if isinstance(node, Literal):
-                        o = node  # No need to clone a literal from the data graph
-                    else:
-                        _id = str(node)
-                        if (source, _id) in cloned_nodes:
-                            o = cloned_nodes[(source, _id)]
-                        elif isinstance(node, BNode):
-                            cloned_nodes[(source, _id)] = o = clone_blank_node(source, node, vg, keepid=True)
-                        else:
-                            cloned_nodes[(source, _id)] = o = URIRef(_id)
-                vg.add((s, p, o))
-        return vg, v_text
+    def create_validation_report(cls, sg: ShapesGraph, conforms: bool, results: List[int]):
+        report = ValidationReport.render(sg.results, conforms, results)
+        return report.graph, report.text
 
     @property
     def target_graph(self) -> Union[GraphLike, None]:
@@ -181,16 +179,24 @@ class Validator(PySHACLRunType):
             validator=self,
             advanced_mode=bool(self.options.get('advanced', False)),
             abort_on_first=bool(self.options.get("abort_on_first", False)),
+            conforms_only=bool(self.options.get("conforms_only", False)),
             allow_infos=bool(self.options.get("allow_infos", False)),
             allow_warnings=bool(self.options.get("allow_warnings", False)),
             iterate_rules=bool(self.options.get("iterate_rules", False)),
             sparql_mode=bool(self.options.get("sparql_mode", False)),
             max_validation_depth=self.options.get("max_validation_depth", 15),
             focus_nodes=self.options.get("focus_nodes", None),
+            max_results_per_shape=self.options.get("max_results_per_shape", None),
+            max_results_total=self.options.get("max_results_total", None),
+            sample_rate=self.options.get("sample_rate", None),
+            sparql_batch_size=int(self.options.get("sparql_batch_size", DEFAULT_SPARQL_BATCH_SIZE)),
+            sparql_page_size=self.options.get("sparql_page_size", DEFAULT_SPARQL_PAGE_SIZE),
+            sparql_concurrency=int(self.options.get("sparql_concurrency", DEFAULT_SPARQL_CONCURRENCY)),
+            profile=self.profile,
             debug=self.debug,
         )
 
-    def run(self):
+    def run(self) -> Union[ValidationReport, LazyValidationReport, Tuple[bool, None, None]]:
         datagraph: Union[DataGraph, None] = self.target_graph
         if datagraph is not None:
             self._target_graph = datagraph
@@ -306,9 +312,18 @@ class Validator(PySHACLRunType):
             on_focus_nodes: Union[Sequence[URIRef], None] = specified_focus_nodes
         else:
             on_focus_nodes = None
-        reports = []
+        results_table = self.shacl_graph.new_results()
+        results_table.conforms_only = executor.conforms_only
+        results_table.set_limits(
+            max_results_per_shape=executor.max_results_per_shape,
+            max_results_total=executor.max_results_total,
+            sample_rate=executor.sample_rate,
+        )
+        reports: List[int] = []
         non_conformant = False
-        if executor.abort_on_first and self.debug:
+        if executor.conforms_only and self.debug:
+            self.logger.debug("Conforms only mode is enabled. Will exit at the first failing constraint.")
+        elif executor.abort_on_first and self.debug:
             self.logger.debug(
                 "Abort on first error is enabled. Will exit at end of first Shape that fails validation."
             )
@@ -327,19 +342,33 @@ class Validator(PySHACLRunType):
                 if executor.sparql_mode:
                     self.logger.warning("Skipping SHACL Rules because operating in SPARQL Remote Graph Mode.")
                 else:
-                    apply_rules(executor, advanced['rules'], g, focus_nodes=on_focus_nodes)
+                    with results_table.recording():
+                        apply_rules(executor, advanced['rules'], g, focus_nodes=on_focus_nodes)
+        profile = executor.profile
+        target: Union[DataGraph, InstrumentedDataGraph] = g
+        if profile is not None:
+            # Count the data graph calls made by each shape and constraint
+            target = InstrumentedDataGraph(g, profile.count_call)
         try:
-            for s in shapes:
-                _is_conform, _reports = s.validate(executor, g, focus=on_focus_nodes)
-                non_conformant = non_conformant or (not _is_conform)
-                reports.extend(_reports)
-                if executor.abort_on_first and non_conformant:
-                    break
+            # The results are recorded into the table of this run. Node strings and literal values are memoized
+            # for this run only, the graphs may have changed since the last run
+            run_context = profile.run() if profile is not None else nullcontext()
+            with run_context, results_table.recording(), stringify_memo(results_table.stringify_memo), literal_memo():
+                for s in shapes:
+                    _is_conform, _reports = s.validate(executor, target, focus=on_focus_nodes)
+                    non_conformant = non_conformant or (not _is_conform)
+                    reports.extend(_reports)
+                    if (executor.abort_on_first or executor.conforms_only) and non_conformant:
+                        break
         finally:
             if advanced and advanced['functions']:
                 unapply_functions(advanced['functions'], g)
-        v_report, v_text = self.create_validation_report(self.shacl_graph, not non_conformant, reports)
-        return (not non_conformant), v_report, v_text
+        if executor.conforms_only:
+            # The results are incomplete in this mode, so no Validation Report is made.
+            return (not non_conformant), None, None
+        if self.options.get('lazy_report', False):
+            return LazyValidationReport(results_table, not non_conformant, reports, profile=profile)
+        return ValidationReport.render(results_table, not non_conformant, reports, profile=profile)
 
 
 def assign_baked_in():
@@ -0,0 +1,40 @@
+import json
+import subprocess
+import sys
+from os import path
+
+benchmark_py = path.abspath(path.join(path.dirname(__file__), "..", "benchmarks", "benchmark.py"))
+
+
+def test_benchmark_harness_smoke(tmp_path):
+    out = tmp_path / "bench.json"
+    args = ["--sizes", "60", "--repeat", "1", "--backends", "rdflib", "--json", str(out)]
+    res = subprocess.run([sys.executable, benchmark_py] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert res.returncode == 0, res.stderr.decode("utf-8")
+    dumped = json.loads(out.read_text())
+    assert dumped["environment"]["pyshacl"]
+    results = {r["scenario"]: r for r in dumped["results"]}
+    assert "inference-both" in results
+    for name in (
+        "value_type",
+        "cardinality",
+        "string",
+        "property_pair",
+        "shape_based",
+        "deep_node",
+        "sparql",
+        "rules",
+    ):
+        r = results[name]
+        assert r["size"] == 60 and r["triples"] > 60 * 20
+        # The synthetic data breaks every scenario somewhere
+        assert r["conforms"] is False and r["results"] > 0
+        assert r["peak_memory"] > 0
+    res = subprocess.run(
+        [sys.executable, benchmark_py, "--sizes", "60", "--repeat", "1", "--backends", "rdflib", "--no-memory"]
+        + ["--scenarios", "value_type", "--compare", str(out)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    assert res.returncode == 0, res.stderr.decode("utf-8")
+    assert "value_type/rdflib/60" in res.stdout.decode("utf-8").split("Compared to")[1]
@@ -0,0 +1,53 @@
+from rdflib import Graph, Literal, URIRef
+
+from pyshacl import validate
+from pyshacl.consts import SH
+
+EX = "http://example.org/"
+WIDTH = 250
+
+shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix ex: <http://example.org/> .
+
+ex:WideShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Wide ;
+  sh:closed true ;
+  sh:ignoredProperties ( rdf:type ) ;
+{}
+.
+""".format(" ;\n".join(f"  sh:property [ sh:path ex:p{i} ]" for i in range(WIDTH)))
+
+
+def _data() -> Graph:
+    g = Graph()
+    rdf_type = URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")
+    for n in range(3):
+        node = URIRef(f"{EX}w{n}")
+        g.add((node, rdf_type, URIRef(f"{EX}Wide")))
+        for i in range(WIDTH):
+            g.add((node, URIRef(f"{EX}p{i}"), Literal(i)))
+    # Only ex:w1 has predicates that are not allowed
+    g.add((URIRef(f"{EX}w1"), URIRef(f"{EX}extra"), Literal("a")))
+    g.add((URIRef(f"{EX}w1"), URIRef(f"{EX}extra"), Literal("b")))
+    g.add((URIRef(f"{EX}w1"), URIRef(f"{EX}other"), URIRef(f"{EX}w0")))
+    return g
+
+
+def test_closed_shape_over_wide_entities():
+    shapes = Graph().parse(data=shapes_ttl, format="turtle")
+    data = _data()
+    report = validate(data, shacl_graph=shapes)
+    assert report.conforms is False
+    results = list(report.graph.subjects(SH.sourceConstraintComponent, SH.ClosedConstraintComponent))
+    assert len(results) == 3
+    assert {report.graph.value(r, SH.focusNode) for r in results} == {URIRef(f"{EX}w1")}
+    assert sorted(
+        (str(report.graph.value(r, SH.resultPath)), str(report.graph.value(r, SH.value))) for r in results
+    ) == [
+        (f"{EX}extra", "a"),
+        (f"{EX}extra", "b"),
+        (f"{EX}other", f"{EX}w0"),
+    ]
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 #
+import json
 import os
 import platform
 import subprocess
@@ -210,3 +211,17 @@ if __name__ == "__main__":
     test_cmdline_table()
     test_cmdline_web()
     test_cmdline_jsonld()
+
+
+def test_cmdline_profile(tmp_path):
+    graph_file = path.join(cmdline_files_dir, 'd1.ttl')
+    shacl_file = path.join(cmdline_files_dir, 's1.ttl')
+    json_file = path.join(str(tmp_path), 'profile.json')
+    args = [graph_file, '-s', shacl_file, '--profile', '--profile-json', json_file]
+    res = subprocess.run(pyshacl_command + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=ENV_VARS)
+    # Without RDFS inferencing this data graph does not conform
+    assert res.returncode == 1
+    assert "Top 10 shapes by time:" in res.stderr.decode('utf-8')
+    with open(json_file) as f:
+        profile = json.load(f)
+    assert "exShape:HumanShape" in [s["shape"] for s in profile["shapes"]]
@@ -584,6 +584,50 @@ def test_sparql_message_subst():
     assert not conforms
 
 
+def test_sparql_duplicate_results():
+    # The queries are not DISTINCT, and the join on ?other repeats each solution once per resource
+    df = '''@prefix ex: <http://datashapes.org/sh/tests/#> .
+    @prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+    @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+    @prefix sh: <http://www.w3.org/ns/shacl#> .
+    @prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+
+    ex:R1 rdf:type rdfs:Resource ; rdfs:label "Label 1", "Label 2" .
+    ex:R2 rdf:type rdfs:Resource ; rdfs:label "Label 3" .
+    ex:R3 rdf:type rdfs:Resource .
+
+    ex:NoLabelConstraintComponent
+      a sh:ConstraintComponent ;
+      sh:parameter [ sh:path ex:noLabel ] ;
+      sh:nodeValidator [
+        a sh:SPARQLSelectValidator ;
+        sh:select """
+          SELECT $this ?label WHERE {
+            $this <http://www.w3.org/2000/01/rdf-schema#label> ?label .
+            ?other a <http://www.w3.org/2000/01/rdf-schema#Resource> .
+          }""" ;
+      ] .
+
+    ex:TestShape
+      rdf:type sh:NodeShape ;
+      sh:targetClass rdfs:Resource ;
+      ex:noLabel true ;
+      sh:sparql [
+        sh:select """
+          SELECT $this ?value WHERE {
+            $this <http://www.w3.org/2000/01/rdf-schema#label> ?value .
+            ?other a <http://www.w3.org/2000/01/rdf-schema#Resource> .
+          }""" ;
+      ] .
+    '''
+    conforms, graph, s = validate(df, data_graph_format='turtle', advanced=True)
+    assert not conforms
+    # One result per label from the SPARQL constraint, and one per labelled focus node from the component
+    assert "Results (5):" in s
+    assert s.count("Value Node: Literal(\"Label 1\")") == 1
+    assert s.count("NoLabelConstraintComponent") == 2
+
+
 if __name__ == "__main__":
     test_validate_with_ontology()
     test_validate_with_ontology_fail1()
@@ -598,3 +642,4 @@ if __name__ == "__main__":
     test_owl_imports()
     test_owl_imports_fail()
     test_sparql_message_subst()
+    test_sparql_duplicate_results()
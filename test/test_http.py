@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import SH, XSD
+
+pytest.importorskip("sanic")
+pytest.importorskip("sanic_ext")
+pytest.importorskip("sanic_testing")
+
+from pyshacl import validate  # noqa: E402
+from pyshacl.sh_http import app_factory, nt_row  # noqa: E402
+
+data_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:PersonShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Person ;
+  sh:property [ sh:path ex:name ; sh:datatype xsd:string ; sh:minCount 1 ] ;
+.
+
+ex:Person1 a ex:Person .
+ex:Person2 a ex:Person ; ex:name 2 .
+ex:Person3 a ex:Person ; ex:name "Three" .
+"""
+
+
+@pytest.fixture(scope="module")
+def app():
+    return app_factory()
+
+
+def test_raw_turtle_body(app):
+    _, response = app.test_client.post(
+        "/validate?allow_warnings=true",
+        content=data_ttl.encode("utf-8"),
+        headers={"Content-Type": "text/turtle", "Accept": "application/json"},
+    )
+    assert response.status == 200
+    body = json.loads(response.body)
+    assert body["conforms"] is False
+    assert body["validation_failures"] == []
+    assert "Results (2):" in body["validation_report"]
+
+
+def test_raw_body_shapes_graph_must_be_a_url(app):
+    _, response = app.test_client.post(
+        "/validate?shapes_graph=/etc/passwd",
+        content=data_ttl.encode("utf-8"),
+        headers={"Content-Type": "text/turtle", "Accept": "application/json"},
+    )
+    assert response.status == 400
+
+
+def test_streamed_ntriples_response(app):
+    _, response = app.test_client.post(
+        "/validate",
+        content=json.dumps({"data_graph": data_ttl, "data_graph_format": "turtle"}).encode("utf-8"),
+        headers={"Content-Type": "application/json", "Accept": "application/n-triples"},
+    )
+    assert response.status == 200
+    assert response.headers["content-type"].startswith("application/n-triples")
+    streamed = Graph().parse(data=response.body.decode("utf-8"), format="nt")
+    _, report_graph, _ = validate(data_ttl, data_graph_format="turtle")
+    assert len(streamed) == len(report_graph)
+    assert len(set(streamed.subjects(SH.focusNode, None))) == 2
+
+
+def test_nt_row_matches_rdflib_serializer():
+    g = Graph()
+    s = URIRef("http://example.org/s")
+    p = URIRef("http://example.org/p")
+    for o in (
+        Literal('a "quoted"\nline\r\\'),
+        Literal("chat", lang="fr"),
+        Literal("2", datatype=XSD.integer),
+        URIRef("http://example.org/o"),
+    ):
+        g.add((s, p, o))
+    rows = sorted(nt_row(t) for t in g)
+    assert "".join(rows) == "".join(sorted(g.serialize(format="nt").splitlines(keepends=True)))
@@ -0,0 +1,102 @@
+import pytest
+from rdflib import XSD, Literal
+
+from pyshacl import validate
+from pyshacl.rdfutil import is_lexically_valid, literal, literal_memo, literal_value
+
+
+@pytest.mark.parametrize(
+    "lexical, datatype, valid",
+    [
+        ("2020", XSD.gYear, True),
+        (" 2020Z ", XSD.gYear, True),
+        ("20", XSD.gYear, False),
+        ("2020-12", XSD.gYearMonth, True),
+        ("2020-13", XSD.gYearMonth, False),
+        ("--02-29", XSD.gMonthDay, True),
+        ("--02-30", XSD.gMonthDay, False),
+        ("--04-31", XSD.gMonthDay, False),
+        ("---31", XSD.gDay, True),
+        ("--12+14:00", XSD.gMonth, True),
+        ("--12+14:30", XSD.gMonth, False),
+        ("2020-01-01T00:00:00-05:00", XSD.dateTimeStamp, True),
+        ("2020-01-01T00:00:00", XSD.dateTimeStamp, False),
+        ("en-US", XSD.language, True),
+        ("not a language", XSD.language, False),
+        ("a:b", XSD.Name, True),
+        ("a:b", XSD.NCName, False),
+        ("1a", XSD.NCName, False),
+        ("1a", XSD.NMTOKEN, True),
+        ("é-1", XSD.ID, True),
+        ("a b", XSD.anyURI, True),
+    ],
+)
+def test_lexical_validators(lexical, datatype, valid):
+    assert is_lexically_valid(lexical, datatype) is valid
+
+
+def test_literal_value_ill_typed():
+    assert literal_value(Literal(5)) == (5, False)
+    assert literal_value(Literal("x", lang="en")) == ("x", False)
+    # Ill-typed to RDFLib, or to the lexical validators
+    assert literal_value(Literal("300", datatype=XSD.byte)) == (300, True)
+    assert literal_value(Literal("20", datatype=XSD.gYear))[1] is True
+    assert literal_value(Literal("not a language", datatype=XSD.language))[1] is True
+
+
+def test_lexical_checks_are_memoized():
+    assert is_lexically_valid.cache_info().maxsize == literal.LITERAL_CACHE_MAX
+    is_lexically_valid.cache_clear()
+    for _ in range(2):
+        for year in range(2020, 2025):
+            assert literal_value(Literal(str(year), datatype=XSD.gYear))[1] is False
+    info = is_lexically_valid.cache_info()
+    assert (info.misses, info.hits) == (5, 5)
+    # Only the datatypes with a lexical validator are checked
+    assert literal_value(Literal(7)) == (7, False)
+    assert literal_value(Literal("x", lang="en")) == ("x", False)
+    assert is_lexically_valid.cache_info().currsize == 5
+
+
+def test_literal_values_are_memoized_per_run():
+    with literal_memo() as memo:
+        for _ in range(2):
+            assert literal_value(Literal("20", datatype=XSD.gYear))[1] is True
+            assert literal_value(Literal("7", datatype=XSD.byte)) == (7, False)
+            assert literal_value(Literal("x", lang="en")) == ("x", False)
+        assert memo == {("20", XSD.gYear): (None, True), ("7", XSD.byte): (7, False)}
+    assert literal_value(Literal("21", datatype=XSD.gYear))[1] is True
+    assert len(memo) == 2
+    # A validation run has a memo of its own
+    validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", shacl_graph_format="turtle")
+    assert literal._literal_memo.get() is None
+
+
+shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:ThingShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Thing ;
+  sh:property [ sh:path ex:year ; sh:datatype xsd:gYear ] ;
+  sh:property [ sh:path ex:level ; sh:minInclusive 0 ] ;
+.
+"""
+
+data_ttl = """\
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:t1 a ex:Thing ; ex:year "2020"^^xsd:gYear ; ex:level "7"^^xsd:byte .
+ex:t2 a ex:Thing ; ex:year "20"^^xsd:gYear ; ex:level "300"^^xsd:byte .
+"""
+
+
+def test_ill_typed_literals_fail_datatype_and_range():
+    conforms, _, text = validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle")
+    assert conforms is False
+    assert text.count("Constraint Violation") == 2
+    assert "DatatypeConstraintComponent" in text and "MinInclusiveConstraintComponent" in text
+    assert '"20"' in text and '"300"' in text
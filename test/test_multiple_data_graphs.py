@@ -57,3 +57,34 @@ def test_validate_each_multiple_graphs_via_mode():
     assert len(results) == 2
     assert results[0][0] is True
     assert results[1][0] is False
+
+
+def test_validate_combine_loads_in_process_pool(tmp_path):
+    data_files = []
+    for i in range(6):
+        data_file = tmp_path / "data{}.ttl".format(i)
+        data_file.write_text(DATA_GRAPH_OK.replace("node1", "node1_{}".format(i)))
+        data_files.append(str(data_file))
+    data_graphs = data_files + [DATA_GRAPH_BAD]
+    sequential = pyshacl.validate(data_graphs, shacl_graph=SHAPES_TTL, load_workers=0)
+    with open(data_files[0], 'rb') as open_file:
+        parallel = pyshacl.validate([open_file] + data_graphs[1:], shacl_graph=SHAPES_TTL, load_workers=2)
+    assert sequential[0] is False
+    assert parallel[0] is False
+    assert parallel[2] == sequential[2]
+
+
+def test_load_sources_merges_in_order(tmp_path):
+    from rdflib import Dataset, URIRef
+
+    from pyshacl.rdfutil import load_sources
+
+    data_files = []
+    for i in range(4):
+        data_file = tmp_path / "data{}.ttl".format(i)
+        data_file.write_text(DATA_GRAPH_OK.replace("node1", "node1_{}".format(i)))
+        data_files.append(str(data_file))
+    ds = load_sources(data_files, Dataset(default_union=True), max_workers=2)
+    assert len(ds) == 8
+    assert (URIRef("http://example.com/node1_3"), None, None) in ds
+    assert str(ds.default_graph.base) == (tmp_path / "data3.ttl").as_uri()
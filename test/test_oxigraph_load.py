@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""\
+Tests for parsing data graphs with Oxigraph's own parsers, straight into an Oxigraph Store.
+"""
+
+from os import path
+
+import pytest
+
+import pyshacl
+from pyshacl.graph_abstraction import has_oxigraph
+from pyshacl.rdfutil import load_from_source
+
+pytestmark = pytest.mark.skipif(not has_oxigraph, reason="pyoxigraph is not installed")
+
+here_dir = path.abspath(path.dirname(__file__))
+cmdline_files_dir = path.join(here_dir, "resources", "cmdline_tests")
+data_file = path.join(cmdline_files_dir, "d1.ttl")
+shacl_file = path.join(cmdline_files_dir, "s1.ttl")
+
+NQUADS = b"""\
+<http://example.com/a> <http://example.com/p> "1" <http://example.com/g1> .
+<http://example.com/b> <http://example.com/p> "2" .
+"""
+
+
+def test_load_from_source_into_oxigraph():
+    from pyoxigraph import NamedNode, Store
+
+    store = load_from_source(data_file, use_oxigraph=True)
+    assert isinstance(store, Store)
+    assert len(store) == len(load_from_source(data_file))
+    store = load_from_source(NQUADS, rdf_format="nquads", use_oxigraph=True)
+    assert isinstance(store, Store)
+    assert list(store.named_graphs()) == [NamedNode("http://example.com/g1")]
+    # Loading into a given Store
+    with open(data_file, 'rb') as f:
+        load_from_source(f, g=store)
+    assert len(store) == 2 + len(load_from_source(data_file))
+
+
+def test_load_from_source_oxigraph_falls_back_to_rdflib():
+    # hext is not an Oxigraph format, so rdflib loads it
+    g = load_from_source(
+        '["http://example.com/a", "http://example.com/p", "1", "http://www.w3.org/2001/XMLSchema#string", "", ""]\n',
+        rdf_format="hext",
+        use_oxigraph=True,
+    )
+    assert not hasattr(g, "bulk_load")
+    assert len(g) == 1
+
+
+def test_validate_with_oxigraph_parsing():
+    expected = pyshacl.validate(data_file, shacl_graph=shacl_file)
+    conforms, _, text = pyshacl.validate(data_file, shacl_graph=shacl_file, use_oxigraph=True)
+    assert conforms is False
+    assert conforms == expected[0]
+    assert "Results (1):" in text
+    conforms, _, _ = pyshacl.validate([data_file, data_file], shacl_graph=shacl_file, use_oxigraph=True)
+    assert conforms is False
+
+
+def test_load_into_oxigraph_store_from_rdflib():
+    from pyoxigraph import NamedNode, Store
+
+    store = Store()
+    # Oxigraph cannot parse an rdflib Graph or Dataset, or a hext source, so they are loaded by rdflib
+    load_from_source(load_from_source(data_file), g=store)
+    assert len(store) == len(load_from_source(data_file))
+    load_from_source(load_from_source(NQUADS, rdf_format="nquads", multigraph=True), g=store)
+    assert list(store.named_graphs()) == [NamedNode("http://example.com/g1")]
+    load_from_source(
+        '["http://example.com/c", "http://example.com/p", "3", "http://www.w3.org/2001/XMLSchema#string", "", ""]\n',
+        g=store,
+        rdf_format="hext",
+    )
+    assert len(store) == len(load_from_source(data_file)) + 3
+
+
+def test_validate_combined_rdflib_graphs_with_oxigraph():
+    data_graph = load_from_source(data_file)
+    conforms, _, text = pyshacl.validate([data_graph, data_file], shacl_graph=shacl_file, use_oxigraph=True)
+    assert conforms is False
+    assert "Results (1):" in text
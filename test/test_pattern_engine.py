@@ -0,0 +1,126 @@
+import pytest
+from rdflib import Graph, URIRef
+
+from pyshacl import validate
+from pyshacl.constraints.core.string_based_constraints import PatternConstraintComponent
+from pyshacl.helper import regex_helper
+from pyshacl.helper.regex_helper import compile_pattern, compile_pattern_set, pattern_flags, set_regex_engine
+from pyshacl.shapes_graph import ShapesGraph
+
+shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix ex: <http://example.org/> .
+
+ex:NameShape
+  a sh:PropertyShape ;
+  sh:targetClass ex:Thing ;
+  sh:path ex:name ;
+  sh:pattern "^[a-z]" , "[0-9]$" , "(.)\\\\1" ;
+  sh:flags "i" ;
+.
+
+ex:CodeShape
+  a sh:PropertyShape ;
+  sh:targetClass ex:Thing ;
+  sh:path ex:code ;
+  sh:pattern "^(a+)+$" , "a$" ;
+.
+"""
+
+data_ttl = """\
+@prefix ex: <http://example.org/> .
+
+ex:t1 a ex:Thing ; ex:name "Aa1", "b2", "Cc", "9xx9", "ok" ; ex:code "aaaa", "aaab" .
+ex:t2 a ex:Thing ; ex:name [ ex:x 1 ] , ex:iri11 .
+"""
+
+
+@pytest.fixture
+def regex_engine():
+    engine = regex_helper.get_regex_engine()
+    yield set_regex_engine
+    set_regex_engine(engine)
+
+
+def _report():
+    return validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle")
+
+
+def test_regex_engines_give_the_same_results(regex_engine):
+    pytest.importorskip("re2")
+    regex_engine("re")
+    with_re = _report()
+    regex_engine("re2")
+    with_re2 = _report()
+    # The two sh:pattern of ex:CodeShape are matched as an RE2 Set
+    assert compile_pattern_set(("^(a+)+$", "a$"), 0) is not None
+    assert with_re.conforms is False
+    assert len(with_re.rows) == 10
+    assert with_re2.text == with_re.text
+
+
+def test_compiled_patterns_are_shared(regex_engine):
+    regex_engine("re")
+    flags = pattern_flags("mi")
+    assert compile_pattern("^[a-z]+$", flags) is compile_pattern("^[a-z]+$", flags)
+    assert compile_pattern("^[a-z]+$", flags) is not compile_pattern("^[a-z]+$", 0)
+    assert compile_pattern("^[a-z]+$", flags).search("12\nAbc")
+    # There are no pattern sets without RE2
+    assert compile_pattern_set(("a", "b"), 0) is None
+
+
+def test_re2_pattern_sets_and_fallback(regex_engine):
+    re2 = pytest.importorskip("re2")
+    regex_engine("re2")
+    assert isinstance(compile_pattern("^a+$", 0), re2._Regexp)
+    # RE2 has no backreferences, so that pattern is compiled with re
+    assert compile_pattern("(.)\\1", 0).search("xyyz")
+    assert compile_pattern_set(("a", "(.)\\1"), 0) is None
+    matched = compile_pattern_set(("^a", "b", "c$"), pattern_flags("i"))
+    assert matched("Abc") == {0, 1, 2}
+    assert matched("xbz") == {1}
+    assert matched("xyz") == frozenset()
+
+
+unicode_shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix ex: <http://example.org/> .
+
+ex:UnicodeShape
+  a sh:NodeShape ;
+  sh:targetNode ex:u ;
+  sh:property [ sh:path ex:p ; sh:pattern "^\\\\d+$" ] ;
+  sh:property [ sh:path ex:q ; sh:pattern "^\\\\w+$" ] ;
+.
+"""
+
+unicode_data_ttl = """\
+@prefix ex: <http://example.org/> .
+
+ex:u ex:p "\u0663\u0664" ; ex:q "caf\u00e9" .
+"""
+
+
+def test_re_is_the_default_engine():
+    assert regex_helper.get_regex_engine() == "re"
+    # Unicode digits and word characters match \d and \w with re, but not with RE2
+    report = validate(unicode_data_ttl, shacl_graph=unicode_shapes_ttl, data_graph_format="turtle")
+    assert report.conforms is True
+
+
+def test_shapes_follow_the_regex_engine(regex_engine):
+    pytest.importorskip("re2")
+    regex_engine("re")
+    sg = ShapesGraph(Graph().parse(data=shapes_ttl, format="turtle"))
+    (shape,) = sg.shapes_from_uris([URIRef("http://example.org/CodeShape")])
+    with_re = shape.value_checks_of(PatternConstraintComponent(shape))
+    assert shape.value_checks_of(PatternConstraintComponent(shape)) is with_re
+    regex_engine("re2")
+    assert shape.value_checks_of(PatternConstraintComponent(shape)) is not with_re
+    regex_engine("re")
+    assert shape.value_checks_of(PatternConstraintComponent(shape)) is with_re
+
+
+def test_unknown_regex_engine():
+    with pytest.raises(ValueError):
+        set_regex_engine("hyperscan")
@@ -0,0 +1,184 @@
+import json
+
+import pytest
+from rdflib import Graph, URIRef
+
+from pyshacl import validate
+from pyshacl.errors import ReportableRuntimeError
+from pyshacl.graph_abstraction import DataGraph, GraphCallStats, InstrumentedDataGraph, data_graph_scope
+from pyshacl.profiling import ConstraintProfile, ShapeProfile, ValidationProfile
+
+shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:PersonShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Person ;
+  sh:property ex:NameShape ;
+  sh:property [ sh:path ex:knows ; sh:class ex:Person ] ;
+.
+
+ex:NameShape
+  a sh:PropertyShape ;
+  sh:path ex:name ;
+  sh:datatype xsd:string ;
+  sh:minCount 1 ;
+.
+"""
+
+data_ttl = """\
+@prefix ex: <http://example.org/> .
+
+ex:p1 a ex:Person ; ex:name "One" ; ex:knows ex:p2 .
+ex:p2 a ex:Person ; ex:name 2 ; ex:knows ex:p3 .
+ex:p3 a ex:Person ; ex:knows ex:nobody .
+"""
+
+
+def test_profile_counts_shapes_and_constraints():
+    report = validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", profile=True)
+    assert report.conforms is False
+    profile = report.profile
+    assert isinstance(profile, ValidationProfile)
+    assert profile.time > 0.0
+    by_name = {s.name: s for s in profile.shapes}
+    person = by_name["ex:PersonShape"]
+    assert person.runs == 1
+    assert person.focus_count == 3
+    assert person.value_count == 3
+    assert person.result_count == len(report.rows) == 3
+    # Finding the focus nodes of sh:targetClass looks at the data graph
+    assert person.graph_calls > 0
+    assert set(person.constraints) == {"PropertyConstraintComponent"}
+    name = by_name["ex:NameShape"]
+    assert name.focus_count == 3
+    assert name.value_count == 2
+    assert {c: r.result_count for c, r in name.constraints.items()} == {
+        "DatatypeConstraintComponent": 1,
+        "MinCountConstraintComponent": 1,
+    }
+    datatype = name.constraints["DatatypeConstraintComponent"]
+    assert datatype.focus_count == 3
+    assert datatype.value_count == 2
+    # Checking a datatype never looks at the data graph, but checking a class does
+    assert datatype.graph_calls == 0
+    classes = [c for c in profile.constraints if c.component == "ClassConstraintComponent"]
+    assert len(classes) == 1 and classes[0].graph_calls > 0
+    assert classes[0].result_count == 1
+
+
+def test_profile_top_and_json():
+    report = validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", profile=True)
+    profile = report.profile
+    top = profile.top(2, key="result_count")
+    assert len(top) == 2
+    assert all(isinstance(s, ShapeProfile) for s in top)
+    assert top[0].result_count >= top[1].result_count
+    top_constraints = profile.top(None, key="time", constraints=True)
+    assert all(isinstance(c, ConstraintProfile) for c in top_constraints)
+    assert len(top_constraints) == len(profile.constraints) == 4
+    assert [c.time for c in top_constraints] == sorted((c.time for c in top_constraints), reverse=True)
+    with pytest.raises(ValueError):
+        profile.top(key="color")
+    dumped = json.loads(profile.to_json())
+    assert len(dumped["shapes"]) == len(profile.shapes)
+    assert dumped["shapes"][0]["time"] == max(s.time for s in profile.shapes)
+    assert {c["component"] for s in dumped["shapes"] for c in s["constraints"]} >= {"MinCountConstraintComponent"}
+    summary = profile.summary(n=3)
+    assert summary.startswith("Validation Profile: ")
+    assert "Top 3 constraints by time:" in summary
+    assert "on ex:NameShape" in summary
+
+
+def test_profile_given_instance_and_conforms_only():
+    profile = ValidationProfile()
+    res = validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", conforms_only=True, profile=profile)
+    assert res == (False, None, None)
+    assert len(profile.shapes) > 0
+    report = validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle")
+    assert report.profile is None
+    with pytest.raises(ReportableRuntimeError):
+        validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", profile="yes")
+
+
+def test_profile_sparql_mode_counts_queries():
+    report = validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", sparql_mode=True, profile=True)
+    by_name = {s.name: s for s in report.profile.shapes}
+    # Focus nodes and value nodes are found with SPARQL queries in this mode
+    assert by_name["ex:PersonShape"].sparql_queries > 0
+    assert by_name["ex:NameShape"].sparql_queries > 0
+
+
+def test_instrumented_data_graph():
+    g = DataGraph.from_rdflib_graph(Graph().parse(data=data_ttl, format="turtle"))
+    calls = []
+    wrapped = InstrumentedDataGraph(g, lambda scope, method, elapsed: calls.append((scope, method)))
+    assert isinstance(wrapped, Graph)
+    p1 = URIRef("http://example.org/p1")
+    assert len(list(wrapped.objects(p1, None))) == 3
+    assert (p1, None, None) in wrapped
+    token = data_graph_scope.set("a scope")
+    try:
+        assert len(wrapped.query("SELECT ?s WHERE { ?s ?p ?o }")) == len(g)
+        # A generator that is never exhausted is reported once it is discarded
+        next(wrapped.subjects(None, None))
+    finally:
+        data_graph_scope.reset(token)
+    assert len(wrapped) == len(g)
+    assert wrapped.namespace_manager is g.namespace_manager
+    assert calls == [(None, "objects"), (None, "__contains__"), ("a scope", "query"), ("a scope", "subjects")]
+
+
+def test_instrumented_data_graph_stats():
+    g = DataGraph.from_rdflib_graph(Graph().parse(data=data_ttl, format="turtle"))
+    wrapped = InstrumentedDataGraph(g)
+    stats = wrapped.stats
+    assert isinstance(stats, GraphCallStats)
+    for p in ("p1", "p2", "p3"):
+        list(wrapped.objects(URIRef("http://example.org/" + p), None))
+    token = data_graph_scope.set("shape")
+    try:
+        list(wrapped.triples((None, None, None)))
+    finally:
+        data_graph_scope.reset(token)
+    assert stats.histogram() == {"objects": 3, "triples": 1}
+    assert stats.histogram(None) == {"objects": 3}
+    assert stats.histogram("shape") == {"triples": 1}
+    assert stats.total_calls() == 4
+    assert set(stats.scopes) == {None, "shape"}
+    assert stats.total_time("shape") > 0.0
+    assert set(stats.time_histogram()) == {"objects", "triples"}
+
+
+def test_profile_graph_call_histogram(shacl_profiles):
+    validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle")
+    validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", profile=False)
+    assert len(shacl_profiles) == 1
+    person = shacl_profiles[0].shape_named("ex:PersonShape")
+    assert sum(person.graph_call_histogram.values()) == person.graph_calls + person.sparql_queries
+    assert person.graph_time > 0.0
+    classes = [c for c in shacl_profiles[0].constraints if c.component == "ClassConstraintComponent"]
+    assert sum(classes[0].graph_call_histogram.values()) == classes[0].graph_calls > 0
+    with pytest.raises(KeyError):
+        shacl_profiles[0].shape_named("ex:NoShape")
+    dumped = shacl_profiles[0].to_dict()
+    assert "graph_call_histogram" in dumped["shapes"][0]
+
+
+def _chain_graph(n):
+    ttl = "@prefix ex: <http://example.org/> .\n"
+    ttl += "\n".join(f'ex:p{i} a ex:Person ; ex:name "{i}" ; ex:knows ex:p{(i + 1) % n} .' for i in range(n))
+    return ttl
+
+
+def test_graph_calls_grow_linearly(shacl_profiles):
+    # The number of data graph calls per shape must grow no faster than the number of focus nodes
+    validate(_chain_graph(20), shacl_graph=shapes_ttl, data_graph_format="turtle")
+    validate(_chain_graph(200), shacl_graph=shapes_ttl, data_graph_format="turtle")
+    small, large = shacl_profiles
+    for name in ("ex:PersonShape", "ex:NameShape"):
+        small_calls = small.shape_named(name).graph_calls
+        large_calls = large.shape_named(name).graph_calls
+        assert large_calls <= small_calls * 10 * 1.5
@@ -0,0 +1,92 @@
+from rdflib import XSD, Graph, Literal, URIRef
+
+from pyshacl import validate
+from pyshacl.consts import SH
+from pyshacl.helper import path_helper
+from pyshacl.helper.path_helper import objects_of_each
+
+EX = "http://example.org/"
+COUNT = 100
+
+shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix ex: <http://example.org/> .
+
+ex:RangeShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Range ;
+  sh:property [ sh:path ex:low ; sh:lessThan ex:high ] ;
+  sh:property [ sh:path ex:low ; sh:lessThanOrEquals ex:high ] ;
+  sh:property [ sh:path ex:alias ; sh:equals ex:name ] ;
+  sh:property [ sh:path ex:name ; sh:disjoint ex:nick ] ;
+.
+"""
+
+
+def _ex(name: str) -> URIRef:
+    return URIRef(EX + name)
+
+
+def _data() -> Graph:
+    g = Graph()
+    rdf_type = URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")
+    for i in range(COUNT):
+        node = _ex(f"r{i}")
+        g.add((node, rdf_type, _ex("Range")))
+        g.add((node, _ex("low"), Literal(i)))
+        g.add((node, _ex("low"), Literal(i - 0.5)))
+        if i % 10 == 3:
+            high = Literal(i)
+        elif i % 10 == 7:
+            high = Literal(i - 1)
+        else:
+            high = Literal(i + 1)
+        g.add((node, _ex("high"), high))
+        g.add((node, _ex("high"), Literal(i + 2.5)))
+        if i % 20 == 9:
+            # A string is not comparable with a number
+            g.add((node, _ex("low"), Literal("x")))
+        g.add((node, _ex("name"), Literal(f"n{i}")))
+        g.add((node, _ex("alias"), Literal(f"a{i}" if i % 10 == 5 else f"n{i}")))
+        g.add((node, _ex("nick"), Literal(f"n{i}" if i % 25 == 0 else f"k{i}")))
+    days = [Literal(f"2020-01-0{d}", datatype=XSD.date) for d in (1, 2)]
+    for n, (low, high) in enumerate(((days[0], days[1]), (days[1], days[0]), (days[0], days[0]))):
+        node = _ex(f"d{n}")
+        g.add((node, rdf_type, _ex("Range")))
+        g.add((node, _ex("low"), low))
+        g.add((node, _ex("high"), high))
+    return g
+
+
+def test_property_pairs_over_many_focus_nodes():
+    report = validate(_data(), shacl_graph=shapes_ttl, shacl_graph_format="turtle")
+    assert report.conforms is False
+    counts = {}
+    for component in report.graph.objects(None, SH.sourceConstraintComponent):
+        counts[component] = counts.get(component, 0) + 1
+    assert counts == {
+        SH.LessThanConstraintComponent: 42,
+        SH.LessThanOrEqualsConstraintComponent: 31,
+        SH.EqualsConstraintComponent: 20,
+        SH.DisjointConstraintComponent: 4,
+    }
+    ltoe_focus = {
+        str(report.graph.value(r, SH.focusNode))[len(EX) :]
+        for r in report.graph.subjects(SH.sourceConstraintComponent, SH.LessThanOrEqualsConstraintComponent)
+    }
+    assert ltoe_focus == {"d1"} | {f"r{i}" for i in range(COUNT) if i % 10 == 7 or i % 20 == 9}
+
+
+def test_objects_of_each(monkeypatch):
+    g = Graph()
+    for i in range(10):
+        g.add((_ex(f"s{i}"), _ex("p"), Literal(i)))
+        g.add((_ex(f"s{i}"), _ex("p"), Literal(-i)))
+    subjects = [_ex("s1"), _ex("s2"), _ex("none")]
+    expected = {_ex("s1"): {Literal(1), Literal(-1)}, _ex("s2"): {Literal(2), Literal(-2)}, _ex("none"): set()}
+    assert objects_of_each(g, subjects, _ex("p")) == expected
+    # One scan over the predicate, or per subject lookups when the scan would be too long
+    monkeypatch.setattr(path_helper, "BULK_LOOKUP_MIN_SUBJECTS", 1)
+    assert objects_of_each(g, subjects, _ex("p")) == expected
+    monkeypatch.setattr(path_helper, "BULK_SCAN_FACTOR", 100)
+    assert objects_of_each(g, subjects, _ex("p")) == expected
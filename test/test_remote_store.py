@@ -0,0 +1,169 @@
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from rdflib import Graph, URIRef
+
+from pyshacl import validate
+from pyshacl.rdfutil.remote_store import RemoteQueryError, RemoteSPARQLStore
+
+data_ttl = """\
+@prefix ex: <http://example.org/> .
+"""
+data_ttl += "\n".join(
+    f'ex:p{i} a ex:Person ; ex:knows ex:p{(i + 1) % 40}{" ; ex:name " + chr(34) + str(i) + chr(34) if i % 3 else ""} .'
+    for i in range(40)
+)
+
+shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix ex: <http://example.org/> .
+
+ex:PersonShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Person ;
+  sh:property [ sh:path ex:name ; sh:minCount 1 ] ;
+  sh:property [ sh:path ex:knows ; sh:class ex:Person ] ;
+.
+"""
+
+
+class StandInEndpoint(BaseHTTPRequestHandler):
+    """A SPARQL endpoint backed by a local rdflib Graph, with keep-alive connections."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes, avoid the delayed-ACK stall on a kept-alive connection
+    disable_nagle_algorithm = True
+    graph = Graph().parse(data=data_ttl, format="turtle")
+    lock = threading.Lock()
+    requests_seen: list = []
+    connections = 0
+    fail_next = 0
+    delay = 0.0
+
+    def setup(self):
+        super().setup()
+        with self.lock:
+            StandInEndpoint.connections += 1
+
+    def answer(self, query):
+        with self.lock:
+            self.requests_seen.append((self.command, query))
+            fail = StandInEndpoint.fail_next > 0
+            if fail:
+                StandInEndpoint.fail_next -= 1
+        if self.delay:
+            time.sleep(self.delay)
+        if fail:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        with self.lock:
+            body = self.graph.query(query).serialize(format="xml")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/sparql-results+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.answer(parse_qs(urlsplit(self.path).query)["query"][0])
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8")
+        self.answer(parse_qs(body)["query"][0])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def endpoint():
+    StandInEndpoint.requests_seen = []
+    StandInEndpoint.connections = 0
+    StandInEndpoint.fail_next = 0
+    StandInEndpoint.delay = 0.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInEndpoint)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield "http://127.0.0.1:{}/sparql".format(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_validate_remote_endpoint_reuses_connections(endpoint):
+    expected = validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle")
+    actual = validate(endpoint, shacl_graph=shapes_ttl, sparql_mode=True, sparql_concurrency=2)
+    assert actual[0] == expected[0] is False
+    assert actual[2].splitlines()[:3] == expected[2].splitlines()[:3]
+    assert len(StandInEndpoint.requests_seen) > 1
+    assert StandInEndpoint.connections <= 2
+
+
+def test_validate_remote_endpoint_query_count_per_constraint(endpoint):
+    # One query per constraint for the whole focus set, not one per focus node or value node
+    shapes = shapes_ttl + """\
+ex:ClosedShape
+  a sh:NodeShape ;
+  sh:targetSubjectsOf ex:knows ;
+  sh:closed true ;
+  sh:ignoredProperties ( <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> ) ;
+  sh:property [ sh:path ex:knows ; sh:disjoint ex:name ; sh:lessThan ex:name ] ;
+.
+"""
+    expected = validate(data_ttl, shacl_graph=shapes, data_graph_format="turtle")
+    actual = validate(endpoint, shacl_graph=shapes, sparql_mode=True)
+    assert actual[0] == expected[0] is False
+    # The remote graph has no ex: prefix binding
+    actual_lines = [re.sub(r"<http://example.org/(\w+)>", r"ex:\1", line) for line in actual[2].splitlines()]
+    assert sorted(actual_lines) == sorted(expected[2].splitlines())
+    assert len(StandInEndpoint.requests_seen) < 15
+
+
+def test_remote_store_caches_result_sets(endpoint):
+    store = RemoteSPARQLStore(endpoint)
+    query = "SELECT ?s WHERE { ?s a <http://example.org/Person> }"
+    assert len(store.query(query)) == 40
+    assert len(store.query(query)) == 40
+    assert store.requests_sent == 1
+    assert store.cache_hits == 1
+    # Bindings are part of the cache key
+    one = store.query(query, initBindings={"s": URIRef("http://example.org/p1")})
+    assert len(one) == 1
+    assert store.requests_sent == 2
+
+
+def test_remote_store_retries_with_backoff(endpoint):
+    StandInEndpoint.fail_next = 2
+    store = RemoteSPARQLStore(endpoint, retries=2, backoff=0.01)
+    assert len(store.query("SELECT ?s WHERE { ?s ?p ?o } LIMIT 1")) == 1
+    assert store.requests_sent == 3
+    StandInEndpoint.fail_next = 2
+    store = RemoteSPARQLStore(endpoint, retries=1, backoff=0.01)
+    with pytest.raises(RemoteQueryError) as e:
+        store.query("SELECT ?s WHERE { ?s ?p ?o } LIMIT 1")
+    assert e.value.status == 503
+
+
+def test_remote_store_posts_long_queries(endpoint):
+    store = RemoteSPARQLStore(endpoint, post_threshold=200)
+    store.query("SELECT ?s WHERE { ?s a <http://example.org/Person> }")
+    long_query = "SELECT ?s WHERE {{ VALUES ?s {{ {} }} ?s a <http://example.org/Person> }}".format(
+        " ".join(f"<http://example.org/p{i}>" for i in range(20))
+    )
+    assert len(store.query(long_query)) == 20
+    assert [r[0] for r in StandInEndpoint.requests_seen] == ["GET", "POST"]
+
+
+def test_remote_store_timeout(endpoint):
+    StandInEndpoint.delay = 1.0
+    store = RemoteSPARQLStore(endpoint, retries=0, timeout=0.1)
+    with pytest.raises(RemoteQueryError):
+        store.query("SELECT ?s WHERE { ?s ?p ?o } LIMIT 1")
@@ -0,0 +1,181 @@
+"""
+Scaling regression tests.
+
+Each core constraint component, each kind of property path, each kind of SHACL rule, and SPARQL-based constraints,
+are validated against the synthetic data graph of the benchmark harness (benchmarks/synthetic.py) at two sizes,
+SMALL and 10 * SMALL people. The test fails if validating the larger graph costs much more than ten times as much as
+the smaller one, which catches accidental O(n^2) behaviour before a release.
+
+By default the cost is the number of data graph calls made by the shapes (counted by a ValidationProfile), which is
+exact and repeatable. SHACL rules are applied before any shape is validated, so their data graph calls are not
+counted against a shape.
+
+Wall-clock time is also checked, but only in the tests marked slow, which are deselected unless pytest is run with
+-m slow. Time is noisy on shared CI machines, so those use larger graphs, the fastest of a few runs, and a loose
+threshold. Quadratic behaviour gives a ratio of up to 100, but the fixed cost of each query or call hides some of it,
+so the time threshold is only twice the linear ratio.
+"""
+
+import importlib.util
+import time
+from functools import lru_cache
+from io import StringIO
+from os import path
+
+import pytest
+from rdflib import Graph
+
+from pyshacl import validate
+from pyshacl.profiling import ValidationProfile
+
+_synthetic_py = path.abspath(path.join(path.dirname(__file__), "..", "benchmarks", "synthetic.py"))
+_spec = importlib.util.spec_from_file_location("pyshacl_benchmarks_synthetic", _synthetic_py)
+assert _spec is not None and _spec.loader is not None
+synthetic = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(synthetic)
+
+SMALL = 40
+LARGE = SMALL * 10
+TIMED_SMALL = 100
+TIMED_LARGE = TIMED_SMALL * 10
+# Linear growth gives a ratio of 10. Paths over the management tree (a depth of log2(n)) grow as n*log(n).
+MAX_CALLS_RATIO = 20.0
+MAX_TIME_RATIO = 20.0
+TIMED_RUNS = 3
+
+core_cases = {
+    "class": "sh:property [ sh:path ex:knows ; sh:class ex:Person ]",
+    "datatype": "sh:property [ sh:path ex:age ; sh:datatype xsd:integer ]",
+    "nodeKind": "sh:property [ sh:path ex:knows ; sh:nodeKind sh:IRI ]",
+    "minCount": "sh:property [ sh:path ex:email ; sh:minCount 1 ]",
+    "maxCount": "sh:property [ sh:path ex:email ; sh:maxCount 1 ]",
+    "minExclusive": "sh:property [ sh:path ex:age ; sh:minExclusive -1 ]",
+    "minInclusive": "sh:property [ sh:path ex:age ; sh:minInclusive 0 ]",
+    "maxExclusive": "sh:property [ sh:path ex:age ; sh:maxExclusive 80 ]",
+    "maxInclusive": "sh:property [ sh:path ex:age ; sh:maxInclusive 80 ]",
+    "minLength": "sh:property [ sh:path ex:name ; sh:minLength 3 ]",
+    "maxLength": "sh:property [ sh:path ex:name ; sh:maxLength 8 ]",
+    "pattern": 'sh:property [ sh:path ex:name ; sh:pattern "^Person [0-9]+$" ]',
+    "languageIn": 'sh:property [ sh:path ex:label ; sh:languageIn ( "de" ) ]',
+    "uniqueLang": "sh:property [ sh:path ex:label ; sh:uniqueLang true ]",
+    "equals": "sh:property [ sh:path ex:email ; sh:equals ex:contactEmail ]",
+    "disjoint": "sh:property [ sh:path ex:givenName ; sh:disjoint ex:familyName ]",
+    "lessThan": "sh:property [ sh:path ex:startDate ; sh:lessThan ex:endDate ]",
+    "lessThanOrEquals": "sh:property [ sh:path ex:startDate ; sh:lessThanOrEquals ex:endDate ]",
+    "not": 'sh:property [ sh:path ex:gender ; sh:not [ sh:hasValue "q" ] ]',
+    "and": "sh:property [ sh:path ex:name ; sh:and ( [ sh:minLength 3 ] [ sh:maxLength 40 ] ) ]",
+    "or": "sh:property [ sh:path ex:age ; sh:or ( [ sh:datatype xsd:integer ] [ sh:datatype xsd:decimal ] ) ]",
+    "xone": "sh:xone ( [ sh:path ex:email ; sh:minCount 1 ] [ sh:path ex:phone ; sh:minCount 1 ] )",
+    "node": "sh:property [ sh:path ex:address ; sh:node [ sh:property [ sh:path ex:city ; sh:class ex:City ] ] ]",
+    "property": "sh:property [ sh:path ex:address ; sh:property [ sh:path ex:street ; sh:minCount 1 ] ]",
+    "qualifiedValueShape": (
+        "sh:property [ sh:path ex:knows ; sh:qualifiedValueShape [ sh:class ex:Person ] ; sh:qualifiedMinCount 1 ]"
+    ),
+    "closed": (
+        "sh:closed true ; sh:ignoredProperties ( rdf:type ex:name ex:label ex:age ex:email ex:contactEmail "
+        "ex:gender ex:knows ex:manager ex:startDate ex:endDate ex:givenName ex:familyName ex:address )"
+    ),
+    "hasValue": "sh:property [ sh:path rdf:type ; sh:hasValue ex:Person ]",
+    "in": 'sh:property [ sh:path ex:gender ; sh:in ( "f" "m" "x" ) ]',
+}
+
+path_cases = {
+    "predicatePath": "sh:property [ sh:path ex:knows ; sh:nodeKind sh:IRI ]",
+    "sequencePath": "sh:property [ sh:path ( ex:knows ex:name ) ; sh:minCount 1 ]",
+    "alternativePath": "sh:property [ sh:path [ sh:alternativePath ( ex:email ex:contactEmail ) ] ; sh:minCount 1 ]",
+    "inversePath": "sh:property [ sh:path [ sh:inversePath ex:knows ] ; sh:minCount 1 ]",
+    "zeroOrMorePath": "sh:property [ sh:path [ sh:zeroOrMorePath ex:manager ] ; sh:nodeKind sh:IRI ]",
+    "oneOrMorePath": "sh:property [ sh:path [ sh:oneOrMorePath ex:manager ] ; sh:nodeKind sh:IRI ]",
+    "zeroOrOnePath": "sh:property [ sh:path [ sh:zeroOrOnePath ex:manager ] ; sh:nodeKind sh:IRI ]",
+}
+
+prefix_declarations = """
+ex:
+  sh:declare [ sh:prefix "ex" ; sh:namespace "http://example.org/ns#"^^xsd:anyURI ] ;
+  sh:declare [ sh:prefix "xsd" ; sh:namespace "http://www.w3.org/2001/XMLSchema#"^^xsd:anyURI ] ;
+.
+"""
+
+sparql_cases = {
+    "sparqlConstraint": """sh:sparql [
+    sh:prefixes ex: ;
+    sh:select "SELECT $this ?value WHERE { $this ex:age ?value . FILTER (datatype(?value) = xsd:integer && ?value < 0) }" ;
+  ]""",
+    "sparqlPathConstraint": """sh:property [
+    sh:path ex:knows ;
+    sh:sparql [
+      sh:prefixes ex: ;
+      sh:select "SELECT $this ?value WHERE { $this $PATH ?value . FILTER NOT EXISTS { ?value a ex:Person } }" ;
+    ] ;
+  ]""",
+}
+
+rule_cases = {
+    "TripleRule": "sh:rule [ a sh:TripleRule ; sh:subject sh:this ; sh:predicate rdf:type ; sh:object ex:Agent ]",
+    "SPARQLRule": """sh:rule [
+    a sh:SPARQLRule ;
+    sh:prefixes ex: ;
+    sh:construct "CONSTRUCT { $this ex:colleague ?other . } WHERE { $this ex:manager ?m . ?other ex:manager ?m . }" ;
+  ]""",
+}
+
+
+def _shapes(body: str, advanced: bool) -> str:
+    shapes = synthetic.PREFIXES
+    if advanced:
+        shapes += prefix_declarations
+    return shapes + f"\nex:PersonShape\n  a sh:NodeShape ;\n  sh:targetClass ex:Person ;\n  {body} ;\n.\n"
+
+
+@lru_cache(maxsize=None)
+def _data_graph(n: int) -> Graph:
+    out = StringIO()
+    synthetic.write_people(out, n, depth=2)
+    return Graph().parse(data=out.getvalue(), format="nt")
+
+
+def _calls(n: int, shapes: Graph, advanced: bool) -> int:
+    profile = ValidationProfile()
+    validate(_data_graph(n), shacl_graph=shapes, advanced=advanced, profile=profile)
+    return sum(s.graph_calls + s.sparql_queries for s in profile.shapes)
+
+
+def _best_time(n: int, shapes: Graph, advanced: bool) -> float:
+    data = _data_graph(n)
+    best = None
+    for _ in range(TIMED_RUNS):
+        t1 = time.perf_counter()
+        validate(data, shacl_graph=shapes, advanced=advanced)
+        elapsed = time.perf_counter() - t1
+        best = elapsed if best is None else min(best, elapsed)
+    assert best is not None
+    return best
+
+
+all_cases = [(name, body, False) for name, body in {**core_cases, **path_cases}.items()]
+all_cases += [(name, body, True) for name, body in {**sparql_cases, **rule_cases}.items()]
+
+
+@pytest.mark.parametrize("name, body, advanced", all_cases, ids=[c[0] for c in all_cases])
+def test_validation_scales_linearly(name, body, advanced):
+    # Parsing the shapes graph is not part of the cost
+    shapes = Graph().parse(data=_shapes(body, advanced), format="turtle")
+    small_calls = _calls(SMALL, shapes, advanced)
+    large_calls = _calls(LARGE, shapes, advanced)
+    assert small_calls > 0
+    calls_ratio = large_calls / small_calls
+    assert calls_ratio <= MAX_CALLS_RATIO, (
+        f"{name}: {large_calls} data graph calls at {LARGE}, {small_calls} at {SMALL}"
+    )
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("name, body, advanced", all_cases, ids=[c[0] for c in all_cases])
+def test_validation_time_scales_linearly(name, body, advanced):
+    shapes = Graph().parse(data=_shapes(body, advanced), format="turtle")
+    small_time = _best_time(TIMED_SMALL, shapes, advanced)
+    large_time = _best_time(TIMED_LARGE, shapes, advanced)
+    time_ratio = large_time / small_time
+    assert time_ratio <= MAX_TIME_RATIO, (
+        f"{name}: {large_time:.4f}s at {TIMED_LARGE}, {small_time:.4f}s at {TIMED_SMALL}"
+    )
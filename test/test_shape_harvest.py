@@ -0,0 +1,65 @@
+from rdflib import Graph, URIRef
+
+from pyshacl.consts import SH
+from pyshacl.shape import Shape
+from pyshacl.shapes_graph import ShapesGraph
+
+EX = "http://example.org/"
+
+shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix ex: <http://example.org/> .
+
+ex:PersonShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Person ;
+  sh:name "Person" ;
+  sh:severity sh:Warning ;
+  sh:property ex:NameShape , [ sh:path ex:age ; sh:deactivated true ; sh:message "a" , "b" ] ;
+  sh:or ( ex:OrShape [ sh:class ex:Thing ] ) ;
+.
+
+ex:NameShape sh:path ex:name ; sh:node ex:NodeOnly ; sh:description "The name" .
+
+ex:PropertyShape
+  a sh:PropertyShape ;
+  sh:path ex:knows ;
+  sh:qualifiedValueShape [ sh:class ex:Person ] ;
+  sh:not ex:NotShape ;
+.
+
+ex:TargetOnly sh:targetSubjectsOf ex:knows .
+ex:OrShape sh:maxCount 1 .
+ex:NotShape sh:path ex:nope .
+ex:Unrelated ex:knows ex:Nobody .
+"""
+
+
+def _ex(name: str) -> URIRef:
+    return URIRef(EX + name)
+
+
+def test_harvested_shapes():
+    sg = ShapesGraph(Graph().parse(data=shapes_ttl, format="turtle"))
+    shapes = {s.node: s for s in sg.shapes}
+    named = {n: shapes[_ex(n)] for n in ("PersonShape", "NameShape", "PropertyShape", "TargetOnly", "OrShape")}
+    assert {n for n, s in named.items() if s.is_property_shape} == {"NameShape", "PropertyShape"}
+    assert shapes[_ex("NotShape")].path() == _ex("nope")
+    assert _ex("NodeOnly") in shapes
+    assert _ex("Unrelated") not in shapes
+    # And the blank node property shape, sh:or member and sh:qualifiedValueShape
+    assert len(shapes) == 10
+    for node, shape in shapes.items():
+        # The same as a shape that looks up its own header
+        looked_up = Shape(sg, node, p=shape.is_property_shape, path=shape.path())
+        assert shape.severity == looked_up.severity
+        assert shape.deactivated == looked_up.deactivated
+        assert set(shape.message) == set(looked_up.message)
+        assert set(shape.name) == set(looked_up.name)
+        assert set(shape.description) == set(looked_up.description)
+    person = named["PersonShape"]
+    assert person.severity == SH.Warning
+    assert [str(n) for n in person.name] == ["Person"]
+    age = next(s for s in shapes.values() if s.path() == _ex("age"))
+    assert age.deactivated is True
+    assert sorted(str(m) for m in age.message) == ["a", "b"]
@@ -0,0 +1,59 @@
+from os import path
+
+from rdflib import BNode, Dataset, Graph, Literal, URIRef
+from rdflib.namespace import XSD
+
+from pyshacl import validate
+from pyshacl.rdfutil import load_from_source
+from pyshacl.snapshot import is_snapshot, make_snapshot, read_snapshot, write_snapshot
+
+here_dir = path.abspath(path.dirname(__file__))
+shacl_file = path.join(here_dir, 'resources', 'cmdline_tests', 's1.ttl')
+data_file = path.join(here_dir, 'resources', 'cmdline_tests', 'd1.ttl')
+
+EX = "http://example.org/"
+
+
+def test_snapshot_roundtrip_terms(tmp_path):
+    g = Graph(identifier=URIRef(EX + "graph"), base=EX)
+    g.bind("ex", EX)
+    b = BNode()
+    g.add((URIRef(EX + "s"), URIRef(EX + "p"), b))
+    g.add((b, URIRef(EX + "p"), Literal("plain")))
+    g.add((b, URIRef(EX + "p"), Literal("hello", lang="en")))
+    g.add((b, URIRef(EX + "p"), Literal("42", datatype=XSD.integer)))
+    g.add((b, URIRef(EX + "p"), Literal("snow ☃ \x00 man")))
+    # The same string as a URI and as a literal must stay distinct terms
+    g.add((b, URIRef(EX + "p"), Literal(EX + "s")))
+    snapshot_file = tmp_path / "g.snapshot"
+    assert write_snapshot(g, snapshot_file) == 6
+    assert is_snapshot(str(snapshot_file))
+    g2 = read_snapshot(str(snapshot_file))
+    assert g2.identifier == g.identifier
+    assert g2.base == EX
+    assert set(g2) == set(g)
+    assert g2.namespace_manager.store.namespace("ex") == URIRef(EX)
+    with open(snapshot_file, 'rb') as f:
+        assert set(read_snapshot(f)) == set(g)
+
+
+def test_snapshot_dataset(tmp_path):
+    ds = Dataset()
+    ds.graph(URIRef(EX + "g1")).add((URIRef(EX + "a"), URIRef(EX + "p"), URIRef(EX + "b")))
+    ds.default_graph.add((URIRef(EX + "c"), URIRef(EX + "p"), Literal(1)))
+    snapshot_file = tmp_path / "ds.snapshot"
+    write_snapshot(ds, snapshot_file)
+    ds2 = load_from_source(str(snapshot_file), multigraph=True)
+    assert isinstance(ds2, Dataset)
+    assert set(ds2.quads()) == set(ds.quads())
+
+
+def test_validate_with_snapshot_shapes(tmp_path):
+    snapshot_file = str(tmp_path / "shapes.snapshot")
+    make_snapshot(shacl_file, snapshot_file)
+    with open(snapshot_file, 'rb') as f:
+        assert f.read(1) != b'@'
+    expected = validate(data_file, shacl_graph=shacl_file)
+    actual = validate(data_file, shacl_graph=snapshot_file)
+    assert actual[0] == expected[0] is False
+    assert actual[2] == expected[2]
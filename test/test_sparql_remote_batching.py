@@ -0,0 +1,86 @@
+from rdflib import RDF, RDFS, BNode, Graph, Literal, URIRef
+
+from pyshacl import validate
+from pyshacl.helper.sparql_remote_helper import (
+    TARGET_CLASS,
+    TARGET_OBJECTS_OF,
+    TARGET_SUBJECTS_OF,
+    batched_value_nodes,
+    target_focus_nodes,
+)
+
+EX = "http://example.org/"
+
+shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix ex: <http://example.org/> .
+
+ex:PersonShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Person ;
+  sh:property [ sh:path ex:name ; sh:minCount 1 ; sh:maxCount 2 ] ;
+  sh:property [ sh:path ( ex:knows ex:name ) ; sh:minCount 1 ] ;
+.
+"""
+
+
+def make_data_ttl(count: int) -> str:
+    lines = ["@prefix ex: <http://example.org/> ."]
+    for i in range(count):
+        names = " ; ".join(f'ex:name "n{i}_{j}"' for j in range(i % 4))
+        lines.append(f"ex:p{i} a ex:Person ; ex:knows ex:p{(i + 1) % count}" + (f" ; {names}" if names else "") + " .")
+    return "\n".join(lines)
+
+
+def test_batched_value_nodes_pages():
+    g = Graph()
+    p = URIRef(EX + "p")
+    focus = [URIRef(EX + f"s{i}") for i in range(7)] + [BNode(), Literal("not a subject")]
+    for i, f in enumerate(focus[:7]):
+        for j in range(i):
+            g.add((f, p, Literal(j)))
+    g.add((focus[7], p, Literal("blank")))
+    expected = {f: set(g.objects(f, p)) if not isinstance(f, Literal) else set() for f in focus}
+    for batch_size, page_size in ((100, 10000), (2, 3), (1, 1), (3, None)):
+        assert batched_value_nodes(g, focus, p.n3(), batch_size=batch_size, page_size=page_size) == expected
+
+
+def test_target_focus_nodes_per_kind():
+    g = Graph()
+    person, student, knows, likes = (URIRef(EX + n) for n in ("Person", "Student", "knows", "likes"))
+    blank_class = BNode()
+    g.add((student, RDFS.subClassOf, person))
+    g.add((URIRef(EX + "a"), RDF.type, student))
+    g.add((URIRef(EX + "b"), RDF.type, person))
+    g.add((URIRef(EX + "c"), RDF.type, blank_class))
+    g.add((URIRef(EX + "d"), knows, URIRef(EX + "e")))
+    g.add((URIRef(EX + "f"), likes, Literal("cake")))
+    targets = (
+        (TARGET_CLASS, [person, blank_class]),
+        (TARGET_SUBJECTS_OF, [knows]),
+        (TARGET_OBJECTS_OF, [knows, likes]),
+    )
+    expected = {URIRef(EX + n) for n in "abcde"} | {Literal("cake")}
+    cache: dict = {}
+    assert target_focus_nodes(g, targets, batch_size=1, page_size=1, cache=cache) == expected
+    assert len(cache) == 5
+    # The same target declarations are answered from the cache
+    g.remove((URIRef(EX + "a"), None, None))
+    assert target_focus_nodes(g, targets, batch_size=1, page_size=1, cache=cache) == expected
+    assert target_focus_nodes(g, targets, cache={}) == expected - {URIRef(EX + "a")}
+
+
+def test_sparql_mode_small_batches_match_local_mode():
+    data_ttl = make_data_ttl(25)
+    expected = validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle")
+    actual = validate(
+        data_ttl,
+        shacl_graph=shapes_ttl,
+        data_graph_format="turtle",
+        sparql_mode=True,
+        sparql_batch_size=4,
+        sparql_page_size=5,
+    )
+    assert actual[0] == expected[0] is False
+    assert "Results (20):" in expected[2]
+    assert actual[2].splitlines()[:3] == expected[2].splitlines()[:3]
@@ -0,0 +1,269 @@
+import pytest
+from rdflib import Graph, URIRef
+from rdflib.namespace import SH
+
+from pyshacl import validate
+from pyshacl.errors import ReportableRuntimeError
+from pyshacl.rdfutil import stringify_memo, stringify_node
+from pyshacl.report import LazyValidationReport, ValidationReport
+
+shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:PersonShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Person ;
+  sh:property [
+    sh:path ex:name ;
+    sh:datatype xsd:string ;
+    sh:minCount 1 ;
+  ] ;
+.
+"""
+
+data_ttl = """\
+@prefix ex: <http://example.org/> .
+
+ex:Person1 a ex:Person .
+ex:Person2 a ex:Person ; ex:name 2 .
+ex:Person3 a ex:Person ; ex:name "Three" .
+"""
+
+
+def test_report_is_a_rendered_tuple():
+    report = validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", shacl_graph_format="turtle")
+    assert isinstance(report, tuple)
+    assert isinstance(report, ValidationReport)
+    assert report[0] is False and report.conforms is False
+    assert report[1] is report.graph and report[2] is report.text
+    assert len(report.rows) == 2
+    # The report does not keep the results table, or the data graph, alive
+    assert not hasattr(report, "results")
+
+
+def test_report_unpacks_like_tuple():
+    conforms, graph, text = validate(
+        data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", shacl_graph_format="turtle"
+    )
+    assert not conforms
+    assert len(set(graph.subjects(SH.focusNode, None))) == 2
+    assert text.startswith("Validation Report\nConforms: False\n")
+
+
+def test_lazy_report_renders_on_access():
+    report = validate(
+        data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", shacl_graph_format="turtle", lazy_report=True
+    )
+    assert isinstance(report, LazyValidationReport)
+    assert report[0] is False
+    assert report._graph is None
+    assert report._text is None
+    text = report.text
+    assert report._graph is None
+    assert "Results (2):" in text
+    assert report.text is text
+    assert report.results is not None
+    graph = report[1]
+    assert isinstance(graph, Graph)
+    assert len(set(graph.objects(None, SH.result))) == 2
+    # Both are rendered, so the results table is released
+    assert report.results is None
+
+
+def test_lazy_report_unpacks_like_tuple():
+    eager = validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", shacl_graph_format="turtle")
+    conforms, graph, text = validate(
+        data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", shacl_graph_format="turtle", lazy_report=True
+    )
+    assert conforms is False
+    assert text == eager.text
+    assert len(graph) == len(eager.graph)
+
+
+def test_conforms_only():
+    res = validate(
+        data_ttl,
+        shacl_graph=shapes_ttl,
+        data_graph_format="turtle",
+        shacl_graph_format="turtle",
+        conforms_only=True,
+    )
+    assert res == (False, None, None)
+    good_data = '@prefix ex: <http://example.org/> .\nex:Person3 a ex:Person ; ex:name "Three" .\n'
+    res = validate(
+        good_data,
+        shacl_graph=shapes_ttl,
+        data_graph_format="turtle",
+        shacl_graph_format="turtle",
+        conforms_only=True,
+    )
+    assert res == (True, None, None)
+
+
+many_data_ttl = """\
+@prefix ex: <http://example.org/> .
+
+ex:Person1 a ex:Person .
+ex:Person2 a ex:Person .
+ex:Person3 a ex:Person .
+ex:Person4 a ex:Person ; ex:name 4 .
+"""
+
+
+split_shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:PersonShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Person ;
+  sh:property ex:NameCountShape , ex:NameTypeShape ;
+.
+
+ex:NameCountShape sh:path ex:name ; sh:minCount 1 .
+ex:NameTypeShape sh:path ex:name ; sh:datatype xsd:string .
+"""
+
+split_data_ttl = many_data_ttl + "ex:Person5 a ex:Person ; ex:name 5 .\n"
+
+
+def test_max_results_per_shape_truncates_report():
+    conforms, graph, text = validate(
+        split_data_ttl,
+        shacl_graph=split_shapes_ttl,
+        data_graph_format="turtle",
+        shacl_graph_format="turtle",
+        max_results_per_shape=1,
+    )
+    assert not conforms
+    # One result is kept for each of the two property shapes
+    assert len(set(graph.objects(None, SH.result))) == 2
+    assert "Results (2):" in text
+    # The other 2 minCount results and the other datatype result are counted, per shape and constraint component
+    assert "Truncated Results (3):" in text
+    counts = list(graph.objects(None, URIRef("urn:pyshacl:count")))
+    assert sorted(int(c) for c in counts) == [1, 2]
+
+
+def test_max_results_total_and_sample_rate():
+    conforms, graph, text = validate(
+        many_data_ttl,
+        shacl_graph=shapes_ttl,
+        data_graph_format="turtle",
+        shacl_graph_format="turtle",
+        max_results_total=2,
+    )
+    assert not conforms
+    assert len(set(graph.objects(None, SH.result))) == 2
+    conforms, graph, text = validate(
+        many_data_ttl,
+        shacl_graph=shapes_ttl,
+        data_graph_format="turtle",
+        shacl_graph_format="turtle",
+        sample_rate=0.5,
+    )
+    assert not conforms
+    # 3 minCount results sampled at 0.5 keeps 2, the single datatype result is always kept
+    assert len(set(graph.objects(None, SH.result))) == 3
+    assert "Truncated Results (1):" in text
+
+
+def test_result_limits_are_checked():
+    with pytest.raises(ReportableRuntimeError):
+        validate(many_data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", max_results_total=0)
+    with pytest.raises(ReportableRuntimeError):
+        validate(many_data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", sample_rate=1.5)
+
+
+nested_shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix ex: <http://example.org/> .
+
+ex:S
+  a sh:NodeShape ;
+  sh:targetNode ex:x ;
+  sh:property [ sh:path ex:p ; sh:node ex:B ] ;
+.
+
+ex:B
+  a sh:NodeShape ;
+  sh:not [ sh:class ex:Bad ] ;
+.
+"""
+
+nested_data_ttl = """\
+@prefix ex: <http://example.org/> .
+
+ex:x ex:p ex:y1 , ex:y2 , ex:y3 .
+"""
+
+
+@pytest.mark.parametrize("limits", [{"max_results_per_shape": 1}, {"max_results_total": 1}, {"sample_rate": 0.5}])
+def test_result_limits_do_not_apply_to_nested_validations(limits):
+    # The results of the shapes under sh:not are not results of the report, so they must not be truncated
+    conforms, graph, text = validate(
+        nested_data_ttl,
+        shacl_graph=nested_shapes_ttl,
+        data_graph_format="turtle",
+        shacl_graph_format="turtle",
+        **limits,
+    )
+    assert conforms
+    assert "Truncated" not in text
+
+
+def test_stringify_is_memoized_per_run():
+    g = Graph().parse(data=shapes_ttl, format="turtle")
+    prop_shape = next(g.objects(None, SH.property))
+    # Nothing is memoized outside of a run
+    assert stringify_node(g, prop_shape) is not stringify_node(g, prop_shape)
+    with stringify_memo() as memo:
+        first = stringify_node(g, prop_shape)
+        assert stringify_node(g, prop_shape) is first
+        assert len(memo) > 0
+        with stringify_memo():
+            assert stringify_node(g, prop_shape) is not first
+        # A placeholder for a too deep blank node does not stand in for its full rendering
+        assert stringify_node(g, prop_shape, recursion=11) == "<http://recursion.too.deep>"
+        assert stringify_node(g, prop_shape) is first
+    # The memo of a run does not outlive it
+    validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", shacl_graph_format="turtle")
+    assert stringify_node(g, prop_shape) is not stringify_node(g, prop_shape)
+
+
+def test_result_messages_are_made_once(monkeypatch):
+    from pyshacl.constraints.constraint_component import ConstraintComponent
+
+    calls = []
+    make_messages = ConstraintComponent.make_v_result_messages
+
+    def counted(self, *args, **kwargs):
+        calls.append(self)
+        return make_messages(self, *args, **kwargs)
+
+    monkeypatch.setattr(ConstraintComponent, "make_v_result_messages", counted)
+    report = validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", shacl_graph_format="turtle")
+    # Shared by the results text and the results graph
+    assert len(calls) == len(report.rows) == 2
+
+
+def test_each_run_records_into_its_own_table():
+    from pyshacl import Validator
+    from pyshacl.graph_abstraction import DataGraph
+
+    data = DataGraph.from_rdflib(Graph().parse(data=data_ttl, format="turtle"))
+    shapes = Graph().parse(data=shapes_ttl, format="turtle")
+    validator = Validator(data, shacl_graph=shapes, options={"inplace": True})
+    sg = validator.shacl_graph
+    outer = sg.new_results()
+    outer.set_limits(max_results_total=0)
+    with outer.recording():
+        # A nested run does not take over the table, or the limits, of the run around it
+        conforms, _, text = validator.run()
+        assert sg.results is outer
+    assert conforms is False
+    assert "Results (2):" in text
+    assert len(outer) == 0
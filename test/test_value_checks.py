@@ -0,0 +1,245 @@
+from decimal import Decimal
+
+import pytest
+from rdflib import XSD, BNode, Literal, URIRef
+
+from pyshacl import validate
+from pyshacl.constraints.constraint_component import FusedValueChecks, ValueCheck
+from pyshacl.profiling import ValidationProfile
+
+shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:ThingShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Thing ;
+  sh:property ex:NameShape, ex:AgeShape, ex:LabelShape, ex:KindShape ;
+.
+
+ex:NameShape
+  a sh:PropertyShape ;
+  sh:path ex:name ;
+  sh:minCount 1 ;
+  sh:maxCount 1 ;
+  sh:datatype xsd:string ;
+  sh:nodeKind sh:Literal ;
+  sh:pattern "^[A-Z]" ;
+  sh:minLength 3 ;
+  sh:maxLength 8 ;
+.
+
+ex:AgeShape
+  a sh:PropertyShape ;
+  sh:path ex:age ;
+  sh:maxCount 1 ;
+  sh:datatype xsd:integer ;
+  sh:minInclusive 0 ;
+  sh:minExclusive -1 ;
+  sh:maxInclusive 150 ;
+  sh:maxExclusive 151 ;
+.
+
+ex:LabelShape
+  a sh:PropertyShape ;
+  sh:path ex:label ;
+  sh:languageIn ( "en" "de" ) ;
+  sh:uniqueLang true ;
+.
+
+ex:KindShape
+  a sh:PropertyShape ;
+  sh:path ex:kind ;
+  sh:in ( ex:A ex:B ) ;
+  sh:hasValue ex:A ;
+  sh:nodeKind sh:IRI ;
+.
+
+ex:DirectNameShape
+  a sh:PropertyShape ;
+  sh:targetClass ex:Thing ;
+  sh:path ex:name ;
+  sh:minCount 1 ;
+  sh:datatype xsd:string ;
+  sh:minLength 3 ;
+  sh:pattern "^[A-Z]" ;
+.
+"""
+
+data_ttl = """\
+@prefix ex: <http://example.org/> .
+
+ex:t1 a ex:Thing ; ex:name "Alpha" ; ex:age 30 ; ex:label "one"@en, "eins"@de ; ex:kind ex:A .
+ex:t2 a ex:Thing ; ex:name "al", "Beta Gamma Delta" ; ex:age -5, "old" ; ex:label "un"@fr, "one"@en, "won"@en ;
+  ex:kind ex:B, "A" .
+ex:t3 a ex:Thing ; ex:name ex:notALiteral ; ex:age 200 ; ex:kind [ ex:x 1 ] .
+ex:t4 a ex:Thing ; ex:age 3.5 .
+"""
+
+
+def _report(**kwargs):
+    return validate(data_ttl, shacl_graph=shapes_ttl, data_graph_format="turtle", **kwargs)
+
+
+def test_fused_checks_give_the_same_results():
+    # When profiling, each constraint is evaluated on its own
+    fused = _report()
+    separate = _report(profile=ValidationProfile())
+    assert fused.conforms is False
+    assert len(fused.rows) == len(separate.rows) > 20
+    assert fused.text == separate.text
+    components = {
+        str(c).rsplit("#", 1)[1]
+        for c in fused.graph.objects(None, URIRef("http://www.w3.org/ns/shacl#sourceConstraintComponent"))
+    }
+    assert {"DatatypeConstraintComponent", "PatternConstraintComponent", "UniqueLangConstraintComponent"} <= components
+    assert {
+        "MaxCountConstraintComponent",
+        "HasValueConstraintComponent",
+        "MinExclusiveConstraintComponent",
+    } <= components
+
+
+def test_fused_checks_conforms_only_and_abort_on_first():
+    assert _report(conforms_only=True) == (False, None, None)
+    first = _report(abort_on_first=True)
+    assert first.conforms is False
+    assert 0 < len(first.rows) < len(_report().rows)
+
+
+def test_fused_value_checks_order():
+    a, b = URIRef("urn:a"), URIRef("urn:b")
+    is_short = ValueCheck(False, lambda v: len(str(v)) < 3)
+    is_number = ValueCheck(False, lambda v: isinstance(v, Literal) and isinstance(v.value, int))
+    too_many = ValueCheck(True, lambda value_nodes: max(0, len(value_nodes) - 1))
+    fused = FusedValueChecks([[is_short, is_number], [], [too_many]])
+    focus_value_nodes = {a: [Literal(1), Literal("long")], b: [Literal("x"), Literal(12345), Literal("yyyy")]}
+    first, second, third = fused(focus_value_nodes)
+    # Each list of checks gets its failures check by check, then focus node by focus node
+    assert first == [
+        (a, Literal("long")),
+        (b, Literal(12345)),
+        (b, Literal("yyyy")),
+        (a, Literal("long")),
+        (b, Literal("x")),
+        (b, Literal("yyyy")),
+    ]
+    assert second == []
+    assert third == [(a, None), (b, None), (b, None)]
+
+
+def _range_and_length_checks():
+    from pyshacl.constraints.core.string_based_constraints import StringBasedConstraintBase
+    from pyshacl.constraints.core.value_range_constraints import _range_check
+    from pyshacl.helper.vectorized import length_batch
+
+    m_vals = [
+        Literal(0),
+        Literal(-3),
+        Literal(2**60),
+        Literal(2**70),
+        Literal(2.5),
+        Literal("1e300", datatype=XSD.double),
+        Literal("NaN", datatype=XSD.double),
+        Literal("-INF", datatype=XSD.float),
+        Literal("abc"),
+    ]
+    checks = []
+    for m_val in m_vals:
+        for accept in (lambda c: c > 0, lambda c: c >= 0, lambda c: c < 0, lambda c: c <= 0):
+            checks.append(_range_check(m_val, accept))
+    to_string = StringBasedConstraintBase.value_node_to_string
+    for n in (1, 2, 5):
+        # Blank nodes fail, as in sh:minLength
+        checks.append(
+            ValueCheck(
+                False,
+                lambda v, n=n: not isinstance(v, BNode) and len(to_string(v)) >= n,
+                length_batch(to_string, lambda a, n=n: a >= n),
+            )
+        )
+    return checks
+
+
+values = [
+    Literal(0),
+    Literal(1),
+    Literal(-3),
+    Literal(2**60),
+    Literal(2**60 + 1),
+    Literal(2**70),
+    Literal(-(2**70)),
+    Literal(2.5),
+    Literal(-0.0),
+    Literal("1e300", datatype=XSD.double),
+    Literal("NaN", datatype=XSD.double),
+    Literal("INF", datatype=XSD.double),
+    Literal("-INF", datatype=XSD.float),
+    Literal("2.5", datatype=XSD.float),
+    Literal("7", datatype=XSD.byte),
+    Literal("300", datatype=XSD.byte),
+    Literal("abc", datatype=XSD.integer),
+    Literal(True),
+    Literal("abc"),
+    Literal("abcdef", lang="en"),
+    Literal("2020-01-01", datatype=XSD.date),
+    URIRef("urn:x"),
+    BNode(),
+]
+
+
+def test_vectorized_checks_match_scalar_checks(monkeypatch):
+    pytest.importorskip("numpy")
+    from pyshacl.constraints.core.value_range_constraints import _range_check
+    from pyshacl.helper import vectorized
+
+    checks = _range_and_length_checks()
+    assert all(c.batch is not None for c in checks[:32])
+    assert checks[32].batch is None  # A string sh:minExclusive is not vectorized
+    # Decimals are compared one at a time
+    assert _range_check(Literal(Decimal("2.50")), lambda c: c > 0).batch is None
+    focus_value_nodes = {URIRef(f"urn:f{i}"): values[i:] + values[:i] for i in range(len(values))}
+    fused = FusedValueChecks([[c] for c in checks])
+    monkeypatch.setattr(vectorized, "MIN_VECTORIZED_VALUES", 0)
+    batched = fused(focus_value_nodes)
+    monkeypatch.setattr(vectorized, "MIN_VECTORIZED_VALUES", 10**9)
+    scalar = fused(focus_value_nodes)
+    assert batched == scalar
+    # Some of each kind of value node pass and some fail, differently for each check
+    assert len({len(failures) for failures in batched}) > 10
+
+
+def test_conforms_only_stops_the_value_checks_at_the_first_failure(monkeypatch):
+    from pyshacl.constraints.core.string_based_constraints import MinLengthConstraintComponent
+
+    calls = []
+    value_checks = MinLengthConstraintComponent.value_checks
+
+    def counted_value_checks(self):
+        def counted(test):
+            def check(v):
+                calls.append(v)
+                return test(v)
+
+            return check
+
+        return [c._replace(test=counted(c.test), batch=None) for c in value_checks(self)]
+
+    monkeypatch.setattr(MinLengthConstraintComponent, "value_checks", counted_value_checks)
+    data = "@prefix ex: <http://example.org/> .\n" + "".join(
+        f'ex:n{i} a ex:Thing ; ex:name "n{i}" .\n' for i in range(50)
+    )
+    shapes = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+ex:NameShape a sh:PropertyShape ; sh:targetClass ex:Thing ; sh:path ex:name ;
+  sh:datatype xsd:string ; sh:minLength 5 .
+"""
+    assert validate(data, shacl_graph=shapes, data_graph_format="turtle", conforms_only=True) == (False, None, None)
+    assert len(calls) == 1
+    calls.clear()
+    conforms, _, _ = validate(data, shacl_graph=shapes, data_graph_format="turtle")
+    assert conforms is False
+    assert len(calls) == 50
@@ -0,0 +1,126 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from rdflib import Graph, URIRef
+
+from pyshacl import validate
+from pyshacl.rdfutil import get_web_cache, load_from_source, set_web_cache
+
+ontology_ttl = b"""\
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix ex: <http://example.org/> .
+
+ex:Student rdfs:subClassOf ex:Person .
+"""
+
+shapes_ttl = """\
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix ex: <http://example.org/> .
+
+ex:PersonShape
+  a sh:NodeShape ;
+  sh:targetClass ex:Person ;
+  sh:property [ sh:path ex:name ; sh:minCount 1 ] ;
+.
+"""
+
+ont_ttl = """\
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+
+<http://example.org/ont> a owl:Ontology ;
+  owl:imports <{url}> .
+"""
+
+data_ttl = """\
+@prefix ex: <http://example.org/> .
+
+ex:Alice a ex:Student .
+"""
+
+
+class OntologyHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append(dict(self.headers))
+        if self.headers.get("If-None-Match", None) == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/turtle")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(ontology_ttl)))
+        self.end_headers()
+        self.wfile.write(ontology_ttl)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ontology_url():
+    OntologyHandler.requests_seen = []
+    server = HTTPServer(("127.0.0.1", 0), OntologyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield "http://127.0.0.1:{}/ontology.ttl".format(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def web_cache_dir(tmp_path):
+    old_cache = get_web_cache()
+    set_web_cache(tmp_path / "web_cache")
+    try:
+        yield tmp_path / "web_cache"
+    finally:
+        set_web_cache(old_cache.cache_dir, offline=old_cache.offline)
+
+
+def test_web_cache_revalidates_with_etag(ontology_url, web_cache_dir):
+    g1 = load_from_source(ontology_url)
+    assert (URIRef("http://example.org/Student"), None, None) in g1
+    assert len(list(web_cache_dir.glob("*.pickle"))) == 1
+    g2 = load_from_source(ontology_url)
+    assert set(g1) == set(g2)
+    assert len(OntologyHandler.requests_seen) == 2
+    assert "If-None-Match" not in OntologyHandler.requests_seen[0]
+    assert OntologyHandler.requests_seen[1]["If-None-Match"] == '"v1"'
+
+
+def test_web_cache_offline_imports(ontology_url, web_cache_dir):
+    ont = ont_ttl.format(url=ontology_url)
+    conforms, _, _ = validate(
+        data_ttl,
+        shacl_graph=shapes_ttl,
+        ont_graph=ont,
+        data_graph_format="turtle",
+        do_owl_imports=True,
+        inference="rdfs",
+    )
+    assert not conforms
+    assert len(OntologyHandler.requests_seen) == 1
+    set_web_cache(web_cache_dir, offline=True)
+    conforms, _, _ = validate(
+        data_ttl,
+        shacl_graph=shapes_ttl,
+        ont_graph=ont,
+        data_graph_format="turtle",
+        do_owl_imports=True,
+        inference="rdfs",
+    )
+    assert not conforms
+    assert len(OntologyHandler.requests_seen) == 1
+
+
+def test_web_cache_offline_miss(web_cache_dir):
+    set_web_cache(web_cache_dir, offline=True)
+    with pytest.raises(RuntimeError):
+        load_from_source("http://127.0.0.1:9/not-cached.ttl", g=Graph())